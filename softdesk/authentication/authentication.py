@@ -0,0 +1,83 @@
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from authentication.models import TokenUser
+from authentication.denylist import is_revoked
+from authentication.tokens import (
+    VERSION_CLAIM,
+    USER_CLAIMS,
+    get_token_version,
+)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication building the user from the claims of the
+    token (a TokenUser) instead of loading it from the database.
+
+    A token is only accepted while its version is the token_version of
+    the user, which changes with the password, is_active and
+    is_superuser: the version is read from the tokens cache, so a
+    request usually makes no query at all. Tokens issued without the
+    claims load the user, as JWTAuthentication does.
+
+    The revoked tokens (see authentication.denylist) are refused."""
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(
+                _('Token has been revoked'),
+                code='token_revoked'
+            )
+        return validated_token
+
+    def get_user(self, validated_token):
+        if any(
+            claim not in validated_token
+            for claim in (VERSION_CLAIM, *USER_CLAIMS)
+        ):
+            user = super().get_user(validated_token)
+            self.check_version(validated_token, user.token_version)
+            return user
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        self.check_version(validated_token, get_token_version(user_id))
+        return self.build_user(user_id, validated_token)
+
+    def check_version(self, validated_token, version):
+        if (
+            version is None
+            or validated_token.get(VERSION_CLAIM, 0) != version
+        ):
+            raise AuthenticationFailed(
+                _('Token is no longer valid'),
+                code='token_not_valid'
+            )
+
+    def build_user(self, user_id, validated_token):
+        values = {
+            api_settings.USER_ID_FIELD: user_id,
+            'is_active': True,
+            'token_version': validated_token[VERSION_CLAIM],
+        }
+        for claim in USER_CLAIMS:
+            values[claim] = validated_token[claim]
+        fields = [
+            field.attname
+            for field in TokenUser._meta.concrete_fields
+            if field.attname in values
+        ]
+        return TokenUser.from_db(
+            router.db_for_read(TokenUser),
+            fields,
+            [values[field] for field in fields]
+        )
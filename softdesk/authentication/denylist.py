@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from heapq import heappop, heappush
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
+from rest_framework_simplejwt.settings import api_settings
+from authentication.models import RevokedToken
+from authentication.tokens import get_cache
+from projectsapp.cache import get_stats
+
+
+# Changed in the tokens cache by every revocation: each process keeps
+# the jtis of the revoked tokens in memory, and loads the entries
+# revoked since its last load from the RevokedToken table when the
+# generation it saw is not current, or after TOKEN_DENYLIST_MAX_AGE
+# seconds: with a cache local to each process, the revocations of the
+# others are only seen then.
+GENERATION_KEY = 'token-denylist:generation'
+# The entries revoked this long before the newest one loaded are read
+# again: a transaction committed late (or a process with a clock
+# behind) can add an entry older than it.
+LOAD_OVERLAP = timedelta(minutes=1)
+
+stats = get_stats('denylist')
+
+
+class _Denylist:
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.generation = None
+        self.loaded_at = None
+        # Newest revoked_at loaded, None before the first load.
+        self.revoked_until = None
+        # {jti: expires_at}, and the (expires_at, jti) to drop them
+        # once expired, soonest first.
+        self.jtis = {}
+        self.expiries = []
+
+    def is_current(self, generation):
+        return (
+            generation == self.generation
+            and monotonic() - self.loaded_at < settings.TOKEN_DENYLIST_MAX_AGE
+        )
+
+    def load(self, current_time):
+        """Add the entries revoked since the last load (all of them the
+        first time) and drop the expired ones."""
+        entries = RevokedToken.objects.filter(expires_at__gt=current_time)
+        if self.revoked_until is not None:
+            entries = entries.filter(
+                revoked_at__gte=self.revoked_until - LOAD_OVERLAP
+            )
+        for jti, expires_at, revoked_at in entries.values_list(
+            'jti', 'expires_at', 'revoked_at'
+        ):
+            if jti not in self.jtis:
+                self.jtis[jti] = expires_at
+                heappush(self.expiries, (expires_at, jti))
+            if self.revoked_until is None or revoked_at > self.revoked_until:
+                self.revoked_until = revoked_at
+        while self.expiries and self.expiries[0][0] <= current_time:
+            _, jti = heappop(self.expiries)
+            del self.jtis[jti]
+
+
+_denylist = _Denylist()
+
+
+def get_generation():
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # First use, or evicted: start a new one.
+        cache.add(GENERATION_KEY, uuid4().hex, timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    get_cache().set(GENERATION_KEY, uuid4().hex, timeout=None)
+
+
+def get_revoked_jtis():
+    """Return the jtis of the revoked tokens not expired yet (a dict
+    of their expiry), from memory while no token was revoked since
+    they were loaded (as far as the tokens cache tells) and for
+    TOKEN_DENYLIST_MAX_AGE seconds at most."""
+    generation = get_generation()
+    if _denylist.is_current(generation):
+        stats.hit()
+        return _denylist.jtis
+    stats.miss()
+    with _denylist.lock:
+        if not _denylist.is_current(generation):
+            _denylist.load(now())
+            _denylist.generation = generation
+            _denylist.loaded_at = monotonic()
+    return _denylist.jtis
+
+
+def is_revoked(token):
+    return token.get(api_settings.JTI_CLAIM) in get_revoked_jtis()
+
+
+def revoke(*tokens):
+    """Refuse these tokens until they expire: at once in the processes
+    sharing the tokens cache, within TOKEN_DENYLIST_MAX_AGE seconds in
+    the others. The expired entries are purged at the same time."""
+    purge_expired()
+    RevokedToken.objects.bulk_create(
+        [
+            RevokedToken(
+                jti=token[api_settings.JTI_CLAIM],
+                user_id=token[api_settings.USER_ID_CLAIM],
+                expires_at=datetime.fromtimestamp(
+                    token['exp'], tz=timezone.utc
+                ),
+            )
+            for token in tokens
+        ],
+        ignore_conflicts=True
+    )
+    # Again once committed: a process could load the table in between.
+    bump_generation()
+    transaction.on_commit(bump_generation)
+
+
+def purge_expired():
+    """Delete the entries of the expired tokens, return their number."""
+    count, _ = RevokedToken.objects.filter(
+        expires_at__lte=now()
+    ).delete()
+    return count
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+# Name of the entry of settings.PASSWORD_HASH_ITERATIONS used to hash
+# the passwords, e.g. 'create' while a user is created.
+_context = ContextVar('password_hashing_context', default='default')
+
+
+def get_iterations(context=None):
+    """Return the PBKDF2 iterations of the context (of the current one
+    by default), those of 'default' if it has none."""
+    iterations = settings.PASSWORD_HASH_ITERATIONS
+    return iterations.get(context or _context.get(), iterations['default'])
+
+
+@contextmanager
+def hashing_context(name):
+    """Hash and upgrade the passwords with the work factor of this
+    context in the block."""
+    token = _context.set(name)
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 with the iterations of the current hashing context.
+
+    A stored hash is only updated (by the next successful check of the
+    password, i.e. on login) when it has fewer iterations: a context
+    with a lower work factor never weakens the hashes."""
+
+    @property
+    def iterations(self):
+        return get_iterations()
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (
+            decoded['iterations'] < self.iterations
+            or hashers.must_update_salt(decoded['salt'], self.salt_entropy)
+        )
+
+
+def verify_password(password, encoded):
+    """Return whether the password matches the hash (None if the user
+    does not exist, hashing anyway so that the time does not tell), and
+    its new hash if the hash must be upgraded, None otherwise."""
+    if encoded is None:
+        hashers.make_password(password)
+        return False, None
+    upgraded = []
+    valid = hashers.check_password(
+        password,
+        encoded,
+        setter=lambda raw_password: upgraded.append(
+            hashers.make_password(raw_password)
+        )
+    )
+    return valid, (upgraded[0] if upgraded else None)
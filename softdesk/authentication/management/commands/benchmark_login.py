@@ -0,0 +1,91 @@
+from timeit import Timer
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.views import TokenObtainPairView
+from authentication.hashers import hashing_context
+
+
+PASSWORD = 'benchmark-password'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the logins per second of one core on the token '
+        'endpoint, and of the password check alone, for several PBKDF2 '
+        'iteration counts (see PASSWORD_HASH_ITERATIONS). The user is '
+        'created in a transaction which is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            nargs='+',
+            type=int,
+            default=[100000, 260000, 600000, 1000000],
+            help='PBKDF2 iterations (100000 260000 600000 1000000).'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of logins per iteration count (5).'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['iterations'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, iterations_list, repeat):
+        User = get_user_model()
+        view = TokenObtainPairView.as_view()
+        factory = APIRequestFactory()
+        for iterations in iterations_list:
+            # The same work factor everywhere: the logins do not rehash.
+            with override_settings(PASSWORD_HASH_ITERATIONS={
+                'default': iterations,
+                'create': iterations,
+                'login': iterations,
+            }):
+                with hashing_context('create'):
+                    user = User.objects.create_user(
+                        username=f'benchmark-{iterations}',
+                        email=f'benchmark-{iterations}@example.com',
+                        birthdate='2000-01-01',
+                        password=PASSWORD,
+                    )
+
+                def login():
+                    response = view(factory.post(
+                        '/api/token/',
+                        {'username': user.username, 'password': PASSWORD},
+                        format='json'
+                    ))
+                    assert response.status_code == 200, response.data
+
+                def check():
+                    assert check_password(PASSWORD, user.password)
+
+                endpoint = self.time(login, repeat)
+                hashing = self.time(check, repeat)
+            self.stdout.write(
+                f'{iterations:>8} iterations'
+                f'    token endpoint {endpoint * 1000:7.1f} ms'
+                f' {1 / endpoint:7.1f} logins/s'
+                f'    password check {hashing * 1000:7.1f} ms'
+            )
+
+    def time(self, func, repeat):
+        """Best time of one call, in seconds."""
+        return min(Timer(func).repeat(repeat=repeat, number=1))
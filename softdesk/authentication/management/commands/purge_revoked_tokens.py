@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from authentication.denylist import purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the revoked tokens which have expired. They are also '
+        'purged each time a token is revoked.'
+    )
+
+    def handle(self, *args, **options):
+        count = purge_expired()
+        self.stdout.write(
+            self.style.SUCCESS(f'Purged {count} expired revoked tokens.')
+        )
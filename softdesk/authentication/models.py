@@ -1,8 +1,14 @@
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 
 class User(AbstractUser):
+    # Changing one of these revokes the tokens issued before,
+    # see token_version.
+    TOKEN_REVOKING_FIELDS = ('password', 'is_active', 'is_superuser')
+
     email = models.EmailField(
         unique=True,
     )
@@ -13,6 +19,12 @@ class User(AbstractUser):
     can_data_be_shared = models.BooleanField(
         default=False,
     )
+    # Sent in the tokens, which are only accepted while it is the same.
+    # Bumped by save() when a TOKEN_REVOKING_FIELDS changes.
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
 
     REQUIRED_FIELDS = [
         'email',
@@ -21,3 +33,87 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._token_state = instance.get_token_state()
+        return instance
+
+    def get_token_state(self):
+        # Only the loaded fields, reading a deferred one is a query.
+        return {
+            field: self.__dict__[field]
+            for field in self.TOKEN_REVOKING_FIELDS
+            if field in self.__dict__
+        }
+
+    def check_password(self, raw_password):
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save_rehashed_password()
+        return check_password(raw_password, self.password, setter)
+
+    def save_rehashed_password(self):
+        # Rehashed with more iterations (see authentication.hashers):
+        # the password is the same, the tokens are kept.
+        if 'password' in getattr(self, '_token_state', {}):
+            self._token_state['password'] = self.password
+        self.save(update_fields=['password'])
+
+    def save(self, *args, **kwargs):
+        saved_state = getattr(self, '_token_state', {})
+        state = self.get_token_state()
+        update_fields = kwargs.get('update_fields')
+        if any(
+            state[field] != value
+            for field, value in saved_state.items()
+            if field in state
+            and (update_fields is None or field in update_fields)
+        ):
+            self.token_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._token_state = self.get_token_state()
+
+
+class TokenUser(User):
+    """User built from the claims of an access token by
+    StatelessJWTAuthentication, without a query. The other fields are
+    deferred: the first one read loads all of them, in one query."""
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.issuperset(fields):
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields)
+
+
+class RevokedToken(models.Model):
+    """A token refused until it expires, see authentication.denylist."""
+    jti = models.CharField(
+        max_length=255,
+        unique=True,
+    )
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='revoked_tokens',
+    )
+    # Purged once expired: the token is refused anyway.
+    expires_at = models.DateTimeField(
+        db_index=True,
+    )
+    # The processes load the entries revoked since their last load.
+    revoked_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+    )
+
+    def __str__(self):
+        return self.jti
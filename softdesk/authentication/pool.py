@@ -0,0 +1,71 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from threading import Lock
+from django.conf import settings
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+class BoundedPool:
+    """Threads running the password hashing of the async token views
+    (hashlib releases the GIL while hashing), so that the event loop
+    keeps serving the other requests.
+
+    At most `max_workers` calls run at once and `max_queue` wait: the
+    next ones are refused with PoolSaturated instead of queueing
+    behind seconds of hashing."""
+
+    def __init__(self, max_workers, max_queue):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.lock = Lock()
+        self.executor = None
+
+    def is_saturated(self):
+        return self.pending >= self.max_workers + self.max_queue
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='password-hashing',
+                )
+            return self.executor
+
+    async def run(self, func, *args):
+        """Return func(*args), called in the context (e.g. the hashing
+        context) of the caller, by a thread of the pool."""
+        executor = self.get_executor()
+        with self.lock:
+            if self.is_saturated():
+                raise PoolSaturated
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor,
+                partial(copy_context().run, func, *args)
+            )
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+
+_pool = None
+_pool_lock = Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BoundedPool(
+                settings.PASSWORD_POOL_WORKERS,
+                settings.PASSWORD_POOL_MAX_QUEUE,
+            )
+        return _pool
@@ -1,10 +1,22 @@
 from datetime import date
 from rest_framework.serializers import (
+    Serializer,
     ModelSerializer,
+    CharField,
     ValidationError,
 )
 from django.contrib.auth.hashers import make_password
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer as BaseTokenObtainPairSerializer,
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from authentication.hashers import hashing_context
 from authentication.models import User
+from authentication.tokens import VERSION_CLAIM, add_claims
+from authentication import denylist
 
 
 class UserDetailSerializer(ModelSerializer):
@@ -54,7 +66,8 @@ class UserDetailSerializer(ModelSerializer):
         return value
 
     def create(self, validated_data):
-        user = User.objects.create_user(**validated_data)
+        with hashing_context('create'):
+            user = User.objects.create_user(**validated_data)
         return user
 
     def update(self, instance, validated_data):
@@ -75,3 +88,84 @@ class UserSerializer(ModelSerializer):
             'username',
             'email',
         ]
+
+
+class CredentialsSerializer(Serializer):
+    """The fields of TokenObtainPairSerializer, without the
+    authentication, for AsyncTokenObtainPairView."""
+    username = CharField()
+    password = CharField(trim_whitespace=False, write_only=True)
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    """Tokens carrying the claims read by StatelessJWTAuthentication.
+    The password is checked, and upgraded, with the 'login' work
+    factor."""
+
+    def validate(self, attrs):
+        with hashing_context('login'):
+            return super().validate(attrs)
+
+    @classmethod
+    def get_token(cls, user):
+        return add_claims(super().get_token(user), user)
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refuse the refresh tokens revoked (by a new token_version or
+    in the denylist), and put the current claims of the user in the
+    new access token. A rotated refresh token is revoked."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if denylist.is_revoked(refresh):
+            raise InvalidToken('Token has been revoked')
+        user = User.objects.filter(
+            pk=refresh.get(api_settings.USER_ID_CLAIM),
+            is_active=True,
+        ).first()
+        if (
+            user is None
+            or refresh.get(VERSION_CLAIM, 0) != user.token_version
+        ):
+            raise InvalidToken('Token is no longer valid')
+        add_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            denylist.revoke(refresh)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class TokenField(CharField):
+    """A token signed by the API and not expired, of the token_class
+    (any type by default), validated as the token object."""
+    token_class = UntypedToken
+
+    def __init__(self, *args, token_class=None, **kwargs):
+        if token_class is not None:
+            self.token_class = token_class
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return self.token_class(super().to_internal_value(data))
+        except TokenError as error:
+            raise ValidationError(str(error))
+
+
+class LogoutSerializer(Serializer):
+    refresh = TokenField(token_class=RefreshToken)
+
+    def validate_refresh(self, value):
+        user = self.context['request'].user
+        if value.get(api_settings.USER_ID_CLAIM) != user.pk:
+            raise ValidationError('This token belongs to another user.')
+        return value
+
+
+class RevokeTokenSerializer(Serializer):
+    token = TokenField()
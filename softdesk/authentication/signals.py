@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from authentication.models import User, TokenUser
+from authentication import tokens
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=TokenUser)
+def invalidate_token_version(sender, instance, **kwargs):
+    """Forget the cached token version of a user saved (its version
+    or is_active may have changed) or deleted."""
+    tokens.invalidate(instance.pk)
@@ -1,7 +1,27 @@
-from datetime import datetime
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+from io import StringIO
+from time import monotonic, time
+from unittest.mock import patch
+from django.conf import settings
 from django.urls import reverse_lazy, reverse
 from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase, APIClient
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.authentication import StatelessJWTAuthentication
+from authentication.models import TokenUser, RevokedToken
+from authentication import denylist
+from authentication.pool import BoundedPool
 
 
 User = get_user_model()
@@ -67,6 +87,12 @@ class UserTestCase(APITestCase):
         user.save()
         return user
 
+    def setUp(self):
+        # Cached entries would outlive the rollback of the test data.
+        for cache in caches.all():
+            cache.clear()
+        denylist._denylist.reset()
+
     def format_datetime(self, value):
         return value.strftime("%Y-%m-%d")
 
@@ -119,6 +145,7 @@ class UserAsAdmin(UserTestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -226,6 +253,7 @@ class UserAsNormalUser(UserTestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -329,3 +357,505 @@ class UserAsUnauthenticatedUser(UserTestCase):
             response.json(),
             self.get_response_unauthenticated()
         )
+
+
+class UserQueryCounts(UserTestCase):
+    """The number of queries must not grow with the number of users."""
+
+    def add_users(self, count):
+        for i in range(count):
+            name = f'querycount{User.objects.count()}'
+            User.objects.create(
+                username=name,
+                email=f'{name}@test.com',
+                birthdate='1990-01-01'
+            )
+
+    def assertConstantQueries(self, user, url):
+        self.client.force_authenticate(user=user)
+        counts = []
+        for size in (2, 6):
+            self.add_users(size)
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(url)
+            counts.append(context.captured_queries)
+        if len(counts[0]) != len(counts[1]):
+            self.fail(
+                f'GET {url}: {len(counts[0])} then {len(counts[1])} '
+                'queries:\n'
+                + '\n'.join(query['sql'] for query in counts[1])
+            )
+
+    def test_list(self):
+        self.assertConstantQueries(self.user, reverse('user-list'))
+
+    def test_detail(self):
+        self.assertConstantQueries(
+            self.user2,
+            reverse('user-detail', args=(self.user2.pk,))
+        )
+
+
+class JWTTestCase(UserTestCase):
+    url_token = reverse_lazy('token-obtain-pair')
+    url_refresh = reverse_lazy('token-refresh')
+
+    def get_tokens(self, username="user2", password="wxcv1234"):
+        response = self.client.post(
+            self.url_token,
+            {"username": username, "password": password}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def authenticate(self, access):
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {access}'
+        )
+        return StatelessJWTAuthentication().authenticate(request)[0]
+
+    def get_detail(self, access, user=None):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return self.client.get(
+            reverse('user-detail', args=((user or self.user2).pk,))
+        )
+
+
+class StatelessJWT(JWTTestCase):
+
+    def test_user_from_claims(self):
+        access = self.get_tokens()['access']
+        # The token version and the denylist are cached by the first
+        # request.
+        with self.assertNumQueries(2):
+            self.authenticate(access)
+        with self.assertNumQueries(0):
+            user = self.authenticate(access)
+            self.assertIsInstance(user, TokenUser)
+            self.assertEqual(user, self.user2)
+            self.assertTrue(user.is_authenticated)
+            self.assertFalse(user.is_superuser)
+            self.assertFalse(user.can_be_contacted)
+        # The other fields are loaded together, on first use.
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, "user2")
+            self.assertEqual(user.email, "user2@test.com")
+
+    def test_admin_claims(self):
+        access = self.get_tokens(username="user")['access']
+        self.assertTrue(self.authenticate(access).is_superuser)
+        response = self.get_detail(access)
+        self.assertEqual(response.status_code, 200)
+
+    def test_password_change_revokes_tokens(self):
+        tokens = self.get_tokens()
+        self.assertEqual(self.get_detail(tokens['access']).status_code, 200)
+        response = self.client.patch(
+            reverse('user-detail', args=(self.user2.pk,)),
+            {"password": "new_password"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_detail(tokens['access']).status_code, 401)
+        response = self.client.post(
+            self.url_refresh,
+            {"refresh": tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 401)
+        tokens = self.get_tokens(password="new_password")
+        self.assertEqual(self.get_detail(tokens['access']).status_code, 200)
+
+    def test_other_changes_keep_tokens(self):
+        access = self.get_tokens()['access']
+        self.get_detail(access)
+        self.user2.refresh_from_db()
+        self.user2.can_data_be_shared = True
+        self.user2.save()
+        self.assertEqual(self.get_detail(access).status_code, 200)
+
+    def test_deactivation_revokes_tokens(self):
+        access = self.get_tokens()['access']
+        self.authenticate(access)
+        self.user2.refresh_from_db()
+        self.user2.is_active = False
+        self.user2.save(update_fields=['is_active'])
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access)
+        self.user2.is_active = True
+        self.user2.save()
+        # Still revoked: the version changed.
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_deactivated_by_other_process(self):
+        access = self.get_tokens()['access']
+        self.authenticate(access)
+        # Another process does not forget the version in our cache.
+        User.objects.filter(pk=self.user2.pk).update(is_active=False)
+        self.authenticate(access)
+        later = time() + settings.TOKEN_VERSION_MAX_AGE + 1
+        with patch('django.core.cache.backends.locmem.time') as clock:
+            clock.time.return_value = later
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate(access)
+
+    def test_refresh_updates_claims(self):
+        tokens = self.get_tokens()
+        User.objects.filter(pk=self.user2.pk).update(can_be_contacted=True)
+        response = self.client.post(
+            self.url_refresh,
+            {"refresh": tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 200)
+        user = self.authenticate(response.json()['access'])
+        self.assertTrue(user.can_be_contacted)
+
+    def test_token_without_claims(self):
+        access = str(RefreshToken.for_user(self.user2).access_token)
+        user = self.authenticate(access)
+        self.assertNotIsInstance(user, TokenUser)
+        self.assertEqual(user, self.user2)
+
+
+class Denylist(JWTTestCase):
+    url_logout = reverse_lazy('token-logout')
+    url_revoke = reverse_lazy('token-revoke')
+
+    def test_logout(self):
+        tokens = self.get_tokens()
+        other = self.get_tokens()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}'
+        )
+        response = self.client.post(
+            self.url_logout,
+            {"refresh": tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_detail(tokens['access']).status_code, 401)
+        response = self.client.post(
+            self.url_refresh,
+            {"refresh": tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 401)
+        # The other sessions of the user are kept.
+        self.assertEqual(self.get_detail(other['access']).status_code, 200)
+
+    def test_logout_other_user_token(self):
+        tokens = self.get_tokens()
+        other = self.get_tokens(username="user3")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}'
+        )
+        response = self.client.post(
+            self.url_logout,
+            {"refresh": other['refresh']}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_revoke(self):
+        tokens = self.get_tokens()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}'
+        )
+        response = self.client.post(
+            self.url_revoke,
+            {"token": tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 204)
+        response = self.client.post(
+            self.url_refresh,
+            {"refresh": tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 401)
+        # The access token is still valid.
+        self.assertEqual(self.get_detail(tokens['access']).status_code, 200)
+
+    def test_revoke_permissions(self):
+        tokens = self.get_tokens()
+        other = self.get_tokens(username="user3")
+        admin = self.get_tokens(username="user")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}'
+        )
+        response = self.client.post(
+            self.url_revoke,
+            {"token": other['access']}
+        )
+        self.assertEqual(response.status_code, 403)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {admin["access"]}'
+        )
+        response = self.client.post(
+            self.url_revoke,
+            {"token": other['access']}
+        )
+        self.assertEqual(response.status_code, 204)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(other['access'])
+
+    def test_revoke_invalid_token(self):
+        tokens = self.get_tokens()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}'
+        )
+        response = self.client.post(self.url_revoke, {"token": "invalid"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_lookup_without_query(self):
+        access = self.get_tokens()['access']
+        self.authenticate(access)
+        with self.assertNumQueries(0):
+            self.authenticate(access)
+        # A revocation makes every process reload the denylist once.
+        denylist.revoke(RefreshToken(self.get_tokens()['refresh']))
+        with self.assertNumQueries(1):
+            self.authenticate(access)
+        with self.assertNumQueries(0):
+            self.authenticate(access)
+
+    def test_revoked_by_other_process(self):
+        access = RefreshToken(self.get_tokens()['refresh']).access_token
+        self.assertFalse(denylist.is_revoked(access))
+        # Revoked by a process with its own tokens cache: the generation
+        # seen here does not change.
+        RevokedToken.objects.create(
+            jti=access['jti'],
+            user=self.user2,
+            expires_at=timezone.now() + timedelta(minutes=5)
+        )
+        self.assertFalse(denylist.is_revoked(access))
+        later = monotonic() + settings.TOKEN_DENYLIST_MAX_AGE
+        with patch('authentication.denylist.monotonic', return_value=later):
+            self.assertTrue(denylist.is_revoked(access))
+
+    def test_reload(self):
+        refresh = RefreshToken(self.get_tokens()['refresh'])
+        access = refresh.access_token
+        denylist.revoke(access)
+        # As in a new process.
+        denylist._denylist.reset()
+        self.assertTrue(denylist.is_revoked(access))
+        self.assertFalse(denylist.is_revoked(refresh))
+
+    def revoke_entry(self, token, revoked_at=None, expires_in=5):
+        entry = RevokedToken.objects.create(
+            jti=token['jti'],
+            user=self.user2,
+            expires_at=timezone.now() + timedelta(minutes=expires_in)
+        )
+        if revoked_at is not None:
+            RevokedToken.objects.filter(pk=entry.pk).update(
+                revoked_at=revoked_at
+            )
+        denylist.bump_generation()
+
+    def test_incremental_load(self):
+        first, late, old = (
+            RefreshToken(self.get_tokens()['refresh']) for _ in range(3)
+        )
+        self.revoke_entry(first)
+        self.assertTrue(denylist.is_revoked(first))
+        newest = RevokedToken.objects.get().revoked_at
+        # Loaded once: only the newer entries are read afterwards.
+        RevokedToken.objects.all().delete()
+        # Committed after the newest one loaded, within the overlap.
+        self.revoke_entry(late, newest - timedelta(seconds=30))
+        # Older than the overlap: already loaded by a previous run.
+        self.revoke_entry(old, newest - timedelta(minutes=2))
+        self.assertTrue(denylist.is_revoked(first))
+        self.assertTrue(denylist.is_revoked(late))
+        self.assertFalse(denylist.is_revoked(old))
+
+    def test_expired_entries_dropped(self):
+        refresh = RefreshToken(self.get_tokens()['refresh'])
+        self.revoke_entry(refresh, expires_in=1)
+        self.assertTrue(denylist.is_revoked(refresh))
+        later = timezone.now() + timedelta(minutes=2)
+        denylist.bump_generation()
+        with patch('authentication.denylist.now', return_value=later):
+            self.assertFalse(denylist.is_revoked(refresh))
+        self.assertEqual(denylist._denylist.jtis, {})
+        self.assertEqual(denylist._denylist.expiries, [])
+
+    def test_rotation_revokes_refresh_token(self):
+        refresh = self.get_tokens()['refresh']
+        # simplejwt reads its settings once.
+        with patch.object(api_settings, 'ROTATE_REFRESH_TOKENS', True):
+            response = self.client.post(
+                self.url_refresh,
+                {"refresh": refresh}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.json()['refresh'], refresh)
+            response = self.client.post(
+                self.url_refresh,
+                {"refresh": refresh}
+            )
+            self.assertEqual(response.status_code, 401)
+
+    def test_purge_expired(self):
+        refresh = RefreshToken(self.get_tokens()['refresh'])
+        access = refresh.access_token
+        denylist.revoke(refresh, access)
+        RevokedToken.objects.filter(
+            jti=access['jti']
+        ).update(expires_at=timezone.now() - timedelta(seconds=1))
+        call_command('purge_revoked_tokens', stdout=StringIO())
+        self.assertQuerySetEqual(
+            RevokedToken.objects.values_list('jti', flat=True),
+            [refresh['jti']]
+        )
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS={
+    'default': 1000,
+    'create': 1100,
+    'login': 1200,
+})
+class PasswordHashing(JWTTestCase):
+
+    def get_iterations(self, user):
+        user.refresh_from_db()
+        return int(user.password.split('$')[1])
+
+    def test_create(self):
+        response = self.client.post(
+            reverse('user-list'),
+            {
+                "username": "user4",
+                "email": "user4@test.com",
+                "password": "wxcv1234",
+                "birthdate": "1990-01-01",
+            }
+        )
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(username="user4")
+        self.assertEqual(self.get_iterations(user), 1100)
+
+    def test_update(self):
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.patch(
+            reverse('user-detail', args=(self.user2.pk,)),
+            {"password": "new_password"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_iterations(self.user2), 1000)
+
+    def test_login_upgrades_hash(self):
+        access = self.get_tokens()['access']
+        self.assertEqual(self.get_iterations(self.user2), 1200)
+        # The password is the same: the tokens are kept.
+        self.assertEqual(self.get_detail(access).status_code, 200)
+        self.get_tokens()
+        self.assertEqual(self.get_iterations(self.user2), 1200)
+
+    def test_login_keeps_stronger_hash(self):
+        with override_settings(PASSWORD_HASH_ITERATIONS={'default': 1500}):
+            self.user2.set_password("wxcv1234")
+            self.user2.save()
+        self.get_tokens()
+        self.assertEqual(self.get_iterations(self.user2), 1500)
+
+
+class AsyncTokenViews(JWTTestCase):
+    url_async_token = reverse_lazy('async-token-obtain-pair')
+    url_async_refresh = reverse_lazy('async-token-refresh')
+
+    async def test_obtain(self):
+        response = await self.async_client.post(
+            self.url_async_token,
+            {"username": "user2", "password": "wxcv1234"},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        tokens = response.json()
+        self.assertEqual(tokens.keys(), {"refresh", "access"})
+        user = await sync_to_async(self.authenticate)(tokens['access'])
+        self.assertEqual(user.pk, self.user2.pk)
+
+    def test_same_errors(self):
+        for data in (
+            {"username": "user2", "password": "wrong"},
+            {"username": "unknown", "password": "wxcv1234"},
+            {"username": "user2"},
+        ):
+            with self.subTest(data=data):
+                expected = self.client.post(self.url_token, data)
+                response = self.client.post(self.url_async_token, data)
+                self.assertEqual(
+                    response.status_code,
+                    expected.status_code
+                )
+                self.assertEqual(response.json(), expected.json())
+                self.assertEqual(
+                    response.get('WWW-Authenticate'),
+                    expected.get('WWW-Authenticate')
+                )
+
+    def test_inactive_user(self):
+        User.objects.filter(pk=self.user2.pk).update(is_active=False)
+        response = self.client.post(
+            self.url_async_token,
+            {"username": "user2", "password": "wxcv1234"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(PASSWORD_HASH_ITERATIONS={
+        'default': 1000,
+        'login': 1200,
+    })
+    def test_login_upgrades_hash(self):
+        response = self.client.post(
+            self.url_async_token,
+            {"username": "user2", "password": "wxcv1234"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user2.refresh_from_db()
+        self.assertTrue(self.user2.password.startswith('pbkdf2_sha256$1200$'))
+        self.assertEqual(
+            self.get_detail(response.json()['access']).status_code,
+            200
+        )
+
+    async def test_saturated_pool(self):
+        pool = BoundedPool(max_workers=1, max_queue=0)
+        release = threading.Event()
+        running = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0)
+        try:
+            with patch('authentication.views.get_pool', return_value=pool):
+                response = await self.async_client.post(
+                    self.url_async_token,
+                    {"username": "user2", "password": "wxcv1234"},
+                    content_type='application/json'
+                )
+        finally:
+            release.set()
+            await running
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(pool.pending, 0)
+
+    def test_refresh(self):
+        tokens = self.get_tokens()
+        response = self.client.post(
+            self.url_async_refresh,
+            {"refresh": tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.get_detail(response.json()['access']).status_code,
+            200
+        )
+        denylist.revoke(RefreshToken(tokens['refresh']))
+        expected = self.client.post(
+            self.url_refresh,
+            {"refresh": tokens['refresh']}
+        )
+        response = self.client.post(
+            self.url_async_refresh,
+            {"refresh": tokens['refresh']}
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), expected.json())
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from projectsapp.cache import get_stats
+
+
+# Claims added to the tokens, read by StatelessJWTAuthentication.
+VERSION_CLAIM = 'ver'
+USER_CLAIMS = ('is_superuser', 'can_be_contacted')
+# Cached for the users who are inactive or deleted.
+REVOKED = -1
+
+stats = get_stats('tokens')
+
+
+def get_cache():
+    return caches[settings.TOKEN_CACHE_ALIAS]
+
+
+def make_key(user_id):
+    return f'token-version:{user_id}'
+
+
+def add_claims(token, user):
+    """Add the token_version and the USER_CLAIMS of the user to a token."""
+    token[VERSION_CLAIM] = user.token_version
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def get_token_version(user_id):
+    """Return the token_version of an active user, None if the user
+    is inactive or does not exist.
+
+    The answer is kept in the tokens cache, shared between requests,
+    for TOKEN_VERSION_MAX_AGE seconds and forgotten when the user is
+    saved or deleted."""
+    cache = get_cache()
+    key = make_key(user_id)
+    version = cache.get(key)
+    if version is not None:
+        stats.hit()
+        return None if version == REVOKED else version
+    stats.miss()
+    version = get_user_model().objects.filter(
+        pk=user_id,
+        is_active=True,
+    ).values_list('token_version', flat=True).first()
+    cache.set(
+        key,
+        REVOKED if version is None else version,
+        settings.TOKEN_VERSION_MAX_AGE
+    )
+    return version
+
+
+def invalidate(*user_ids):
+    """Forget the cached token versions of these users, now and once
+    the current transaction is committed (a request could cache the
+    old version in between)."""
+    keys = [make_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+
+    def forget():
+        get_cache().delete_many(keys)
+
+    forget()
+    transaction.on_commit(forget)
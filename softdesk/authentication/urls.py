@@ -4,7 +4,13 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView
 )
 from django.urls import path, include
-from authentication.views import UserViewSet
+from authentication.views import (
+    UserViewSet,
+    LogoutView,
+    RevokeTokenView,
+    AsyncTokenObtainPairView,
+    AsyncTokenRefreshView,
+)
 
 router = routers.SimpleRouter()
 router.register('users', UserViewSet, basename='user')
@@ -14,5 +20,13 @@ urlpatterns = [
          name='token-obtain-pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(),
          name='token-refresh'),
+    path('api/token/logout/', LogoutView.as_view(),
+         name='token-logout'),
+    path('api/token/revoke/', RevokeTokenView.as_view(),
+         name='token-revoke'),
+    path('api/async/token/', AsyncTokenObtainPairView.as_view(),
+         name='async-token-obtain-pair'),
+    path('api/async/token/refresh/', AsyncTokenRefreshView.as_view(),
+         name='async-token-refresh'),
     path('api/', include(router.urls))
 ]
@@ -1,13 +1,42 @@
+from io import BytesIO
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    PermissionDenied,
+)
+from rest_framework.response import Response
+from rest_framework.views import APIView, exception_handler
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
 from authentication.permissions import (
     IsAdmin,
     IsOwner
 )
+from authentication.hashers import hashing_context, verify_password
+from authentication.pool import PoolSaturated, get_pool
 from authentication.serializers import (
     UserDetailSerializer,
+    LogoutSerializer,
+    RevokeTokenSerializer,
+    CredentialsSerializer,
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
 )
+from authentication import denylist
+from softdesk.parsers import FastJSONParser
+from softdesk.renderers import FastJSONRenderer
 
 
 User = get_user_model()
@@ -25,3 +54,151 @@ class UserViewSet(ModelViewSet):
         else:
             self.permission_classes = [IsOwner | IsAdmin]
         return super().get_permissions()
+
+
+class LogoutView(APIView):
+    """Revoke the given refresh token of the request user, and the
+    access token of the request."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = LogoutSerializer(
+            data=request.data,
+            context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        tokens = [serializer.validated_data['refresh']]
+        if isinstance(request.auth, Token):
+            tokens.append(request.auth)
+        denylist.revoke(*tokens)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class RevokeTokenView(APIView):
+    """Revoke a token (access or refresh) of the request user,
+    or of any user for an admin."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = RevokeTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = serializer.validated_data['token']
+        if (
+            token.get(api_settings.USER_ID_CLAIM) != request.user.pk
+            and not request.user.is_superuser
+        ):
+            raise PermissionDenied
+        denylist.revoke(token)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class LoginPoolSaturated(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins at the moment, retry later.'
+    default_code = 'login_pool_saturated'
+
+    def __init__(self, detail=None, code=None):
+        super().__init__(detail, code)
+        # Sent as Retry-After by the exception handler.
+        self.wait = settings.PASSWORD_POOL_RETRY_AFTER
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncTokenView(View):
+    """Token view for ASGI, answering as the simplejwt views do
+    (JSON or form data, the same responses and errors) without
+    blocking the event loop."""
+    http_method_names = ['post', 'options']
+    www_authenticate_realm = 'api'
+
+    async def post(self, request):
+        try:
+            data = await self.get_data(self.parse(request))
+        except APIException as exc:
+            if isinstance(exc, AuthenticationFailed):
+                exc.auth_header = (
+                    f'{api_settings.AUTH_HEADER_TYPES[0]} '
+                    f'realm="{self.www_authenticate_realm}"'
+                )
+            response = exception_handler(exc, {})
+            return self.render(
+                response.data,
+                response.status_code,
+                response.items()
+            )
+        return self.render(data)
+
+    def parse(self, request):
+        if request.content_type == 'application/json':
+            return FastJSONParser().parse(BytesIO(request.body))
+        return request.POST
+
+    def render(self, data, status_code=status.HTTP_200_OK, headers=()):
+        response = HttpResponse(
+            FastJSONRenderer().render(data),
+            status=status_code,
+            content_type='application/json',
+        )
+        for header, value in headers:
+            if header.lower() != 'content-type':
+                response[header] = value
+        return response
+
+    async def get_data(self, data):
+        raise NotImplementedError
+
+
+class AsyncTokenObtainPairView(AsyncTokenView):
+    """TokenObtainPairView checking the password in a thread of the
+    password pool (see authentication.pool), with the 'login' work
+    factor. While the pool is saturated the logins are refused at once,
+    with a 503 and a Retry-After, instead of queueing."""
+
+    async def get_data(self, data):
+        pool = get_pool()
+        if pool.is_saturated():
+            raise LoginPoolSaturated
+        serializer = CredentialsSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        username = serializer.validated_data['username']
+        user = await User.objects.filter(
+            **{User.USERNAME_FIELD: username}
+        ).afirst()
+        with hashing_context('login'):
+            try:
+                valid, rehashed = await pool.run(
+                    verify_password,
+                    serializer.validated_data['password'],
+                    user.password if user is not None else None
+                )
+            except PoolSaturated:
+                raise LoginPoolSaturated
+        if not valid or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                TokenObtainPairSerializer.default_error_messages[
+                    'no_active_account'
+                ],
+                'no_active_account'
+            )
+        if rehashed is not None:
+            user.password = rehashed
+            await sync_to_async(user.save_rehashed_password)()
+        refresh = TokenObtainPairSerializer.get_token(user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            await sync_to_async(update_last_login)(None, user)
+        return {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        }
+
+
+class AsyncTokenRefreshView(AsyncTokenView):
+    """TokenRefreshView, its queries run outside of the event loop."""
+
+    async def get_data(self, data):
+        serializer = TokenRefreshSerializer(data=data)
+        try:
+            await sync_to_async(serializer.is_valid)(raise_exception=True)
+        except TokenError as error:
+            raise InvalidToken(error.args[0])
+        return serializer.validated_data
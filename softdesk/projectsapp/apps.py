@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProjectsappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projectsapp'
+
+    def ready(self):
+        from projectsapp import signals  # noqa: F401
@@ -0,0 +1,50 @@
+from threading import Lock
+
+
+class CacheStats:
+    """Hit and miss counters of a cache, for this process."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def as_dict(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+        }
+
+
+_stats = {}
+
+
+def get_stats(name):
+    """Return the CacheStats registered under this name,
+    creating it on first use."""
+    if name not in _stats:
+        _stats[name] = CacheStats(name)
+    return _stats[name]
+
+
+def all_stats():
+    return {name: stats.as_dict() for name, stats in _stats.items()}
@@ -0,0 +1,90 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from projectsapp.models import (
+    Project,
+    Issue,
+    Comment,
+)
+
+
+def issue_counter(status):
+    """Name of the Project counter an issue with this status is counted in."""
+    if status == Issue.FINISHED:
+        return 'closed_issues_count'
+    return 'open_issues_count'
+
+
+def update_project_counters(project_id, **deltas):
+    """Add deltas to the counters of a project and bump its version
+    in a single UPDATE, e.g. update_project_counters(1, open_issues_count=-1).
+    Without deltas only the version is bumped."""
+    deltas = {
+        field: F(field) + delta
+        for field, delta in deltas.items()
+        if delta
+    }
+    Project.objects.filter(pk=project_id).update(
+        version=F('version') + 1,
+        **deltas
+    )
+
+
+def touch_projects(**filters):
+    """Bump the version of the projects matching the filters,
+    e.g. touch_projects(pk=1) or touch_projects(contributors=user)."""
+    return Project.objects.filter(**filters).update(
+        version=F('version') + 1
+    )
+
+
+def update_comments_count(issue_id, delta):
+    if delta:
+        Issue.objects.filter(pk=issue_id).update(
+            comments_count=F('comments_count') + delta
+        )
+
+
+def count_issues(issue_filter):
+    return Coalesce(
+        Subquery(
+            Issue.objects.filter(issue_filter, project=OuterRef('pk'))
+            .order_by()
+            .values('project')
+            .annotate(count=Count('pk'))
+            .values('count'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def rebuild_project_counters(projects=None):
+    """Recompute the issue counters of the given projects (all by default)
+    from the issues table. Returns the number of projects updated."""
+    if projects is None:
+        projects = Project.objects.all()
+    return projects.update(
+        open_issues_count=count_issues(~Q(status=Issue.FINISHED)),
+        closed_issues_count=count_issues(Q(status=Issue.FINISHED)),
+        version=F('version') + 1,
+    )
+
+
+def rebuild_comments_counts(issues=None):
+    """Recompute the comments counter of the given issues (all by default)
+    from the comments table. Returns the number of issues updated."""
+    if issues is None:
+        issues = Issue.objects.all()
+    return issues.update(
+        comments_count=Coalesce(
+            Subquery(
+                Comment.objects.filter(issue=OuterRef('pk'))
+                .order_by()
+                .values('issue')
+                .annotate(count=Count('pk'))
+                .values('count'),
+                output_field=IntegerField()
+            ),
+            0
+        )
+    )
@@ -0,0 +1,114 @@
+import csv
+from projectsapp.models import (
+    Issue,
+    Comment,
+)
+from projectsapp.serializers import datetime_converter
+from softdesk.renderers import FastJSONRenderer
+
+
+# Columns of the exported records. Issue records leave the comment
+# columns empty, comment records the issue ones (except issue_id).
+FIELDS = [
+    'record',
+    'issue_id',
+    'comment_id',
+    'name',
+    'description',
+    'priority',
+    'tag',
+    'status',
+    'author',
+    'assigned_to',
+    'time_created',
+]
+
+ISSUE_LOOKUPS = {
+    'issue_id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'priority': 'priority',
+    'tag': 'tag',
+    'status': 'status',
+    'author': 'author__username',
+    'assigned_to': 'assigned_to__user__username',
+    'time_created': 'time_created',
+}
+
+COMMENT_LOOKUPS = {
+    'issue_id': 'issue_id',
+    'comment_id': 'id',
+    'description': 'description',
+    'author': 'author__username',
+    'time_created': 'time_created',
+}
+
+
+def _rows(queryset, lookups, chunk_size):
+    return queryset.values_list(*lookups.values()).iterator(
+        chunk_size=chunk_size
+    )
+
+
+def iter_records(project, chunk_size=2000):
+    """Yield the issues of a project, each followed by its comments,
+    as flat dicts with the FIELDS keys.
+
+    The issues and the comments are read by two queries, both ordered
+    by issue, and merged, with server-side cursors fetching chunk_size
+    rows at a time: the memory used does not depend on the size of
+    the project."""
+    to_representation = datetime_converter()
+    issues = _rows(
+        Issue.objects.filter(project=project).order_by('pk'),
+        ISSUE_LOOKUPS,
+        chunk_size
+    )
+    comments = _rows(
+        Comment.objects.filter(
+            issue__project=project
+        ).order_by('issue_id', 'time_created', 'pk'),
+        COMMENT_LOOKUPS,
+        chunk_size
+    )
+    empty_issue = dict.fromkeys(FIELDS, None)
+    comment = next(comments, None)
+    for row in issues:
+        record = dict(empty_issue, record='issue')
+        record.update(zip(ISSUE_LOOKUPS, row))
+        record['time_created'] = to_representation(record['time_created'])
+        yield record
+        issue_id = record['issue_id']
+        while comment is not None and comment[0] <= issue_id:
+            # Comments of an issue deleted in the meantime are skipped.
+            if comment[0] == issue_id:
+                record = dict(empty_issue, record='comment')
+                record.update(zip(COMMENT_LOOKUPS, comment))
+                record['comment_id'] = str(record['comment_id'])
+                record['time_created'] = to_representation(
+                    record['time_created']
+                )
+                yield record
+            comment = next(comments, None)
+
+
+def ndjson_lines(records):
+    """Encode the records as newline delimited JSON."""
+    renderer = FastJSONRenderer()
+    for record in records:
+        yield renderer.render(record) + b'\n'
+
+
+class _Echo:
+    """File-like object returning what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(records):
+    """Encode the records as CSV, with a header line."""
+    writer = csv.DictWriter(_Echo(), fieldnames=FIELDS)
+    yield writer.writeheader()
+    for record in records:
+        yield writer.writerow(record)
@@ -0,0 +1,158 @@
+from functools import lru_cache
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+@lru_cache(maxsize=None)
+def indexed_combinations(model, scope):
+    """Sets of fields the queries can filter on, besides the `scope`
+    fields, and still be served by an index: the fields an index
+    starts with after the scope, e.g. {}, {status} and {status,
+    priority} for an index on (project, status, priority)."""
+    combinations = set()
+    for index in model._meta.indexes:
+        fields = [field.lstrip('-') for field in index.fields]
+        if index.condition is not None or fields[:len(scope)] != list(scope):
+            continue
+        fields = fields[len(scope):]
+        for length in range(len(fields) + 1):
+            combinations.add(frozenset(fields[:length]))
+    return combinations
+
+
+class IndexedFilterBackend(BaseFilterBackend):
+    """Filter a list on the query parameters named in the view's
+    `filter_fields` ({param: lookup}, e.g. {'author': 'author__username'})
+    and order it by one of its `ordering_fields` (?ordering=name or
+    ?ordering=-name, the primary key breaking the ties).
+
+    The view always filters on its `filter_scope` fields (e.g. the
+    project of the URL); a combination of filters is only accepted if
+    an index of the model starts with the scope and these fields (see
+    indexed_combinations), so that no combination reads a whole table.
+
+    Several values can be given, separated by commas
+    (?status=To Do,In Progress). Choices are checked, the related
+    objects are looked up first by the rest of the lookup, so that the
+    query compares the foreign key to constants, which the planner can
+    seek in the index."""
+    ordering_param = 'ordering'
+    separator = ','
+
+    def get_filters(self, request, model, view):
+        """Return {lookup: values} of the filters of the request."""
+        filters = {}
+        errors = {}
+        for param, lookup in getattr(view, 'filter_fields', {}).items():
+            if param not in request.query_params:
+                continue
+            values = list(dict.fromkeys(
+                value.strip()
+                for value in request.query_params[param].split(self.separator)
+                if value.strip()
+            ))
+            field = model._meta.get_field(lookup.split('__')[0])
+            choices = dict(field.choices or {})
+            invalid = [value for value in values if value not in choices]
+            if not values:
+                errors[param] = ['This field may not be blank.']
+            elif choices and invalid:
+                errors[param] = [
+                    f'Select a valid choice. {value} is not one of the '
+                    'available choices.'
+                    for value in invalid
+                ]
+            else:
+                filters[lookup] = values
+        if errors:
+            raise ValidationError(errors)
+        return filters
+
+    def check_indexed(self, model, fields, view):
+        scope = tuple(getattr(view, 'filter_scope', ()))
+        combinations = indexed_combinations(model, scope)
+        if frozenset(fields) in combinations:
+            return
+        params = {
+            lookup.split('__')[0]: param
+            for param, lookup in view.filter_fields.items()
+        }
+        supported = sorted(
+            ', '.join(sorted(params[field] for field in combination))
+            for combination in combinations
+            if combination and combination <= params.keys()
+        )
+        raise ValidationError({
+            'filters': [
+                'This combination of filters is not supported, '
+                'use one of: ' + '; '.join(supported) + '.'
+            ]
+        })
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering of the request (ending with the primary
+        key), None if it does not give one."""
+        ordering = request.query_params.get(self.ordering_param)
+        if not ordering:
+            return None
+        name = ordering.lstrip('-')
+        if name not in getattr(view, 'ordering_fields', ()):
+            raise ValidationError({
+                self.ordering_param: [
+                    f'Select a valid choice. {ordering} is not one of the '
+                    'available choices.'
+                ]
+            })
+        direction = '-' if ordering.startswith('-') else ''
+        return (ordering, f'{direction}pk')
+
+    def get_related_pks(self, model, lookup, values):
+        """Return the queryset of the primary keys of the objects
+        related by `lookup` (e.g. author__username) matching the
+        values, None if the lookup is a field of the model."""
+        name, _, rest = lookup.partition('__')
+        if not rest:
+            return None
+        related = model._meta.get_field(name).related_model
+        return related._default_manager.filter(
+            **{f'{rest}__in': values}
+        ).values_list('pk', flat=True)
+
+    def filter_queryset(self, request, queryset, view):
+        filters = self.get_filters(request, queryset.model, view)
+        self.check_indexed(
+            queryset.model,
+            [lookup.split('__')[0] for lookup in filters],
+            view
+        )
+        for lookup, values in filters.items():
+            pks = self.get_related_pks(queryset.model, lookup, values)
+            if pks is not None:
+                values = list(pks)
+            queryset = queryset.filter(
+                **{f'{lookup.split("__")[0]}__in': values}
+            )
+        return self.order_queryset(request, queryset, view)
+
+    async def afilter_queryset(self, request, queryset, view):
+        """filter_queryset for async views."""
+        filters = self.get_filters(request, queryset.model, view)
+        self.check_indexed(
+            queryset.model,
+            [lookup.split('__')[0] for lookup in filters],
+            view
+        )
+        for lookup, values in filters.items():
+            pks = self.get_related_pks(queryset.model, lookup, values)
+            if pks is not None:
+                values = [pk async for pk in pks]
+            queryset = queryset.filter(
+                **{f'{lookup.split("__")[0]}__in': values}
+            )
+        return self.order_queryset(request, queryset, view)
+
+    def order_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering is not None:
+            queryset = queryset.order_by(*ordering)
+        return queryset
@@ -0,0 +1,119 @@
+from datetime import datetime, timezone
+from io import BytesIO
+from timeit import Timer
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from projectsapp.models import (
+    Project,
+    Contributor,
+    Issue,
+    Comment,
+)
+from projectsapp.serializers import (
+    IssueDetailSerializer,
+    CommentSerializer,
+)
+from softdesk.parsers import FastJSONParser
+from softdesk.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the throughput of JSONRenderer and FastJSONRenderer '
+        '(and of their parsers) on large pages of issues and comments. '
+        'The pages are built in memory, the database is not used.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=1000,
+            help='Number of issues and comments per page (1000).'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Number of times each page is encoded and decoded (20).'
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson is not installed, FastJSONRenderer falls back '
+                'to the json module.'
+            ))
+        pages = self.get_pages(options['size'])
+        for name, data in pages.items():
+            self.stdout.write(f'{name} ({options["size"]} results)')
+            expected = JSONRenderer().render(data)
+            if FastJSONRenderer().render(data) != expected:
+                self.stdout.write(self.style.ERROR(
+                    '    FastJSONRenderer output differs from JSONRenderer'
+                ))
+            size = len(expected) / 1024 / 1024
+            for label, renderer, parser in (
+                ('json', JSONRenderer(), JSONParser()),
+                ('fast', FastJSONRenderer(), FastJSONParser()),
+            ):
+                render = self.time(
+                    lambda: renderer.render(data), options['repeat']
+                )
+                parse = self.time(
+                    lambda: parser.parse(BytesIO(expected)),
+                    options['repeat']
+                )
+                self.stdout.write(
+                    f'    {label:<5} render {size / render:8.1f} MB/s'
+                    f'    parse {size / parse:8.1f} MB/s'
+                )
+
+    def time(self, func, repeat):
+        """Best time of one call, in seconds."""
+        return min(Timer(func).repeat(repeat=repeat, number=1))
+
+    def get_pages(self, size):
+        now = datetime.now(timezone.utc)
+        user = get_user_model()(id=1, username='author')
+        project = Project(id=1, name='project', author=user)
+        contributor = Contributor(id=1, user=user, project=project)
+        issues = [
+            Issue(
+                id=index,
+                name=f'issue {index}',
+                description='Description of the issue — ünïcode. ' * 4,
+                priority=Issue.MEDIUM,
+                tag=Issue.BUG,
+                status=Issue.IN_PROGRESS,
+                project=project,
+                assigned_to=contributor,
+                author=user,
+                time_created=now,
+                comments_count=index,
+            )
+            for index in range(1, size + 1)
+        ]
+        comments = [
+            Comment(
+                description='A comment on the issue. ' * 4,
+                issue=issues[index % size],
+                author=user,
+                time_created=now,
+            )
+            for index in range(size)
+        ]
+        return {
+            'issues': self.get_page(IssueDetailSerializer(issues, many=True)),
+            'comments': self.get_page(CommentSerializer(comments, many=True)),
+        }
+
+    def get_page(self, serializer):
+        return {
+            'count': len(serializer.instance),
+            'next': 'http://testserver/api/?limit=10&offset=10',
+            'previous': None,
+            'results': serializer.data,
+        }
@@ -0,0 +1,157 @@
+from timeit import Timer
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from projectsapp.models import (
+    Project,
+    Contributor,
+    Issue,
+    Comment,
+)
+from projectsapp.serializers import (
+    ProjectListSerializer,
+    IssueListSerializer,
+    CommentSerializer,
+    ProjectValuesSerializer,
+    IssueValuesSerializer,
+    CommentValuesSerializer,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the throughput of the list ModelSerializers and of the '
+        'values() serializers used by the GET lists, query included. '
+        'The rows are created in a transaction which is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[10, 100, 1000],
+            help='Page sizes (10 100 1000).'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Number of times each page is serialized (20).'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['sizes'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, sizes, repeat):
+        project, issue = self.create_rows(max(sizes))
+        lists = (
+            (
+                'projects',
+                lambda: Project.objects.select_related('author'),
+                ProjectListSerializer,
+                ProjectValuesSerializer,
+            ),
+            (
+                'issues',
+                lambda: project.issues.select_related(
+                    'author', 'assigned_to__user'
+                ),
+                IssueListSerializer,
+                IssueValuesSerializer,
+            ),
+            (
+                'comments',
+                lambda: issue.comments.select_related('author'),
+                CommentSerializer,
+                CommentValuesSerializer,
+            ),
+        )
+        for name, get_queryset, serializer_class, values_class in lists:
+            self.stdout.write(name)
+            for size in sizes:
+                def serialize():
+                    return serializer_class(
+                        get_queryset().order_by('pk')[:size],
+                        many=True
+                    ).data
+
+                def serialize_values():
+                    return values_class(
+                        get_queryset().order_by('pk').values(
+                            *values_class.get_lookups()
+                        )[:size]
+                    ).data
+
+                if serialize_values() != serialize():
+                    self.stdout.write(self.style.ERROR(
+                        f'    {size}: the outputs differ'
+                    ))
+                model = self.time(serialize, repeat)
+                values = self.time(serialize_values, repeat)
+                self.stdout.write(
+                    f'    {size:>5} rows'
+                    f'    serializer {size / model:9.0f} rows/s'
+                    f'    values {size / values:9.0f} rows/s'
+                    f'    x{model / values:.1f}'
+                )
+
+    def time(self, func, repeat):
+        """Best time of one call, in seconds."""
+        return min(Timer(func).repeat(repeat=repeat, number=1))
+
+    def create_rows(self, size):
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            User(
+                username=f'benchmark-{index}',
+                email=f'benchmark-{index}@example.com',
+                birthdate='2000-01-01',
+                password='!',
+            )
+            for index in range(2)
+        )
+        projects = Project.objects.bulk_create(
+            Project(
+                name=f'benchmark {index}',
+                description='description',
+                author=users[0],
+                type=Project.BACKEND,
+            )
+            for index in range(size)
+        )
+        project = projects[0]
+        contributor = Contributor.objects.create(
+            user=users[1],
+            project=project,
+        )
+        issues = Issue.objects.bulk_create(
+            Issue(
+                name=f'issue {index}',
+                description='description',
+                tag=Issue.BUG,
+                project=project,
+                author=users[0],
+                assigned_to=contributor if index % 2 else None,
+            )
+            for index in range(size)
+        )
+        issue = issues[0]
+        Comment.objects.bulk_create(
+            Comment(
+                description=f'comment {index}',
+                issue=issue,
+                author=users[1],
+            )
+            for index in range(size)
+        )
+        return project, issue
@@ -0,0 +1,121 @@
+import random
+from time import perf_counter
+from timeit import Timer
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from projectsapp import search
+from projectsapp.models import (
+    Project,
+    Issue,
+    Comment,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the FTS5 search and the LIKE fallback on a project with '
+        'many comments. The rows are created in a transaction which is '
+        'rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--comments',
+            type=int,
+            default=1000000,
+            help='Number of comments (1000000), spread over 1000 issues.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of times each query is run (5).'
+        )
+
+    def handle(self, *args, **options):
+        if not search.is_indexed(connection):
+            self.stdout.write(self.style.WARNING(
+                'The database has no FTS5 index, only the fallback '
+                'is measured.'
+            ))
+        try:
+            with transaction.atomic():
+                self.run(options['comments'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, comments, repeat):
+        start = perf_counter()
+        project = self.create_rows(comments)
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f'{comments} comments created and indexed in {elapsed:.1f}s'
+        )
+        for query in ('rare', 'common', 'common word0', 'word12*'):
+            self.stdout.write(f'q={query!r}')
+            terms = search.get_terms(query)
+            backends = [('fallback', search.fallback_search)]
+            if search.is_indexed(connection):
+                backends.insert(0, ('fts5', search.fts5_search))
+            for label, backend in backends:
+                best = min(Timer(
+                    lambda: backend(project.pk, terms, 20)
+                ).repeat(repeat=repeat, number=1))
+                self.stdout.write(f'    {label:<9} {best * 1000:9.1f} ms')
+
+    def create_rows(self, size):
+        """A project with 1000 issues and `size` comments made of words
+        of a 10000 words vocabulary, 'common' in one comment out of
+        ten and 'rare' in one out of 100000."""
+        rng = random.Random(0)
+        vocabulary = [f'word{index}' for index in range(10000)]
+        User = get_user_model()
+        user = User.objects.create(
+            username='benchmark',
+            email='benchmark@example.com',
+            birthdate='2000-01-01',
+            password='!',
+        )
+        project = Project.objects.create(
+            name='benchmark',
+            description='description',
+            author=user,
+            type=Project.BACKEND,
+        )
+        issues = Issue.objects.bulk_create(
+            Issue(
+                name=f'issue {index}',
+                description=' '.join(rng.choices(vocabulary, k=20)),
+                tag=Issue.BUG,
+                project=project,
+                author=user,
+            )
+            for index in range(1000)
+        )
+
+        def description(index):
+            words = rng.choices(vocabulary, k=12)
+            if not index % 10:
+                words.append('common')
+            if not index % 100000:
+                words.append('rare')
+            return ' '.join(words)
+
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    description=description(index),
+                    issue=issues[index % len(issues)],
+                    author=user,
+                )
+                for index in range(size)
+            ),
+            batch_size=5000
+        )
+        return project
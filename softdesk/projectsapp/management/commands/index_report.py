@@ -0,0 +1,209 @@
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.request import Request
+from projectsapp.models import (
+    Project,
+    Contributor,
+    Issue,
+    Comment,
+)
+from projectsapp.filters import indexed_combinations
+from projectsapp.pagination import KeysetPagination
+from projectsapp.views import (
+    ProjectViewSet,
+    ContributorViewSet,
+    IssueViewSet,
+    CommentViewSet,
+)
+
+
+# Plan lines showing that a whole table is read. A scan following an
+# index (e.g. SQLite's "SCAN t USING INDEX i") is not flagged: the
+# paginated lists stop it after one page.
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT ROW)\S+$'),
+    'postgresql': re.compile(r'\bSeq Scan\b'),
+    'mysql': re.compile(r'\btype\W+ALL\b'),
+}
+# Plan lines showing a sort that no index provides.
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (ORDER BY|RIGHT PART)'),
+    'postgresql': re.compile(r'\bSort\b'),
+    'mysql': re.compile(r'Using filesort'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN on the querysets of the projectsapp viewsets and '
+        'flag the ones reading whole tables. Needs some data: the '
+        'querysets are built for the first issue having comments, '
+        'as its author.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Exit with an error if a full scan is found.'
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the plan of every query, not only flagged ones.'
+        )
+
+    def handle(self, *args, **options):
+        comment = Comment.objects.select_related(
+            'issue__project', 'author'
+        ).order_by('time_created').first()
+        if comment is None:
+            raise CommandError('The report needs at least one comment.')
+        self.issue = comment.issue
+        self.project = comment.issue.project
+        self.user = comment.author
+
+        full_scan_pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        sort_pattern = SORT_PATTERNS.get(connection.vendor)
+        if full_scan_pattern is None:
+            raise CommandError(
+                f'No plan patterns for the {connection.vendor} backend.'
+            )
+
+        full_scans = 0
+        for name, queryset in self.get_querysets():
+            plan = queryset.explain()
+            scans = [
+                line for line in plan.splitlines()
+                if full_scan_pattern.search(line)
+            ]
+            sorts = [
+                line for line in plan.splitlines()
+                if sort_pattern.search(line)
+            ]
+            if scans:
+                full_scans += 1
+                self.stdout.write(self.style.ERROR(f'FULL SCAN  {name}'))
+            elif sorts:
+                self.stdout.write(self.style.WARNING(f'SORT       {name}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'OK         {name}'))
+            if scans or sorts or options['verbose_plans']:
+                for line in plan.splitlines():
+                    self.stdout.write(f'    {line}')
+
+        if full_scans and options['strict']:
+            raise CommandError(f'{full_scans} queries read whole tables.')
+
+    def get_view(self, viewset, action, query_params=None, **kwargs):
+        request = Request(RequestFactory().get('/', query_params))
+        request.user = self.user
+        view = viewset()
+        view.action = action
+        view.request = request
+        view.kwargs = kwargs
+        view.format_kwarg = None
+        return view
+
+    def keyset_page(self, view, queryset):
+        ordering = KeysetPagination().get_ordering(
+            view.request, queryset, view
+        )
+        return queryset.order_by(*ordering)[:KeysetPagination.page_size]
+
+    def get_filtered_issues(self, project_pk):
+        """Filtered lists of issues, one per combination of filters
+        accepted by IssueViewSet."""
+        values = {
+            'status': Issue.TO_DO,
+            'priority': Issue.HIGH,
+            'tag': Issue.BUG,
+            'assigned_to': self.user.username,
+            'author': self.user.username,
+        }
+        params = {
+            lookup.split('__')[0]: param
+            for param, lookup in IssueViewSet.filter_fields.items()
+        }
+        combinations = sorted(
+            sorted(params[field] for field in combination)
+            for combination in indexed_combinations(
+                Issue, IssueViewSet.filter_scope
+            )
+            if combination and combination <= params.keys()
+        )
+        for combination in combinations:
+            view = self.get_view(
+                IssueViewSet,
+                'list',
+                {param: values[param] for param in combination},
+                project_pk=project_pk
+            )
+            queryset = view.filter_queryset(view.get_queryset())
+            yield (
+                f'issues: filtered on {", ".join(combination)} (keyset)',
+                self.keyset_page(view, queryset)
+            )
+
+    def get_querysets(self):
+        project_pk = self.project.pk
+        issue_pk = self.issue.pk
+
+        view = self.get_view(ProjectViewSet, 'list')
+        yield 'projects: list (keyset)', self.keyset_page(
+            view, view.get_queryset()
+        )
+        view = self.get_view(ProjectViewSet, 'retrieve')
+        yield 'projects: retrieve', view.get_queryset().filter(pk=project_pk)
+        yield 'projects: retrieve contributors', (
+            view.get_contributors_queryset().filter(project=project_pk)
+        )
+
+        yield 'membership: role', Contributor.objects.filter(
+            user_id=self.user.pk,
+            project_id=project_pk,
+        ).values_list('role', flat=True)[:1]
+
+        view = self.get_view(
+            ContributorViewSet, 'list', project_pk=project_pk
+        )
+        yield 'contributors: list (keyset)', self.keyset_page(
+            view, view.get_queryset()
+        )
+        yield 'contributors: count', view.get_queryset().values('pk')
+
+        view = self.get_view(IssueViewSet, 'list', project_pk=project_pk)
+        queryset = view.get_queryset()
+        yield 'issues: list (keyset)', self.keyset_page(view, queryset)
+        yield 'issues: count', queryset.values('pk')
+        yield 'issues: open (keyset)', self.keyset_page(
+            view, queryset.exclude(status=Issue.FINISHED)
+        )
+        yield 'issues: by status', queryset.filter(status=Issue.TO_DO)
+        yield from self.get_filtered_issues(project_pk)
+        yield 'issues: assigned to', Issue.objects.filter(
+            assigned_to__in=Contributor.objects.filter(
+                user=self.user
+            ).values('pk'),
+            status=Issue.TO_DO
+        )
+        view = self.get_view(
+            IssueViewSet, 'retrieve', project_pk=project_pk
+        )
+        yield 'issues: retrieve', view.get_queryset().filter(pk=issue_pk)
+
+        view = self.get_view(
+            CommentViewSet,
+            'list',
+            project_pk=project_pk,
+            issue_pk=issue_pk
+        )
+        queryset = view.get_queryset()
+        yield 'comments: list (keyset)', self.keyset_page(view, queryset)
+        yield 'comments: count', queryset.values('pk')
+
+        yield 'projects: of a user', Project.objects.filter(
+            contributors=self.user
+        )
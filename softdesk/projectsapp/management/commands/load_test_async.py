@@ -0,0 +1,211 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from statistics import median, quantiles
+from time import perf_counter, sleep
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+from django.utils.module_loading import import_string
+from authentication.serializers import TokenObtainPairSerializer
+from projectsapp.models import Contributor
+
+
+CLIENT_ADDRESS = '192.0.2.1'
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the issue list of a project with many concurrent slow '
+        'clients, served by the async view in one ASGI worker (one event '
+        'loop) and by the sync view in a WSGI worker with a fixed number '
+        'of threads. The applications are called in this process: a slow '
+        'client takes --delay seconds to send its request, during which '
+        'it holds a WSGI thread but not the event loop. Reads the '
+        'existing data, nothing is written.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clients',
+            type=int,
+            default=1000,
+            help='Number of concurrent clients (1000).'
+        )
+        parser.add_argument(
+            '--delay',
+            type=float,
+            default=1.0,
+            help='Seconds a client takes to send its request (1.0).'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=16,
+            help='Threads of the WSGI worker (16).'
+        )
+        parser.add_argument(
+            '--project',
+            type=int,
+            help='Id of the project (the first one by default).'
+        )
+
+    def handle(self, *args, **options):
+        contributors = Contributor.objects.select_related(
+            'user'
+        ).order_by('project_id', 'pk')
+        if options['project'] is not None:
+            contributors = contributors.filter(project_id=options['project'])
+        contributor = contributors.first()
+        if contributor is None:
+            raise CommandError('No project with a contributor was found.')
+        token = TokenObtainPairSerializer.get_token(contributor.user)
+        authorization = f'Bearer {token.access_token}'
+        path = f'/projects/{contributor.project_id}/issues/'
+        self.stdout.write(
+            f'{options["clients"]} clients, {options["delay"]}s each to '
+            f'send their request, GET /api{path}'
+        )
+        # A sync only middleware runs the whole request in the thread of
+        # the sync code, one request at a time (the debug toolbar's is,
+        # it is not used in production): both applications go without.
+        middleware = [
+            name
+            for name in settings.MIDDLEWARE
+            if getattr(import_string(name), 'async_capable', False)
+        ]
+        for name in settings.MIDDLEWARE:
+            if name not in middleware:
+                self.stdout.write(f'Without the sync only {name}')
+        with override_settings(MIDDLEWARE=middleware):
+            self.compare(path, authorization, options)
+
+    def compare(self, path, authorization, options):
+        for name, run, url in (
+            (
+                'ASGI, async view, 1 event loop',
+                self.run_asgi,
+                f'/api/async{path}',
+            ),
+            (
+                f'WSGI, sync view, {options["threads"]} threads',
+                self.run_wsgi,
+                f'/api{path}',
+            ),
+        ):
+            start = perf_counter()
+            results = run(url, authorization, options)
+            self.report(name, results, perf_counter() - start)
+
+    def report(self, name, results, elapsed):
+        latencies = sorted(latency for status, latency in results)
+        errors = sum(status != 200 for status, latency in results)
+        p95 = quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0
+        self.stdout.write(
+            f'{name}\n'
+            f'    {len(results) / elapsed:8.1f} requests/s'
+            f'    latency median {median(latencies):6.2f}s'
+            f'    p95 {p95:6.2f}s'
+            f'    max {latencies[-1]:6.2f}s'
+            f'    errors {errors}'
+        )
+
+    def run_asgi(self, path, authorization, options):
+        application = get_asgi_application()
+        delay = options['delay']
+
+        async def client():
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': b'',
+                'root_path': '',
+                'headers': [
+                    (b'host', b'localhost'),
+                    (b'authorization', authorization.encode()),
+                ],
+                # Not in INTERNAL_IPS: no debug toolbar.
+                'client': (CLIENT_ADDRESS, 0),
+                'server': ('localhost', 80),
+            }
+            sent = False
+            response = {}
+
+            async def receive():
+                nonlocal sent
+                if sent:
+                    # No disconnection: wait until cancelled.
+                    await asyncio.Event().wait()
+                sent = True
+                await asyncio.sleep(delay)
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    response['status'] = message['status']
+
+            start = perf_counter()
+            await application(scope, receive, send)
+            return response.get('status'), perf_counter() - start
+
+        async def run():
+            return await asyncio.gather(*(
+                client() for _ in range(options['clients'])
+            ))
+
+        return asyncio.run(run())
+
+    def run_wsgi(self, path, authorization, options):
+        application = get_wsgi_application()
+        delay = options['delay']
+
+        def client(start):
+            # The thread waits for the slow request.
+            sleep(delay)
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'SCRIPT_NAME': '',
+                'PATH_INFO': path,
+                'QUERY_STRING': '',
+                'SERVER_NAME': 'localhost',
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'localhost',
+                'REMOTE_ADDR': CLIENT_ADDRESS,
+                'HTTP_AUTHORIZATION': authorization,
+                'wsgi.version': (1, 0),
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': BytesIO(),
+                'wsgi.errors': BytesIO(),
+                'wsgi.multithread': True,
+                'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            response = {}
+
+            def start_response(status, headers, exc_info=None):
+                response['status'] = int(status.split()[0])
+
+            body = application(environ, start_response)
+            try:
+                for _ in body:
+                    pass
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+            return response.get('status'), perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            # The clients all connect at once, the threads serve them
+            # in turn.
+            start = perf_counter()
+            return list(executor.map(
+                client, [start] * options['clients']
+            ))
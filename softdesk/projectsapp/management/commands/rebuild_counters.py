@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from projectsapp import response_cache
+from projectsapp.models import (
+    Project,
+    Issue,
+)
+from projectsapp.counters import (
+    rebuild_project_counters,
+    rebuild_comments_counts,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the denormalized counters '
+        '(open and closed issues of each project, '
+        'comments of each issue).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'project_ids',
+            nargs='*',
+            type=int,
+            help='Only rebuild these projects (all by default).'
+        )
+
+    def handle(self, *args, **options):
+        projects = Project.objects.all()
+        issues = Issue.objects.all()
+        if options['project_ids']:
+            projects = projects.filter(pk__in=options['project_ids'])
+            issues = issues.filter(project__in=options['project_ids'])
+        with transaction.atomic():
+            projects_count = rebuild_project_counters(projects)
+            issues_count = rebuild_comments_counts(issues)
+            response_cache.invalidate(
+                *projects.values_list('pk', flat=True)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt issue counters of {projects_count} projects '
+                f'and comment counters of {issues_count} issues.'
+            )
+        )
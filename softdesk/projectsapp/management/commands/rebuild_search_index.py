@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from projectsapp import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Recreate the full-text index of the issues and comments '
+        '(SQLite with FTS5 only) and index all the rows again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database to index ("default").'
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        with transaction.atomic(using=connection.alias):
+            if not search.create_index(connection):
+                raise CommandError(
+                    'The database does not support FTS5, '
+                    'the search uses LIKE queries.'
+                )
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT count(*) FROM {search.KEY_TABLE}')
+                count = cursor.fetchone()[0]
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {count} issues and comments.')
+        )
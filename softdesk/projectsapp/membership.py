@@ -0,0 +1,158 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from projectsapp.models import Contributor
+from projectsapp.cache import get_stats
+
+
+# Cached answer for users who are not contributors of the project.
+NOT_CONTRIBUTOR = ''
+# Returned by peek_role when the role is not known without a query.
+UNKNOWN = object()
+
+stats = get_stats('membership')
+
+
+def get_cache():
+    return caches[settings.MEMBERSHIP_CACHE_ALIAS]
+
+
+def make_key(user_id, project_id):
+    return f'membership:{user_id}:{project_id}'
+
+
+def _get_memo(request):
+    # Memoize on the Django HttpRequest so that the DRF Request wrapping
+    # it and the permission classes share the same answers.
+    http_request = getattr(request, '_request', request)
+    try:
+        return http_request._project_roles
+    except AttributeError:
+        http_request._project_roles = {}
+        return http_request._project_roles
+
+
+def fetch_role(user_id, project_id):
+    """Return the role of a user in a project, from the shared cache
+    or from the database on a miss."""
+    cache = get_cache()
+    key = make_key(user_id, project_id)
+    role = cache.get(key)
+    if role is not None:
+        stats.hit()
+        return role or None
+    stats.miss()
+    roles = Contributor.objects.filter(
+        user_id=user_id,
+        project_id=project_id,
+    ).values_list('role', flat=True)[:1]
+    role = next(iter(roles), None)
+    cache.set(key, role or NOT_CONTRIBUTOR)
+    return role
+
+
+async def afetch_role(user_id, project_id):
+    """fetch_role for async views."""
+    cache = get_cache()
+    key = make_key(user_id, project_id)
+    role = await cache.aget(key)
+    if role is not None:
+        stats.hit()
+        return role or None
+    stats.miss()
+    role = await Contributor.objects.filter(
+        user_id=user_id,
+        project_id=project_id,
+    ).values_list('role', flat=True).afirst()
+    await cache.aset(key, role or NOT_CONTRIBUTOR)
+    return role
+
+
+def get_role(request, project_id):
+    """Return the role of the request user in a project
+    (Contributor.AUTHOR or Contributor.CONTRIBUTOR),
+    or None if the user is not one of its contributors.
+
+    A single row is looked up through the (user, project) unique index.
+    The answer is kept in the membership cache, shared between requests,
+    and memoized for the lifetime of the request."""
+    user = request.user
+    if not user or not user.is_authenticated:
+        return None
+    memo = _get_memo(request)
+    key = str(project_id)
+    if key not in memo:
+        memo[key] = fetch_role(user.pk, project_id)
+    return memo[key]
+
+
+async def aget_role(request, project_id):
+    """get_role for async views, sharing the memo of the request."""
+    user = request.user
+    if not user or not user.is_authenticated:
+        return None
+    memo = _get_memo(request)
+    key = str(project_id)
+    if key not in memo:
+        memo[key] = await afetch_role(user.pk, project_id)
+    return memo[key]
+
+
+def peek_role(request, project_id):
+    """Like get_role, but without querying the database: return UNKNOWN
+    if the role is neither memoized nor in the membership cache."""
+    user = request.user
+    if not user or not user.is_authenticated:
+        return None
+    memo = _get_memo(request)
+    key = str(project_id)
+    if key not in memo:
+        role = get_cache().get(make_key(user.pk, project_id))
+        if role is None:
+            return UNKNOWN
+        stats.hit()
+        memo[key] = role or None
+    return memo[key]
+
+
+def remember_role(request, project_id, role):
+    """Store a role loaded along with other data (see
+    projectsapp.resolvers), so that later checks need no query."""
+    user = request.user
+    _get_memo(request)[str(project_id)] = role
+    get_cache().set(make_key(user.pk, project_id), role or NOT_CONTRIBUTOR)
+
+
+async def aremember_role(request, project_id, role):
+    """remember_role for async views."""
+    user = request.user
+    _get_memo(request)[str(project_id)] = role
+    await get_cache().aset(
+        make_key(user.pk, project_id),
+        role or NOT_CONTRIBUTOR
+    )
+
+
+def is_contributor(request, project_id):
+    return get_role(request, project_id) is not None
+
+
+async def ais_contributor(request, project_id):
+    return await aget_role(request, project_id) is not None
+
+
+def invalidate(*memberships):
+    """Forget the cached roles of these (user_id, project_id) pairs.
+
+    The entries are deleted right away and again once the transaction
+    commits, so that a concurrent request cannot cache the old role
+    in between."""
+    keys = [
+        make_key(user_id, project_id)
+        for user_id, project_id in memberships
+    ]
+    if not keys:
+        return
+    cache = get_cache()
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
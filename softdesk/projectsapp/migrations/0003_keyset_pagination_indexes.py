@@ -0,0 +1,25 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsapp', '0002_alter_issue_assigned_to'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['issue', 'time_created', 'id'], name='comment_issue_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'time_created', 'id'], name='issue_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['time_created', 'id'], name='project_created_idx'),
+        ),
+    ]
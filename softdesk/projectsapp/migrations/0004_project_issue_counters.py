@@ -0,0 +1,49 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:24
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_issues(Issue, issue_filter):
+    return Coalesce(
+        Subquery(
+            Issue.objects.filter(issue_filter, project=OuterRef('pk'))
+            .order_by()
+            .values('project')
+            .annotate(count=Count('pk'))
+            .values('count'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Project = apps.get_model('projectsapp', 'Project')
+    Issue = apps.get_model('projectsapp', 'Issue')
+    Project.objects.update(
+        open_issues_count=count_issues(Issue, ~Q(status='Finished')),
+        closed_issues_count=count_issues(Issue, Q(status='Finished')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsapp', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='closed_issues_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='open_issues_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:25
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comments_count(apps, schema_editor):
+    Issue = apps.get_model('projectsapp', 'Issue')
+    Comment = apps.get_model('projectsapp', 'Comment')
+    Issue.objects.update(
+        comments_count=Coalesce(
+            Subquery(
+                Comment.objects.filter(issue=OuterRef('pk'))
+                .order_by()
+                .values('issue')
+                .annotate(count=Count('pk'))
+                .values('count'),
+                output_field=IntegerField()
+            ),
+            0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsapp', '0004_project_issue_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+    ]
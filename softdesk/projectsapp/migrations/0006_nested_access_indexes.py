@@ -0,0 +1,29 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsapp', '0005_issue_comments_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contributor',
+            index=models.Index(fields=['project', 'user'], name='contributor_project_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'status'], name='issue_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(condition=models.Q(('status', 'Finished'), _negated=True), fields=['project', 'time_created', 'id'], name='issue_project_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(condition=models.Q(('assigned_to__isnull', False)), fields=['assigned_to', 'status'], name='issue_assignee_status_idx'),
+        ),
+    ]
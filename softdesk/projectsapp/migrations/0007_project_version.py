@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsapp', '0006_nested_access_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='version',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
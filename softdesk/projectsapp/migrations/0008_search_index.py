@@ -0,0 +1,138 @@
+from django.db import migrations
+
+
+# The SQL of the index as it was when this migration was written, the
+# current one is in projectsapp.search (rebuild_search_index).
+CREATE = [
+    "CREATE TABLE projectsapp_search_key "
+    "(rowid INTEGER PRIMARY KEY, document TEXT NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE projectsapp_search USING fts5("
+    "project, name, description, "
+    "issue_id UNINDEXED, comment_id UNINDEXED, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER projectsapp_search_issue_insert "
+    "AFTER INSERT ON projectsapp_issue BEGIN "
+    "INSERT INTO projectsapp_search_key (document) VALUES ('i' || NEW.id); "
+    "INSERT INTO projectsapp_search "
+    "(rowid, project, name, description, issue_id, comment_id) "
+    "VALUES (last_insert_rowid(), NEW.project_id, NEW.name, "
+    "NEW.description, NEW.id, NULL); "
+    "END",
+    "CREATE TRIGGER projectsapp_search_issue_update "
+    "AFTER UPDATE OF name, description, project_id "
+    "ON projectsapp_issue "
+    "WHEN OLD.name IS NOT NEW.name "
+    "OR OLD.description IS NOT NEW.description "
+    "OR OLD.project_id IS NOT NEW.project_id BEGIN "
+    "UPDATE projectsapp_search SET project = NEW.project_id, "
+    "name = NEW.name, description = NEW.description "
+    "WHERE rowid = (SELECT rowid FROM projectsapp_search_key "
+    "WHERE document = 'i' || OLD.id); "
+    "END",
+    "CREATE TRIGGER projectsapp_search_issue_delete "
+    "AFTER DELETE ON projectsapp_issue BEGIN "
+    "DELETE FROM projectsapp_search "
+    "WHERE rowid = (SELECT rowid FROM projectsapp_search_key "
+    "WHERE document = 'i' || OLD.id); "
+    "DELETE FROM projectsapp_search_key WHERE document = 'i' || OLD.id; "
+    "END",
+    "CREATE TRIGGER projectsapp_search_comment_insert "
+    "AFTER INSERT ON projectsapp_comment BEGIN "
+    "INSERT INTO projectsapp_search_key (document) VALUES ('c' || NEW.id); "
+    "INSERT INTO projectsapp_search "
+    "(rowid, project, name, description, issue_id, comment_id) "
+    "VALUES (last_insert_rowid(), "
+    "(SELECT project_id FROM projectsapp_issue WHERE id = NEW.issue_id), "
+    "NULL, NEW.description, NEW.issue_id, NEW.id); "
+    "END",
+    "CREATE TRIGGER projectsapp_search_comment_update "
+    "AFTER UPDATE OF description, issue_id ON projectsapp_comment "
+    "WHEN OLD.description IS NOT NEW.description "
+    "OR OLD.issue_id IS NOT NEW.issue_id BEGIN "
+    "UPDATE projectsapp_search SET project = "
+    "(SELECT project_id FROM projectsapp_issue WHERE id = NEW.issue_id), "
+    "description = NEW.description, issue_id = NEW.issue_id "
+    "WHERE rowid = (SELECT rowid FROM projectsapp_search_key "
+    "WHERE document = 'c' || OLD.id); "
+    "END",
+    "CREATE TRIGGER projectsapp_search_comment_delete "
+    "AFTER DELETE ON projectsapp_comment BEGIN "
+    "DELETE FROM projectsapp_search "
+    "WHERE rowid = (SELECT rowid FROM projectsapp_search_key "
+    "WHERE document = 'c' || OLD.id); "
+    "DELETE FROM projectsapp_search_key WHERE document = 'c' || OLD.id; "
+    "END",
+]
+
+POPULATE = [
+    "INSERT INTO projectsapp_search_key (document) "
+    "SELECT 'i' || issue.id FROM projectsapp_issue issue",
+    "INSERT INTO projectsapp_search_key (document) "
+    "SELECT 'c' || comment.id FROM projectsapp_comment comment",
+    "INSERT INTO projectsapp_search "
+    "(rowid, project, name, description, issue_id, comment_id) "
+    "SELECT search_key.rowid, issue.project_id, issue.name, "
+    "issue.description, issue.id, NULL "
+    "FROM projectsapp_issue issue "
+    "JOIN projectsapp_search_key search_key "
+    "ON search_key.document = 'i' || issue.id",
+    "INSERT INTO projectsapp_search "
+    "(rowid, project, name, description, issue_id, comment_id) "
+    "SELECT search_key.rowid, issue.project_id, NULL, "
+    "comment.description, issue.id, comment.id "
+    "FROM projectsapp_comment comment "
+    "JOIN projectsapp_issue issue ON issue.id = comment.issue_id "
+    "JOIN projectsapp_search_key search_key "
+    "ON search_key.document = 'c' || comment.id",
+    "INSERT INTO projectsapp_search (projectsapp_search) "
+    "VALUES ('optimize')",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS projectsapp_search_issue_insert",
+    "DROP TRIGGER IF EXISTS projectsapp_search_issue_update",
+    "DROP TRIGGER IF EXISTS projectsapp_search_issue_delete",
+    "DROP TRIGGER IF EXISTS projectsapp_search_comment_insert",
+    "DROP TRIGGER IF EXISTS projectsapp_search_comment_update",
+    "DROP TRIGGER IF EXISTS projectsapp_search_comment_delete",
+    "DROP TABLE IF EXISTS projectsapp_search",
+    "DROP TABLE IF EXISTS projectsapp_search_key",
+]
+
+
+def supports_fts5(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    # Nothing is created on databases without FTS5, the search
+    # falls back to LIKE queries.
+    connection = schema_editor.connection
+    if not supports_fts5(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP + CREATE + POPULATE:
+            cursor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for statement in DROP:
+                cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsapp', '0007_project_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.5 on 2026-10-18 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projectsapp', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='issue',
+            name='issue_project_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'status', 'priority', 'tag', 'time_created', 'id'], name='issue_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'assigned_to', 'status', 'priority', 'tag', 'time_created', 'id'], name='issue_project_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'author', 'status', 'priority', 'tag', 'time_created', 'id'], name='issue_project_author_idx'),
+        ),
+    ]
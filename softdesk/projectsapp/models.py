@@ -1,6 +1,6 @@
 import uuid
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 
 
 class Project(models.Model):
@@ -39,6 +39,32 @@ class Project(models.Model):
     time_created = models.DateTimeField(
         auto_now_add=True
     )
+    # Maintained by projectsapp.signals, rebuilt by the
+    # rebuild_counters management command.
+    open_issues_count = models.IntegerField(
+        default=0,
+        editable=False
+    )
+    closed_issues_count = models.IntegerField(
+        default=0,
+        editable=False
+    )
+    # Bumped by projectsapp.signals whenever the project, its
+    # contributors, issues or comments change. Validates the ETags
+    # of the API responses.
+    version = models.IntegerField(
+        default=0,
+        editable=False
+    )
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the project list.
+            models.Index(
+                fields=['time_created', 'id'],
+                name='project_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -69,10 +95,24 @@ class Contributor(models.Model):
 
     class Meta:
         unique_together = ('user', 'project')
+        indexes = [
+            # Contributors of a project, and membership checks
+            # starting from the project.
+            models.Index(
+                fields=['project', 'user'],
+                name='contributor_project_user_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.user.username} ({self.role})'
 
+    def save(self, *args, **kwargs):
+        # The version of the project is bumped by a post_save receiver,
+        # it must be committed along with the contributor.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class Issue(models.Model):
     # Priority
@@ -148,10 +188,74 @@ class Issue(models.Model):
     time_created = models.DateTimeField(
         auto_now_add=True
     )
+    # Maintained by projectsapp.signals, rebuilt by the
+    # rebuild_counters management command.
+    comments_count = models.IntegerField(
+        default=0,
+        editable=False
+    )
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the issues of a project.
+            models.Index(
+                fields=['project', 'time_created', 'id'],
+                name='issue_project_created_idx'
+            ),
+            # Issues of a project by status, priority and tag, as
+            # filtered by the list (see IssueViewSet.filter_fields),
+            # in keyset order when all of them are filtered on.
+            models.Index(
+                fields=[
+                    'project', 'status', 'priority', 'tag',
+                    'time_created', 'id',
+                ],
+                name='issue_project_status_idx'
+            ),
+            # Issues of a project assigned to a contributor, or created
+            # by a user, with the same filters.
+            models.Index(
+                fields=[
+                    'project', 'assigned_to', 'status', 'priority', 'tag',
+                    'time_created', 'id',
+                ],
+                name='issue_project_assignee_idx'
+            ),
+            models.Index(
+                fields=[
+                    'project', 'author', 'status', 'priority', 'tag',
+                    'time_created', 'id',
+                ],
+                name='issue_project_author_idx'
+            ),
+            # Open issues of a project, in keyset order.
+            models.Index(
+                fields=['project', 'time_created', 'id'],
+                condition=~models.Q(status='Finished'),
+                name='issue_project_open_idx'
+            ),
+            # Issues assigned to a contributor, by status.
+            models.Index(
+                fields=['assigned_to', 'status'],
+                condition=models.Q(assigned_to__isnull=False),
+                name='issue_assignee_status_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # The stored row is locked by a pre_save receiver and the
+        # project counters are updated by post_save receivers, they
+        # must be committed along with the issue.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    @property
+    def is_open(self):
+        return self.status != self.FINISHED
+
 
 class Comment(models.Model):
     id = models.UUIDField(
@@ -177,5 +281,27 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the comments of an issue.
+            models.Index(
+                fields=['issue', 'time_created', 'id'],
+                name='comment_issue_created_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.description
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember which issue counts the stored row.
+        instance._counted_in = instance.__dict__.get('issue_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The issue counter is updated by post_save receivers, it must
+        # be committed along with the comment.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
@@ -0,0 +1,339 @@
+import json
+from base64 import b64decode, b64encode
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (seek) pagination.
+
+    Orders the queryset on `ordering` (by default ('time_created', 'pk'))
+    and filters on the position of the last item of the previous page
+    instead of using an OFFSET, so that every page costs the same
+    whatever its depth. No total count is computed.
+
+    The view can override the ordering with a `keyset_ordering`
+    attribute, and a request with its filter backends' get_ordering().
+    The last field must be unique (usually 'pk')."""
+
+    ordering = ('time_created', 'pk')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views."""
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([item async for item in queryset])
+
+    def get_page_queryset(self, queryset, request, view):
+        """Return the queryset of the page, with one more item telling
+        whether there is a next page, or None without pagination."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.position, self.reverse = self.decode_cursor(
+            request, queryset.model
+        )
+
+        if self.reverse:
+            ordering = [self._invert(field) for field in self.ordering]
+        else:
+            ordering = list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(ordering, self.position)
+            )
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+
+        if self.reverse:
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'previous': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        # An ordering asked for by the request, e.g. with the
+        # IndexedFilterBackend, comes first.
+        for backend in getattr(view, 'filter_backends', ()):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return tuple(ordering)
+        return tuple(getattr(view, 'keyset_ordering', self.ordering))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Empty page reached backwards: restart from the beginning.
+            return remove_query_param(
+                self.base_url, self.cursor_query_param
+            )
+        return self.encode_cursor(
+            self.get_position(self.page[-1]),
+            reverse=False
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return None
+        return self.encode_cursor(
+            self.get_position(self.page[0]),
+            reverse=True
+        )
+
+    def get_position(self, item):
+        """Return the values of the ordering fields for an item,
+        which can be a model instance or a `.values()` row."""
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if isinstance(item, dict):
+                value = item[name]
+            else:
+                value = getattr(item, name)
+            position.append(value)
+        return position
+
+    def get_position_filter(self, ordering, position):
+        """Build the lexicographic "after this position" filter:
+        (a > x) OR (a = x AND b > y) OR ..."""
+        position_filter = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            position_filter |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return position_filter
+
+    def decode_cursor(self, request, model):
+        """Return the position (converted to the types of the ordering
+        fields of the model) and the direction of the cursor of the
+        request, raise NotFound if it is not a valid one."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            data = json.loads(b64decode(encoded.encode('ascii')))
+            position = data['p']
+            reverse = bool(data.get('r', False))
+            if (
+                not isinstance(position, list)
+                or len(position) != len(self.ordering)
+            ):
+                raise ValueError
+            position = [
+                self._to_python(model, field, self._decode_value(value))
+                for field, value in zip(self.ordering, position)
+            ]
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            UnicodeError,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        data = {'p': [self._encode_value(value) for value in position]}
+        if reverse:
+            data['r'] = True
+        encoded = b64encode(
+            json.dumps(data, separators=(',', ':')).encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def _encode_value(self, value):
+        # Keep the full microsecond precision of datetimes, which
+        # DjangoJSONEncoder would truncate.
+        if isinstance(value, datetime):
+            return {'dt': value.isoformat()}
+        if isinstance(value, (int, str)) or value is None:
+            return value
+        return str(value)
+
+    def _decode_value(self, value):
+        if isinstance(value, dict):
+            parsed = parse_datetime(value['dt'])
+            if parsed is None:
+                raise ValueError
+            return parsed
+        return value
+
+    def _to_python(self, model, field, value):
+        # A crafted cursor could hold any JSON value.
+        name = field.lstrip('-')
+        if name == 'pk':
+            model_field = model._meta.pk
+        else:
+            model_field = model._meta.get_field(name)
+        value = model_field.to_python(value)
+        if value is None:
+            raise ValueError
+        return value
+
+    def _invert(self, field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class OffsetPagination(LimitOffsetPagination):
+    """LimitOffsetPagination, which async views can use too."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views."""
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [
+            item
+            async for item in queryset[self.offset:self.offset + self.limit]
+        ]
+
+
+class SelectablePagination(BasePagination):
+    """Delegate to offset or keyset pagination.
+
+    The view picks its default with the `pagination_mode` attribute
+    ('offset' or 'keyset'). A client can switch for one request with
+    `?pagination=keyset` or `?pagination=offset`; sending a `cursor`
+    always selects keyset pagination. Offset pages keep the
+    LimitOffsetPagination response shape (count, next, previous,
+    results)."""
+
+    offset_pagination_class = OffsetPagination
+    keyset_pagination_class = KeysetPagination
+    mode_query_param = 'pagination'
+    default_mode = 'offset'
+    modes = ('offset', 'keyset')
+
+    def get_mode(self, request, view):
+        if (
+            self.keyset_pagination_class.cursor_query_param
+            in request.query_params
+        ):
+            return 'keyset'
+        mode = request.query_params.get(self.mode_query_param)
+        if mode in self.modes:
+            return mode
+        return getattr(view, 'pagination_mode', self.default_mode)
+
+    def get_paginator(self, request, view):
+        if self.get_mode(request, view) == 'keyset':
+            return self.keyset_pagination_class()
+        return self.offset_pagination_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request, view)
+        page = self.paginator.paginate_queryset(queryset, request, view=view)
+        self.display_page_controls = getattr(
+            self.paginator, 'display_page_controls', False
+        )
+        return page
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views."""
+        self.paginator = self.get_paginator(request, view)
+        page = await self.paginator.apaginate_queryset(
+            queryset, request, view=view
+        )
+        self.display_page_controls = getattr(
+            self.paginator, 'display_page_controls', False
+        )
+        return page
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.offset_pagination_class().get_paginated_response_schema(
+            schema
+        )
+
+    def to_html(self):
+        return self.paginator.to_html()
@@ -3,26 +3,38 @@ from rest_framework.permissions import BasePermission
 from projectsapp.models import (
     Project,
 )
+from projectsapp.membership import is_contributor, ais_contributor
 
 
 class IsAuthor(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return request.user.id == obj.author.id
+        return request.user.id == obj.author_id
 
 
 class IsProjectCreator(BasePermission):
     def has_permission(self, request, view):
-        project = get_object_or_404(Project, pk=view.kwargs['project_pk'])
-        return request.user == project.author
+        if hasattr(view, 'get_project'):
+            # Loaded once and cached by the view.
+            project = view.get_project()
+        else:
+            project = get_object_or_404(Project, pk=view.kwargs['project_pk'])
+        return request.user.pk == project.author_id
 
 
 class IsContributor(BasePermission):
     message = "You must be a contributor to access this project."
 
     def has_object_permission(self, request, view, obj):
+        self.add_contact(obj)
+        return is_contributor(request, obj.pk)
+
+    async def ahas_object_permission(self, request, view, obj):
+        self.add_contact(obj)
+        return await ais_contributor(request, obj.pk)
+
+    def add_contact(self, obj):
         if obj.author.can_be_contacted:
             self.message += (
                 " Contact the project owner to "
                 f"ask for an access : {obj.author.email}"
             )
-        return request.user.id in obj.contributors.values_list('id', flat=True)
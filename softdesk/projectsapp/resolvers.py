@@ -0,0 +1,95 @@
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
+from projectsapp.models import (
+    Project,
+    Contributor,
+    Issue,
+)
+from projectsapp.membership import remember_role, aremember_role
+
+
+def membership_role(request, project_ref='pk'):
+    """Subquery of the role of the request user in the project
+    referenced by `project_ref`."""
+    return Subquery(
+        Contributor.objects.filter(
+            project=OuterRef(project_ref),
+            user_id=request.user.pk,
+        ).values('role')[:1]
+    )
+
+
+def get_project_queryset(request):
+    return Project.objects.select_related(
+        'author'
+    ).annotate(
+        membership_role=membership_role(request)
+    )
+
+
+def get_issue_queryset(request):
+    return Issue.objects.select_related(
+        'project__author'
+    ).annotate(
+        membership_role=membership_role(request, 'project')
+    )
+
+
+def resolve_project(request, project_pk):
+    """Load a project, with its author and the role of the request user
+    in it (None if not a contributor) in a single query.
+    Raise Http404 if it does not exist."""
+    try:
+        project = get_project_queryset(request).get(pk=project_pk)
+    except (Project.DoesNotExist, ValueError):
+        raise Http404
+    remember_role(request, project_pk, project.membership_role)
+    return project
+
+
+async def aresolve_project(request, project_pk):
+    """resolve_project for async views."""
+    try:
+        project = await get_project_queryset(request).aget(pk=project_pk)
+    except (Project.DoesNotExist, ValueError):
+        raise Http404
+    await aremember_role(request, project_pk, project.membership_role)
+    return project
+
+
+def resolve_issue(request, project_pk, issue_pk):
+    """Check the project -> issue path of a nested URL in a single query.
+
+    Return the issue, with its project loaded, if it belongs to the
+    project and the request user is a contributor of the project.
+    Raise Http404 otherwise. The role found is remembered by the
+    membership service for the rest of the request."""
+    try:
+        issue = get_issue_queryset(request).get(
+            pk=issue_pk,
+            project_id=project_pk
+        )
+    except (Issue.DoesNotExist, ValueError):
+        raise Http404
+    remember_role(request, project_pk, issue.membership_role)
+    return check_issue(issue)
+
+
+async def aresolve_issue(request, project_pk, issue_pk):
+    """resolve_issue for async views."""
+    try:
+        issue = await get_issue_queryset(request).aget(
+            pk=issue_pk,
+            project_id=project_pk
+        )
+    except (Issue.DoesNotExist, ValueError):
+        raise Http404
+    await aremember_role(request, project_pk, issue.membership_role)
+    return check_issue(issue)
+
+
+def check_issue(issue):
+    if issue.membership_role is None:
+        raise Http404
+    issue.project.membership_role = issue.membership_role
+    return issue
@@ -0,0 +1,120 @@
+import hashlib
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from projectsapp.cache import get_stats
+
+
+# Scope of the project list, shared by all the projects.
+PROJECT_LIST = 'projects'
+
+stats = get_stats('responses')
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _generation_key(scope):
+    return f'responses:{scope}:generation'
+
+
+def _index_key(scope):
+    return f'responses:{scope}:index'
+
+
+def get_generation(scope):
+    """Return the current generation of a scope. Invalidating a scope
+    starts a new generation, the entries of the previous ones are never
+    read again (even if stored by a request that started before)."""
+    cache = get_cache()
+    key = _generation_key(scope)
+    generation = cache.get(key)
+    if generation is None:
+        # A random token: a generation lost by the cache cannot
+        # come back.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def make_key(scope, generation, request, role):
+    """Key of the response to this request, for a user with this role.
+    The generation must be read before loading any data."""
+    variant = '|'.join([
+        request.get_full_path(),
+        request.accepted_media_type,
+        role,
+    ])
+    digest = hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()
+    return f'responses:{scope}:{generation}:{digest}'
+
+
+def get(scope, key):
+    """Return the cached entry (a dict with the content, the content type
+    and the ETag of the response) or None."""
+    cache = get_cache()
+    entry = cache.get(key)
+    if entry is None:
+        stats.miss()
+        return None
+    stats.hit()
+    index = cache.get(_index_key(scope)) or []
+    if index[-1:] != [key]:
+        # Most recently used last.
+        if key in index:
+            index.remove(key)
+        index.append(key)
+        cache.set(_index_key(scope), index)
+    return entry
+
+
+def store(scope, key, response):
+    """Store a rendered response, evicting the least recently used
+    entries of the scope above RESPONSE_CACHE_MAX_ENTRIES."""
+    cache = get_cache()
+    index = cache.get(_index_key(scope)) or []
+    if key in index:
+        index.remove(key)
+    index.append(key)
+    evicted = index[:-settings.RESPONSE_CACHE_MAX_ENTRIES]
+    index = index[-settings.RESPONSE_CACHE_MAX_ENTRIES:]
+    if evicted:
+        cache.delete_many(evicted)
+    cache.set(key, {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': response.get('ETag'),
+    })
+    cache.set(_index_key(scope), index)
+
+
+def invalidate(*scopes):
+    """Drop the cached responses of these scopes (project ids or
+    PROJECT_LIST).
+
+    As for the membership cache, it is done right away and again once
+    the transaction commits, so that a response rendered from the old
+    data in between is not served. Only the processes sharing the cache
+    backend see it, the others serve their entries until they expire."""
+    scopes = {str(scope) for scope in scopes}
+    if not scopes:
+        return
+    cache = get_cache()
+
+    def clear():
+        cache.set_many(
+            {
+                _generation_key(scope): uuid.uuid4().hex
+                for scope in scopes
+            },
+            timeout=None
+        )
+        keys = [_index_key(scope) for scope in scopes]
+        for index in cache.get_many(keys).values():
+            keys.extend(index)
+        cache.delete_many(keys)
+
+    clear()
+    transaction.on_commit(clear)
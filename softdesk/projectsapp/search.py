@@ -0,0 +1,371 @@
+import re
+import uuid
+from django.db import connections
+from django.db.models import Q
+from django.utils.html import escape
+from projectsapp.models import (
+    Issue,
+    Comment,
+)
+
+
+# Full-text index of the issues (name and description) and comments
+# (description), on SQLite with FTS5. The index stores its own copy of
+# the text, for the snippets, and is kept in sync by triggers, so that
+# bulk_create, queryset updates and cascades are indexed too.
+# Each indexed row has a key ('i<issue id>' or 'c<comment id>'), whose
+# rowid is the rowid of the row in the FTS5 table: unlike the implicit
+# rowid of the comment table, it is not renumbered by VACUUM.
+# The comments are not moved along when the project of an issue changes
+# (the API does not allow it), rebuild_search_index reindexes them.
+TABLE = 'projectsapp_search'
+KEY_TABLE = 'projectsapp_search_key'
+
+# bm25 weights of the columns: project (the filter), name, description.
+WEIGHTS = '0.0, 10.0, 1.0'
+# The text is HTML-escaped, only the MARK tags are markup.
+MARK = ('<mark>', '</mark>')
+ELLIPSIS = '…'
+# Number of tokens of the snippets.
+SNIPPET_TOKENS = 16
+
+ISSUE_KEY = "'i' || {row}.id"
+COMMENT_KEY = "'c' || {row}.id"
+KEY_ROWID = f"(SELECT rowid FROM {KEY_TABLE} WHERE document = {{key}})"
+COMMENT_PROJECT = (
+    "(SELECT project_id FROM projectsapp_issue WHERE id = {row}.issue_id)"
+)
+
+
+def _insert(key, project, name, description, issue_id, comment_id):
+    return (
+        f"INSERT INTO {KEY_TABLE} (document) VALUES ({key}); "
+        f"INSERT INTO {TABLE} "
+        "(rowid, project, name, description, issue_id, comment_id) "
+        f"VALUES (last_insert_rowid(), {project}, {name}, {description}, "
+        f"{issue_id}, {comment_id});"
+    )
+
+
+def _delete(key):
+    return (
+        f"DELETE FROM {TABLE} WHERE rowid = {KEY_ROWID.format(key=key)}; "
+        f"DELETE FROM {KEY_TABLE} WHERE document = {key};"
+    )
+
+
+CREATE_TABLES = [
+    f"CREATE TABLE {KEY_TABLE} "
+    "(rowid INTEGER PRIMARY KEY, document TEXT NOT NULL UNIQUE)",
+    f"CREATE VIRTUAL TABLE {TABLE} USING fts5("
+    "project, name, description, "
+    "issue_id UNINDEXED, comment_id UNINDEXED, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+]
+
+CREATE_TRIGGERS = [
+    "CREATE TRIGGER projectsapp_search_issue_insert "
+    "AFTER INSERT ON projectsapp_issue BEGIN "
+    + _insert(
+        ISSUE_KEY.format(row='NEW'),
+        'NEW.project_id',
+        'NEW.name',
+        'NEW.description',
+        'NEW.id',
+        'NULL',
+    )
+    + " END",
+    "CREATE TRIGGER projectsapp_search_issue_update "
+    "AFTER UPDATE OF name, description, project_id "
+    "ON projectsapp_issue "
+    "WHEN OLD.name IS NOT NEW.name "
+    "OR OLD.description IS NOT NEW.description "
+    "OR OLD.project_id IS NOT NEW.project_id BEGIN "
+    f"UPDATE {TABLE} SET project = NEW.project_id, name = NEW.name, "
+    "description = NEW.description "
+    f"WHERE rowid = {KEY_ROWID.format(key=ISSUE_KEY.format(row='OLD'))}; "
+    "END",
+    "CREATE TRIGGER projectsapp_search_issue_delete "
+    "AFTER DELETE ON projectsapp_issue BEGIN "
+    + _delete(ISSUE_KEY.format(row='OLD'))
+    + " END",
+    "CREATE TRIGGER projectsapp_search_comment_insert "
+    "AFTER INSERT ON projectsapp_comment BEGIN "
+    + _insert(
+        COMMENT_KEY.format(row='NEW'),
+        COMMENT_PROJECT.format(row='NEW'),
+        'NULL',
+        'NEW.description',
+        'NEW.issue_id',
+        'NEW.id',
+    )
+    + " END",
+    "CREATE TRIGGER projectsapp_search_comment_update "
+    "AFTER UPDATE OF description, issue_id ON projectsapp_comment "
+    "WHEN OLD.description IS NOT NEW.description "
+    "OR OLD.issue_id IS NOT NEW.issue_id BEGIN "
+    f"UPDATE {TABLE} SET project = {COMMENT_PROJECT.format(row='NEW')}, "
+    "description = NEW.description, issue_id = NEW.issue_id "
+    f"WHERE rowid = {KEY_ROWID.format(key=COMMENT_KEY.format(row='OLD'))}; "
+    "END",
+    "CREATE TRIGGER projectsapp_search_comment_delete "
+    "AFTER DELETE ON projectsapp_comment BEGIN "
+    + _delete(COMMENT_KEY.format(row='OLD'))
+    + " END",
+]
+
+POPULATE = [
+    f"INSERT INTO {KEY_TABLE} (document) "
+    f"SELECT {ISSUE_KEY.format(row='issue')} FROM projectsapp_issue issue",
+    f"INSERT INTO {KEY_TABLE} (document) "
+    f"SELECT {COMMENT_KEY.format(row='comment')} "
+    "FROM projectsapp_comment comment",
+    f"INSERT INTO {TABLE} "
+    "(rowid, project, name, description, issue_id, comment_id) "
+    "SELECT search_key.rowid, issue.project_id, issue.name, "
+    "issue.description, issue.id, NULL "
+    "FROM projectsapp_issue issue "
+    f"JOIN {KEY_TABLE} search_key "
+    f"ON search_key.document = {ISSUE_KEY.format(row='issue')}",
+    f"INSERT INTO {TABLE} "
+    "(rowid, project, name, description, issue_id, comment_id) "
+    "SELECT search_key.rowid, issue.project_id, NULL, "
+    "comment.description, issue.id, comment.id "
+    "FROM projectsapp_comment comment "
+    "JOIN projectsapp_issue issue ON issue.id = comment.issue_id "
+    f"JOIN {KEY_TABLE} search_key "
+    f"ON search_key.document = {COMMENT_KEY.format(row='comment')}",
+    f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS projectsapp_search_issue_insert",
+    "DROP TRIGGER IF EXISTS projectsapp_search_issue_update",
+    "DROP TRIGGER IF EXISTS projectsapp_search_issue_delete",
+    "DROP TRIGGER IF EXISTS projectsapp_search_comment_insert",
+    "DROP TRIGGER IF EXISTS projectsapp_search_comment_update",
+    "DROP TRIGGER IF EXISTS projectsapp_search_comment_delete",
+    f"DROP TABLE IF EXISTS {TABLE}",
+    f"DROP TABLE IF EXISTS {KEY_TABLE}",
+]
+
+SEARCH = (
+    f"SELECT issue_id, comment_id, "
+    f"highlight({TABLE}, 1, %s, %s), "
+    f"snippet({TABLE}, 2, %s, %s, %s, {SNIPPET_TOKENS}), "
+    f"bm25({TABLE}, {WEIGHTS}) AS score "
+    f"FROM {TABLE} WHERE {TABLE} MATCH %s "
+    "ORDER BY score LIMIT %s OFFSET %s"
+)
+
+
+def supports_fts5(connection):
+    """Whether the database is SQLite built with FTS5."""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sqlite_compileoption_used('ENABLE_FTS5')"
+        )
+        return bool(cursor.fetchone()[0])
+
+
+def create_index(connection, populate=True):
+    """Create the FTS5 index and its triggers (dropping them first),
+    and index the existing rows. Return False, and do nothing, if the
+    database does not support FTS5."""
+    if not supports_fts5(connection):
+        return False
+    with connection.cursor() as cursor:
+        for statement in DROP + CREATE_TABLES + CREATE_TRIGGERS:
+            cursor.execute(statement)
+        if populate:
+            for statement in POPULATE:
+                cursor.execute(statement)
+    _indexed.pop(connection.alias, None)
+    return True
+
+
+def drop_index(connection):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for statement in DROP:
+                cursor.execute(statement)
+    _indexed.pop(connection.alias, None)
+
+
+# {database alias: whether the FTS5 index exists}, checked once.
+_indexed = {}
+
+
+def is_indexed(connection):
+    if connection.alias not in _indexed:
+        _indexed[connection.alias] = (
+            connection.vendor == 'sqlite'
+            and TABLE in connection.introspection.table_names()
+        )
+    return _indexed[connection.alias]
+
+
+def get_terms(query):
+    """Words of a search query. A word ending with * matches
+    the words starting with it."""
+    return re.findall(r'\w+\*?', query)
+
+
+def match_expression(project_id, terms):
+    """FTS5 query of the rows of a project containing all the terms,
+    in their name or description. The terms are quoted, the operators
+    of the FTS5 syntax are not available to the clients."""
+    phrases = ' '.join(
+        '"{}"{}'.format(term.rstrip('*'), '*' if term.endswith('*') else '')
+        for term in terms
+    )
+    return f'project : "{project_id}" AND {{name description}} : ({phrases})'
+
+
+def _result(issue_id, comment_id, name, snippet, score):
+    if comment_id is not None:
+        comment_id = str(uuid.UUID(comment_id))
+    return {
+        'type': 'issue' if comment_id is None else 'comment',
+        'issue_id': issue_id,
+        'comment_id': comment_id,
+        'name': name,
+        'snippet': snippet,
+        'score': score,
+    }
+
+
+def _sentinels():
+    """Markers put by FTS5 around the matches, replaced by the MARK
+    tags once the text is escaped. Random, so that the indexed text
+    cannot contain them."""
+    token = uuid.uuid4().hex
+    return f'\x02{token}\x02', f'\x03{token}\x03'
+
+
+def _escape_marked(text, sentinels):
+    if text is None:
+        return None
+    text = escape(text)
+    for sentinel, tag in zip(sentinels, MARK):
+        text = text.replace(sentinel, tag)
+    return text
+
+
+def fts5_search(project_id, terms, limit, offset=0, using='default'):
+    sentinels = _sentinels()
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            SEARCH,
+            [
+                *sentinels,
+                *sentinels,
+                ELLIPSIS,
+                match_expression(project_id, terms),
+                limit,
+                offset,
+            ]
+        )
+        return [
+            _result(
+                issue_id,
+                comment_id,
+                _escape_marked(name, sentinels),
+                _escape_marked(snippet, sentinels),
+                -score
+            )
+            for issue_id, comment_id, name, snippet, score in cursor
+        ]
+
+
+def _terms_pattern(terms):
+    return re.compile(
+        r'(?<!\w)(?:{})'.format(
+            '|'.join(re.escape(term.rstrip('*')) for term in terms)
+        ),
+        re.IGNORECASE
+    )
+
+
+def highlight(text, terms):
+    """Escape the text and put the words starting with a term between
+    the MARK tags."""
+    parts = []
+    end = 0
+    for match in _terms_pattern(terms).finditer(text):
+        parts.append(escape(text[end:match.start()]))
+        parts.append(MARK[0] + escape(match.group()) + MARK[1])
+        end = match.end()
+    parts.append(escape(text[end:]))
+    return ''.join(parts)
+
+
+def excerpt(text, terms, size=120):
+    """Part of the text around the first term found, highlighted."""
+    found = _terms_pattern(terms).search(text)
+    start = max(found.start() - size // 2, 0) if found else 0
+    prefix = ELLIPSIS if start else ''
+    suffix = ELLIPSIS if start + size < len(text) else ''
+    return prefix + highlight(text[start:start + size], terms) + suffix
+
+
+def fallback_search(project_id, terms, limit, offset=0, using='default'):
+    """Portable search, with LIKE (icontains): every row of the project
+    is scanned, the results are ordered by date, newest first."""
+    issue_filter = Q()
+    comment_filter = Q()
+    for term in terms:
+        term = term.rstrip('*')
+        issue_filter &= (
+            Q(name__icontains=term) | Q(description__icontains=term)
+        )
+        comment_filter &= Q(description__icontains=term)
+    end = offset + limit
+    issues = Issue.objects.using(using).filter(
+        issue_filter, project=project_id
+    ).order_by('-time_created', '-pk').values_list(
+        'time_created', 'id', 'name', 'description'
+    )[:end]
+    comments = Comment.objects.using(using).filter(
+        comment_filter, issue__project=project_id
+    ).order_by('-time_created', '-pk').values_list(
+        'time_created', 'issue_id', 'id', 'description'
+    )[:end]
+    rows = sorted(
+        [
+            (time_created, issue_id, None, name, description)
+            for time_created, issue_id, name, description in issues
+        ] + [
+            (time_created, issue_id, comment_id.hex, None, description)
+            for time_created, issue_id, comment_id, description in comments
+        ],
+        key=lambda row: row[0],
+        reverse=True
+    )[offset:end]
+    return [
+        _result(
+            issue_id,
+            comment_id,
+            name and highlight(name, terms),
+            excerpt(description, terms),
+            None
+        )
+        for time_created, issue_id, comment_id, name, description in rows
+    ]
+
+
+def search_project(project_id, query, limit=20, offset=0, using='default'):
+    """Issues and comments of a project containing all the words of
+    the query, best matches first with FTS5, newest first otherwise.
+
+    Each result has the type ('issue' or 'comment'), the issue_id,
+    the comment_id, the name of the issues and a snippet of the
+    description, HTML-escaped with the matches between <mark> tags."""
+    terms = get_terms(query)
+    if not terms:
+        return []
+    if is_indexed(connections[using]):
+        return fts5_search(project_id, terms, limit, offset, using)
+    return fallback_search(project_id, terms, limit, offset, using)
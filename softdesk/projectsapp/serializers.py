@@ -1,12 +1,20 @@
 from django.contrib.auth import get_user_model
 from rest_framework.serializers import (
+    Serializer,
     ModelSerializer,
-    SerializerMethodField,
     ValidationError,
+    Field,
     StringRelatedField,
     SlugRelatedField,
     ReadOnlyField,
+    DateTimeField,
+    IntegerField,
+    ChoiceField,
+    ListField,
+    CharField,
 )
+from rest_framework.settings import api_settings
+from rest_framework import ISO_8601
 from projectsapp.models import (
     Contributor,
     Project,
@@ -19,21 +27,6 @@ from authentication.serializers import UserSerializer
 User = get_user_model()
 
 
-class FieldMixin:
-    """Get all fields. This avoids writing each field manually.
-    Use '__all__' in serailizer and add the extra_fields attribute
-    along with the other fields you want to pass.
-    (extra_fields must be a list)"""
-
-    def get_field_names(self, declared_fields, info):
-        extra_fields = getattr(self.Meta, 'extra_fields', None)
-        fields = super().get_field_names(declared_fields, info)
-        if extra_fields:
-            return fields + extra_fields
-        else:
-            return fields
-
-
 class ContributorListSerializer(ModelSerializer):
     user = StringRelatedField(read_only=True)
 
@@ -82,7 +75,7 @@ class IssueListSerializer(ModelSerializer):
 
     class Meta:
         model = Issue
-        exclude = ('time_created', 'project')
+        exclude = ('time_created', 'project', 'comments_count')
         extra_kwargs = {
             'description': {'write_only': True},
             'tag': {'write_only': True},
@@ -90,25 +83,82 @@ class IssueListSerializer(ModelSerializer):
         }
 
     def validate_assigned_to(self, value):
-        return Contributor.objects.get(
+        contributor = Contributor.objects.get(
             project_id=self.context['view'].kwargs['project_pk'],
             user=value,
         )
+        # Rendered in the response, the user is already loaded.
+        contributor.user = value
+        return contributor
 
 
-class IssueDetailSerializer(FieldMixin, ModelSerializer):
+class IssueDetailSerializer(ModelSerializer):
     author = StringRelatedField(read_only=True)
     project = StringRelatedField(read_only=True)
     assigned_to = ContributorSlugRelatedField(slug_field='username')
-    comments_count = SerializerMethodField()
 
     class Meta:
         model = Issue
         fields = '__all__'
-        extra_fields = ['comments_count']
 
-    def get_comments_count(self, instance):
-        return instance.comments_count
+
+class AssigneeField(Field):
+    """Contributor given by the username of its user, looked up in the
+    `assignees` of the context ({username: contributor}), which the
+    bulk endpoints load for all the items at once."""
+    default_error_messages = {
+        'does_not_exist':
+            'Contributor object with user_username={value} '
+            'is not a contributor of this project.'
+    }
+
+    def to_internal_value(self, data):
+        try:
+            return self.context['assignees'][str(data)]
+        except KeyError:
+            self.fail('does_not_exist', value=data)
+
+    def to_representation(self, value):
+        return value.user.username
+
+
+class IssueBulkCreateSerializer(ModelSerializer):
+    """An item of IssueViewSet.bulk POST."""
+    assigned_to = AssigneeField(required=False, allow_null=True)
+
+    class Meta:
+        model = Issue
+        fields = [
+            'name',
+            'description',
+            'priority',
+            'tag',
+            'status',
+            'assigned_to',
+        ]
+
+
+class IssueBulkUpdateSerializer(Serializer):
+    """An item of IssueViewSet.bulk PATCH. The issues of the batch
+    are in the `issues` of the context ({id: issue})."""
+    id = IntegerField()
+    status = ChoiceField(choices=Issue.STATUS_CHOICES, required=False)
+    priority = ChoiceField(choices=Issue.PRIORITY_CHOICES, required=False)
+    assigned_to = AssigneeField(required=False, allow_null=True)
+
+    def validate_id(self, value):
+        issue = self.context['issues'].get(value)
+        if issue is None:
+            raise ValidationError('Issue not found in this project.')
+        if issue.author_id != self.context['request'].user.id:
+            raise ValidationError(
+                'You do not have permission to perform this action.'
+            )
+        seen = self.context.setdefault('seen', set())
+        if value in seen:
+            raise ValidationError('This issue is already in the batch.')
+        seen.add(value)
+        return value
 
 
 class ProjectListSerializer(ModelSerializer):
@@ -116,31 +166,30 @@ class ProjectListSerializer(ModelSerializer):
 
     class Meta:
         model = Project
-        exclude = ('time_created', 'contributors')
+        exclude = (
+            'time_created',
+            'contributors',
+            'open_issues_count',
+            'closed_issues_count',
+            'version',
+        )
         extra_kwargs = {
             'description': {'write_only': True}
         }
 
 
-class ProjectDetailSerailizer(FieldMixin, ModelSerializer):
+class ProjectDetailSerailizer(ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
+    # Prefetched, and possibly capped, by ProjectViewSet.get_queryset.
     contributors = ContributorListSerializer(
-        source='contributor_set',
+        source='inline_contributors',
         many=True
     )
-    open_issues_count = SerializerMethodField()
-    closed_issues_count = SerializerMethodField()
 
     class Meta:
         model = Project
-        fields = '__all__'
-        extra_fields = ['open_issues_count', 'closed_issues_count']
-
-    def get_open_issues_count(self, instance):
-        return instance.open_issues_count
-
-    def get_closed_issues_count(self, instance):
-        return instance.closed_issues_count
+        # The version is sent as the ETag of the responses.
+        exclude = ('version',)
 
 
 class ContributorDetailSerializer(ModelSerializer):
@@ -188,3 +237,121 @@ class AddContributorSerializer(ModelSerializer):
             )
 
         return super().create(validated_data)
+
+
+class BulkContributorsSerializer(Serializer):
+    """Body of ContributorViewSet.bulk: a list of usernames, validated
+    as the list of their users, in order and without duplicates.
+
+    The users are loaded by one query, the maximum length of the list
+    is the `bulk_max_size` of the context."""
+    users = ListField(child=CharField())
+
+    def validate_users(self, value):
+        max_size = self.context['bulk_max_size']
+        if len(value) > max_size:
+            raise ValidationError(
+                f'Ensure this field has no more than {max_size} elements.'
+            )
+        users = User.objects.in_bulk(value, field_name='username')
+        errors = {
+            index: [f'User object with username={username} does not exist.']
+            for index, username in enumerate(value)
+            if username not in users
+        }
+        if errors:
+            raise ValidationError(errors)
+        return [users[username] for username in dict.fromkeys(value)]
+
+
+class ValuesListSerializer:
+    """Read-only serializer of `.values()` rows, for the GET lists.
+
+    Gives the output of a list ModelSerializer without going through
+    the DRF fields. `fields` maps each output field, in order, to its
+    values() lookup. `converters` holds the functions giving the
+    representation of the values that are not already JSON types."""
+    fields = {}
+    converters = {}
+
+    def __init__(self, instance, many=True, context=None):
+        self.instance = instance
+        self.context = context or {}
+
+    @classmethod
+    def get_lookups(cls):
+        return list(cls.fields.values())
+
+    def get_converters(self):
+        return self.converters
+
+    @property
+    def data(self):
+        fields = self.fields.items()
+        converters = self.get_converters().items()
+        data = []
+        for row in self.instance:
+            item = {field: row[lookup] for field, lookup in fields}
+            for field, converter in converters:
+                if item[field] is not None:
+                    item[field] = converter(item[field])
+            data.append(item)
+        return data
+
+
+class ProjectValuesSerializer(ValuesListSerializer):
+    """Output of ProjectListSerializer."""
+    fields = {
+        'id': 'id',
+        'author': 'author__username',
+        'name': 'name',
+        'type': 'type',
+    }
+
+
+class IssueValuesSerializer(ValuesListSerializer):
+    """Output of IssueListSerializer."""
+    fields = {
+        'id': 'id',
+        'author': 'author__username',
+        'assigned_to': 'assigned_to__user__username',
+        'name': 'name',
+        'priority': 'priority',
+    }
+
+
+class CommentValuesSerializer(ValuesListSerializer):
+    """Output of CommentSerializer."""
+    fields = {
+        'id': 'id',
+        'author': 'author__username',
+        'issue': 'issue__name',
+        'description': 'description',
+        'time_created': 'time_created',
+    }
+
+    def get_converters(self):
+        return {
+            'id': str,
+            'time_created': datetime_converter(),
+        }
+
+
+def datetime_converter():
+    """Return DateTimeField().to_representation, or a faster equivalent
+    for the ISO 8601 format, looking up the time zone once."""
+    field = DateTimeField()
+    time_zone = field.default_timezone()
+    if (
+        time_zone is None
+        or api_settings.DATETIME_FORMAT is None
+        or api_settings.DATETIME_FORMAT.lower() != ISO_8601
+    ):
+        return field.to_representation
+
+    def to_representation(value):
+        value = value.astimezone(time_zone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return to_representation
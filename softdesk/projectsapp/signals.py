@@ -0,0 +1,278 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db.models.signals import (
+    pre_save,
+    post_save,
+    post_delete,
+    m2m_changed,
+)
+from django.conf import settings
+from django.dispatch import receiver
+from projectsapp.models import (
+    Project,
+    Contributor,
+    Issue,
+    Comment,
+)
+from projectsapp import membership, response_cache
+from projectsapp.counters import (
+    issue_counter,
+    update_project_counters,
+    update_comments_count,
+    touch_projects,
+)
+
+
+def deleted_along(origin, *models):
+    """True if the deletion was started from one of these models,
+    i.e. the parent holding the counter is being deleted as well."""
+    model = getattr(origin, 'model', type(origin))
+    return issubclass(model, models)
+
+
+class InvalidationBatch:
+    """Projects to touch and memberships to forget, collected by
+    batched_invalidation()."""
+
+    def __init__(self):
+        self.projects = set()
+        self.memberships = set()
+
+    def flush(self):
+        if self.projects:
+            touch_projects(pk__in=self.projects)
+            response_cache.invalidate(*self.projects)
+        membership.invalidate(*self.memberships)
+
+
+_batch = ContextVar('invalidation_batch', default=None)
+
+
+@contextmanager
+def batched_invalidation():
+    """Collect the project versions to bump, cached responses to drop and
+    cached roles to forget by the signals sent in the block, and do it
+    once when the block exits, e.g. around a queryset delete().
+
+    Changes made without signals (bulk_create...) can be added to the
+    yielded InvalidationBatch."""
+    batch = _batch.get()
+    if batch is not None:
+        # Flushed by the outer block.
+        yield batch
+        return
+    batch = InvalidationBatch()
+    token = _batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _batch.reset(token)
+    batch.flush()
+
+
+def touch(*project_ids):
+    """Bump the version of the projects and drop their cached
+    responses."""
+    batch = _batch.get()
+    if batch is not None:
+        batch.projects.update(project_ids)
+        return
+    touch_projects(pk__in=project_ids)
+    response_cache.invalidate(*project_ids)
+
+
+def forget_roles(*memberships):
+    """Drop the cached roles of these (user_id, project_id) pairs."""
+    batch = _batch.get()
+    if batch is not None:
+        batch.memberships.update(memberships)
+        return
+    membership.invalidate(*memberships)
+
+
+@receiver(pre_save, sender=Issue)
+def remember_issue_counter(sender, instance, raw, **kwargs):
+    """Find out in which counter the stored issue is counted before
+    it is overwritten.
+
+    The stored row is read and locked within the transaction of
+    Issue.save(), not taken from the loaded instance: a concurrent
+    status change could have moved it to another counter since."""
+    if raw or instance._state.adding:
+        instance._previous_counter = None
+        return
+    project_id, status = Issue.objects.select_for_update().filter(
+        pk=instance.pk
+    ).values_list('project_id', 'status').first() or (None, None)
+    if project_id is None:
+        instance._previous_counter = None
+    else:
+        instance._previous_counter = (project_id, issue_counter(status))
+
+
+@receiver(post_save, sender=Issue)
+def count_saved_issue(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = None if created else instance._previous_counter
+    current = (instance.project_id, issue_counter(instance.status))
+    if previous != current:
+        if previous is not None:
+            update_project_counters(previous[0], **{previous[1]: -1})
+        update_project_counters(current[0], **{current[1]: 1})
+    else:
+        # Same counter, only the version of the project changes.
+        update_project_counters(current[0])
+    if previous is not None:
+        response_cache.invalidate(previous[0], current[0])
+    else:
+        response_cache.invalidate(current[0])
+
+
+@receiver(post_delete, sender=Issue)
+def uncount_deleted_issue(sender, instance, origin=None, **kwargs):
+    if deleted_along(origin, Project):
+        return
+    update_project_counters(
+        instance.project_id,
+        **{issue_counter(instance.status): -1}
+    )
+    response_cache.invalidate(instance.project_id)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_counter(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        instance._previous_issue_id = None
+        return
+    issue_id = getattr(instance, '_counted_in', None)
+    if issue_id is None:
+        issue_id = Comment.objects.filter(
+            pk=instance.pk
+        ).values_list('issue_id', flat=True).first()
+    instance._previous_issue_id = issue_id
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = None if created else instance._previous_issue_id
+    if previous != instance.issue_id:
+        if previous is not None:
+            update_comments_count(previous, -1)
+            touch_issue_project(previous)
+        update_comments_count(instance.issue_id, 1)
+    touch_comment_project(instance)
+    instance._counted_in = instance.issue_id
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_deleted_comment(sender, instance, origin=None, **kwargs):
+    if deleted_along(origin, Project, Issue):
+        return
+    update_comments_count(instance.issue_id, -1)
+    touch_comment_project(instance)
+
+
+def touch_issue_project(issue_id, issue=None):
+    if issue is None:
+        project_id = Issue.objects.filter(
+            pk=issue_id
+        ).values_list('project_id', flat=True).first()
+    else:
+        project_id = issue.project_id
+    if project_id is not None:
+        touch(project_id)
+
+
+def touch_comment_project(comment):
+    # The viewsets save comments with their issue loaded.
+    if Comment.issue.is_cached(comment):
+        touch_issue_project(comment.issue_id, comment.issue)
+    else:
+        touch_issue_project(comment.issue_id)
+
+
+@receiver(post_save, sender=Contributor)
+@receiver(post_delete, sender=Contributor)
+def invalidate_contributor(sender, instance, **kwargs):
+    forget_roles((instance.user_id, instance.project_id))
+
+
+@receiver(m2m_changed, sender=Project.contributors.through)
+def invalidate_contributors(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    """Project.contributors.add() (e.g. with through_defaults in
+    ProjectViewSet.perform_create and ProjectAdmin.save_related),
+    remove() and clear() bypass the Contributor signals."""
+    if action in ('post_add', 'post_remove'):
+        pairs = [
+            (pk, instance.pk) if not reverse else (instance.pk, pk)
+            for pk in pk_set
+        ]
+    elif action == 'pre_clear':
+        if reverse:
+            pairs = Contributor.objects.filter(
+                user=instance
+            ).values_list('user_id', 'project_id')
+        else:
+            pairs = Contributor.objects.filter(
+                project=instance
+            ).values_list('user_id', 'project_id')
+    else:
+        return
+    forget_roles(*pairs)
+
+
+@receiver(post_save, sender=Project)
+def touch_saved_project(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if not created:
+        touch(instance.pk)
+    response_cache.invalidate(response_cache.PROJECT_LIST)
+
+
+@receiver(post_delete, sender=Project)
+def invalidate_deleted_project(sender, instance, **kwargs):
+    response_cache.invalidate(instance.pk, response_cache.PROJECT_LIST)
+
+
+@receiver(post_save, sender=Contributor)
+@receiver(post_delete, sender=Contributor)
+def touch_contributor_project(sender, instance, raw=False, origin=None,
+                              **kwargs):
+    if raw or deleted_along(origin, Project):
+        return
+    touch(instance.project_id)
+
+
+@receiver(m2m_changed, sender=Project.contributors.through)
+def touch_contributors_projects(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        touch(instance.pk)
+    elif action == 'pre_clear':
+        touch(*Project.objects.filter(
+            contributors=instance
+        ).values_list('pk', flat=True))
+    else:
+        touch(*pk_set)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_user_projects(sender, instance, created, raw, update_fields,
+                        **kwargs):
+    """The users are rendered in the responses of their projects
+    (as authors, contributors and assignees)."""
+    if raw or created:
+        return
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    touch(*Project.objects.filter(
+        contributors=instance
+    ).values_list('pk', flat=True))
+    response_cache.invalidate(response_cache.PROJECT_LIST)
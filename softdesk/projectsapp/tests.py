@@ -1,12 +1,45 @@
+import asyncio
+import csv
+import json
+from base64 import b64encode
+from io import BytesIO, StringIO
+from itertools import cycle
+from time import time
+from unittest.mock import patch
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.http import HttpRequest
 from django.urls import reverse_lazy, reverse
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import F, Q
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase, APIClient
 from projectsapp.models import (
     Project,
+    Contributor,
     Issue,
     Comment,
 )
+from projectsapp.views import (
+    ProjectViewSet,
+    ContributorViewSet,
+    IssueViewSet,
+    CommentViewSet,
+)
+from projectsapp import membership, response_cache, search
+from projectsapp.membership import get_role, is_contributor
+from projectsapp.filters import indexed_combinations
+from authentication.serializers import TokenObtainPairSerializer
+from softdesk import renderers
+from softdesk.parsers import FastJSONParser
+from softdesk.renderers import FastJSONRenderer
 
 
 class AppAPITestCase(APITestCase):
@@ -89,6 +122,11 @@ class AppAPITestCase(APITestCase):
             author=cls.user
         )
 
+    def setUp(self):
+        # Cached entries would outlive the rollback of the test data.
+        for cache in caches.all():
+            cache.clear()
+
     @classmethod
     def create_user(
         cls,
@@ -260,6 +298,7 @@ class TestProjectAsAuthor(AppAPITestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -342,6 +381,7 @@ class TestProjectAsContributor(AppAPITestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -391,6 +431,7 @@ class TestProjectAsNotContributor(AppAPITestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -482,6 +523,7 @@ class TestContributorAsAuthor(AppAPITestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -617,6 +659,7 @@ class TestContributorAsContributor(AppAPITestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -674,6 +717,7 @@ class TestContributorAsNotContributor(AppAPITestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -744,6 +788,7 @@ class TestIssueAsAuthor(AppAPITestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -819,6 +864,7 @@ class TestIssueAsNotAuthor(AppAPITestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -863,6 +909,7 @@ class TestIssueAsNotContributor(AppAPITestCase):
         ).data.get("access")
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -933,6 +980,7 @@ class TestCommentAsAuthor(AppAPITestCase):
         )
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -1006,6 +1054,7 @@ class TestCommentAsNotAuthor(AppAPITestCase):
         )
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -1058,6 +1107,7 @@ class TestCommentAsNotContributor(AppAPITestCase):
         )
 
     def setUp(self):
+        super().setUp()
         self.client.credentials(
             HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
         )
@@ -1102,3 +1152,2134 @@ class TestCommentAsNotContributor(AppAPITestCase):
             self.get_response_not_found()
         )
         self.assertEqual(Comment.objects.count(), comment_count)
+
+
+class TestKeysetPagination(AppAPITestCase):
+    url_issues = reverse_lazy('project-issue-list', args=(1,))
+    url_comments = reverse_lazy('project-issue-comment-list', args=(1, 1))
+    url_contributors = reverse_lazy('project-contributor-list', args=(1,))
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(2, 27):
+            Issue.objects.create(
+                author=cls.user,
+                project=cls.project1,
+                name=f"issue{i}",
+                description=f"issue{i} description",
+                tag="BUG",
+            )
+            Comment.objects.create(
+                description=f"comment{i} description",
+                issue=cls.issue1,
+                author=cls.user
+            )
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.access_token = cls.client.post(
+            cls.get_token_url,
+            {
+                "username": "user",
+                "password": "wxcv1234"
+            }
+        ).data.get("access")
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
+        )
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+            url = response.json()['next']
+        return pages
+
+    def test_issues_pages(self):
+        pages = self.walk(f'{self.url_issues}?pagination=keyset&limit=10')
+        self.assertEqual(
+            [len(page['results']) for page in pages],
+            [10, 10, 6]
+        )
+        self.assertNotIn('count', pages[0])
+        self.assertIsNone(pages[0]['previous'])
+        self.assertEqual(
+            [issue['id'] for page in pages for issue in page['results']],
+            list(
+                Issue.objects.filter(project=self.project1)
+                .order_by('time_created', 'pk')
+                .values_list('pk', flat=True)
+            )
+        )
+
+    def test_comments_pages(self):
+        pages = self.walk(f'{self.url_comments}?pagination=keyset&limit=10')
+        self.assertEqual(
+            [comment['id'] for page in pages for comment in page['results']],
+            [
+                str(pk) for pk in Comment.objects.filter(issue=self.issue1)
+                .order_by('time_created', 'pk')
+                .values_list('pk', flat=True)
+            ]
+        )
+
+    def test_previous_page(self):
+        first = self.client.get(
+            f'{self.url_issues}?pagination=keyset&limit=10'
+        ).json()
+        second = self.client.get(first['next']).json()
+        previous = self.client.get(second['previous']).json()
+        self.assertEqual(previous['results'], first['results'])
+        self.assertIsNone(previous['previous'])
+
+    def test_contributors_ordered_by_pk(self):
+        response = self.client.get(
+            f'{self.url_contributors}?pagination=keyset'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['results'],
+            self.get_contributor_list_data(
+                self.project1.contributor_set.order_by('pk')
+            )
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'{self.url_issues}?cursor=invalid')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
+
+    def encode_cursor(self, position):
+        return b64encode(json.dumps({'p': position}).encode()).decode()
+
+    def test_crafted_cursors(self):
+        for url, position in (
+            (self.url_issues, ['yesterday', 1]),
+            (self.url_issues, [['2023-01-01'], 1]),
+            (self.url_issues, [{'dt': 5}, 1]),
+            (self.url_issues, [None, 1]),
+            (self.url_issues, [{'dt': '2023-01-01T00:00:00+00:00'}, 'x']),
+            (self.url_issues, [{'dt': '2023-01-01T00:00:00+00:00'}, None]),
+            (self.url_issues, [{'dt': '2023-01-01T00:00:00+00:00'}, [1]]),
+            (self.url_comments, [{'dt': '2023-01-01T00:00:00+00:00'}, 'x']),
+        ):
+            with self.subTest(url=url, position=position):
+                response = self.client.get(
+                    url, {'cursor': self.encode_cursor(position)}
+                )
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(
+                    response.json(),
+                    {'detail': 'Invalid cursor'}
+                )
+
+    def test_cursor_with_datetime_string(self):
+        response = self.client.get(
+            self.url_issues,
+            {
+                'cursor': self.encode_cursor(
+                    ['2000-01-01T00:00:00+00:00', 1]
+                ),
+                'limit': 100,
+            }
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 26)
+
+    def test_offset_is_default(self):
+        response = self.client.get(self.url_issues)
+        self.assertEqual(response.json()['count'], 26)
+
+    def test_keyset_as_viewset_default(self):
+        with patch.object(IssueViewSet, 'pagination_mode', 'keyset'):
+            response = self.client.get(self.url_issues)
+            self.assertNotIn('count', response.json())
+            response = self.client.get(
+                f'{self.url_issues}?pagination=offset'
+            )
+            self.assertEqual(response.json()['count'], 26)
+
+
+class TestProjectIssueCounters(AppAPITestCase):
+    url_list = reverse_lazy('project-issue-list', args=(1,))
+    url_detail = reverse_lazy('project-issue-detail', args=(1, 1))
+    url_project = reverse_lazy('project-detail', args=(1,))
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.access_token = cls.client.post(
+            cls.get_token_url,
+            {
+                "username": "user",
+                "password": "wxcv1234"
+            }
+        ).data.get("access")
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
+        )
+
+    def get_counters(self):
+        self.project1.refresh_from_db()
+        return (
+            self.project1.open_issues_count,
+            self.project1.closed_issues_count
+        )
+
+    def test_create(self):
+        self.client.post(
+            self.url_list,
+            data={
+                "name": "issue2",
+                "description": "issue2 description",
+                "tag": "BUG",
+                "status": "Finished",
+            }
+        )
+        self.assertEqual(self.get_counters(), (1, 1))
+
+    def test_status_change(self):
+        self.client.patch(self.url_detail, data={"status": "Finished"})
+        self.assertEqual(self.get_counters(), (0, 1))
+        self.client.patch(self.url_detail, data={"status": "In Progress"})
+        self.assertEqual(self.get_counters(), (1, 0))
+
+    def test_concurrent_status_changes(self):
+        # Both requests loaded the issue while it was open.
+        first = Issue.objects.get(pk=1)
+        second = Issue.objects.get(pk=1)
+        first.status = 'Finished'
+        first.save()
+        second.status = 'Finished'
+        second.save()
+        self.assertEqual(self.get_counters(), (0, 1))
+
+    def test_delete(self):
+        self.client.delete(self.url_detail)
+        self.assertEqual(self.get_counters(), (0, 0))
+
+    def test_detail(self):
+        Issue.objects.create(
+            author=self.user,
+            project=self.project1,
+            name="issue2",
+            description="issue2 description",
+            tag="BUG",
+            status="Finished",
+        )
+        response = self.client.get(self.url_project)
+        self.assertEqual(response.json()['open_issues_count'], 1)
+        self.assertEqual(response.json()['closed_issues_count'], 1)
+
+    def test_rebuild_command(self):
+        Project.objects.update(open_issues_count=5, closed_issues_count=3)
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertEqual(self.get_counters(), (1, 0))
+        self.project2.refresh_from_db()
+        self.assertEqual(self.project2.open_issues_count, 0)
+
+
+class TestIssueCommentsCount(AppAPITestCase):
+    url_list = reverse_lazy('project-issue-comment-list', args=(1, 1))
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.access_token = cls.client.post(
+            cls.get_token_url,
+            {
+                "username": "user",
+                "password": "wxcv1234"
+            }
+        ).data.get("access")
+        cls.url_detail = reverse_lazy(
+            'project-issue-comment-detail',
+            args=(1, 1, cls.comment1.id)
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
+        )
+
+    def get_comments_count(self):
+        self.issue1.refresh_from_db()
+        return self.issue1.comments_count
+
+    def test_create(self):
+        self.client.post(
+            self.url_list,
+            data={
+                "description": "comment2 description",
+            }
+        )
+        self.assertEqual(self.get_comments_count(), 2)
+
+    def test_delete(self):
+        self.client.delete(self.url_detail)
+        self.assertEqual(self.get_comments_count(), 0)
+
+    def test_move(self):
+        issue2 = Issue.objects.create(
+            author=self.user,
+            project=self.project1,
+            name="issue2",
+            description="issue2 description",
+            tag="BUG",
+        )
+        comment = Comment.objects.get(pk=self.comment1.pk)
+        comment.issue = issue2
+        comment.save()
+        issue2.refresh_from_db()
+        self.assertEqual(self.get_comments_count(), 0)
+        self.assertEqual(issue2.comments_count, 1)
+
+    def test_rebuild_command(self):
+        Issue.objects.update(comments_count=7)
+        call_command('rebuild_counters', '1', stdout=StringIO())
+        self.assertEqual(self.get_comments_count(), 1)
+
+
+class TestMembership(AppAPITestCase):
+    def setUp(self):
+        super().setUp()
+        membership.stats.reset()
+
+    def get_request(self, user):
+        request = HttpRequest()
+        request.user = user
+        return request
+
+    def test_role(self):
+        request = self.get_request(self.user)
+        self.assertEqual(get_role(request, self.project1.pk), 'AUTHOR')
+        request = self.get_request(self.user2)
+        self.assertEqual(get_role(request, self.project1.pk), 'CONTRIBUTOR')
+        self.assertIsNone(get_role(request, self.project2.pk))
+
+    def test_memoized_for_the_request(self):
+        request = self.get_request(self.user2)
+        with self.assertNumQueries(1):
+            self.assertTrue(is_contributor(request, self.project1.pk))
+            self.assertTrue(is_contributor(request, str(self.project1.pk)))
+        # The next requests are served by the membership cache.
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                is_contributor(self.get_request(self.user2), self.project1.pk)
+            )
+        self.assertEqual(membership.stats.hits, 1)
+        self.assertEqual(membership.stats.misses, 1)
+
+    def test_negative_answer_cached(self):
+        is_contributor(self.get_request(self.user2), self.project2.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(
+                is_contributor(self.get_request(self.user2), self.project2.pk)
+            )
+
+    def test_invalidated_on_add(self):
+        self.assertIsNone(get_role(self.get_request(self.user2), 2))
+        self.project2.contributors.add(
+            self.user2,
+            through_defaults={
+                'role': 'CONTRIBUTOR'
+            }
+        )
+        self.assertEqual(
+            get_role(self.get_request(self.user2), 2),
+            'CONTRIBUTOR'
+        )
+
+    def test_invalidated_on_contributor_save_and_delete(self):
+        self.assertEqual(
+            get_role(self.get_request(self.user2), 1),
+            'CONTRIBUTOR'
+        )
+        contributor = Contributor.objects.get(user=self.user2, project=1)
+        contributor.role = 'AUTHOR'
+        contributor.save()
+        self.assertEqual(get_role(self.get_request(self.user2), 1), 'AUTHOR')
+        contributor.delete()
+        self.assertIsNone(get_role(self.get_request(self.user2), 1))
+
+    def test_invalidated_on_clear(self):
+        self.assertEqual(
+            get_role(self.get_request(self.user2), 1),
+            'CONTRIBUTOR'
+        )
+        self.project1.contributors.clear()
+        self.assertIsNone(get_role(self.get_request(self.user2), 1))
+
+    def test_invalidated_on_project_create(self):
+        next_id = Project.objects.order_by('-pk').first().pk + 1
+        self.assertIsNone(get_role(self.get_request(self.user2), next_id))
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.post(
+            reverse('project-list'),
+            data={
+                "name": "project3",
+                "description": "project3 description",
+                "type": "BACKEND"
+            }
+        )
+        self.assertEqual(response.json()['id'], next_id)
+        self.assertEqual(
+            get_role(self.get_request(self.user2), next_id),
+            'AUTHOR'
+        )
+
+    def test_stats_view(self):
+        url = reverse('cache-stats')
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.user.is_superuser = True
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('membership', response.json())
+
+
+class TestCommentQueries(AppAPITestCase):
+    """The project -> issue path is resolved in one query."""
+    url_list = reverse_lazy('project-issue-comment-list', args=(1, 1))
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.url_detail = reverse_lazy(
+            'project-issue-comment-detail',
+            args=(1, 1, cls.comment1.id)
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def test_list(self):
+        # resolve, count, comments
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url_list)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail(self):
+        # resolve, comment
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url_detail)
+        self.assertEqual(response.status_code, 200)
+
+    def test_create(self):
+        # resolve, savepoint, insert, comments_count, project version,
+        # release
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                self.url_list,
+                data={
+                    "description": "comment2 description",
+                }
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_not_contributor(self):
+        self.client.force_authenticate(
+            user=get_user_model().objects.get(username='user3')
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url_list)
+        self.assertEqual(response.status_code, 404)
+
+
+class TestCreateQueries(AppAPITestCase):
+    """The parent project is loaded once per request."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def test_create_issue(self):
+        # project, savepoint, insert, project counters, release
+        with self.assertNumQueries(5):
+            response = self.client.post(
+                reverse('project-issue-list', args=(1,)),
+                data={
+                    "name": "issue2",
+                    "description": "issue2 description",
+                    "tag": "BUG",
+                }
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_create_contributor(self):
+        # project, user, existing contributor, savepoint, insert,
+        # project version, release
+        with self.assertNumQueries(7):
+            response = self.client.post(
+                reverse('project-contributor-list', args=(1,)),
+                data={
+                    "user": "user3"
+                }
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['project'], 'project1')
+
+
+class QueryCountTestCase(AppAPITestCase):
+    """Record the queries of a request against fixtures of growing size
+    and check that their number does not grow with the data."""
+    sizes = (2, 6)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user3 = get_user_model().objects.get(username='user3')
+        cls.roles = {
+            'author': cls.user,
+            'contributor': cls.user2,
+            'not contributor': cls.user3,
+        }
+
+    def setUp(self):
+        super().setUp()
+        self.rows = 0
+
+    def grow(self, size):
+        """Add rows until there are `size` extra projects, contributors,
+        issues (each assigned) and comments, each with its own user so
+        that related objects cannot be shared between rows."""
+        User = get_user_model()
+        while self.rows < size:
+            self.rows += 1
+            name = f'querycount{self.rows}'
+            user = User.objects.create(
+                username=name,
+                email=f'{name}@test.com',
+                birthdate='1990-01-01'
+            )
+            Project.objects.create(
+                name=name,
+                description=name,
+                author=user,
+                type='BACKEND',
+            )
+            contributor = Contributor.objects.create(
+                user=user,
+                project=self.project1,
+            )
+            Issue.objects.create(
+                author=user,
+                project=self.project1,
+                assigned_to=contributor,
+                name=name,
+                description=name,
+                tag='BUG',
+            )
+            Comment.objects.create(
+                description=name,
+                issue=self.issue1,
+                author=user
+            )
+
+    def capture(self, user, method, url, data=None):
+        # Every run starts with cold caches to be comparable.
+        for cache in caches.all():
+            cache.clear()
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data=data)
+        return response, context.captured_queries
+
+    def assertConstantQueries(self, method, url, roles, data=None):
+        """`url` and `data` can be callables returning new values for
+        each run, e.g. to delete a different object. The data grows from
+        its current size for each role so that every one of them is
+        measured with two different numbers of rows."""
+        for role in roles:
+            with self.subTest(role=role):
+                runs = []
+                base = self.rows
+                for size in self.sizes:
+                    self.grow(base + size)
+                    target = url() if callable(url) else url
+                    response, queries = self.capture(
+                        self.roles[role],
+                        method,
+                        target,
+                        data() if callable(data) else data
+                    )
+                    runs.append((self.rows, response.status_code, queries))
+                (small, status_small, few), (large, status_large, many) = runs
+                self.assertEqual(status_small, status_large)
+                if len(few) != len(many):
+                    self.fail(
+                        f'{method.upper()} {target} as {role}: '
+                        f'{len(few)} queries with {small} rows, '
+                        f'{len(many)} queries with {large} rows:\n'
+                        + '\n'.join(query['sql'] for query in many)
+                    )
+
+
+class TestQueryCounts(QueryCountTestCase):
+    readers = ('author', 'contributor', 'not contributor')
+
+    def new_comment(self):
+        comment = Comment.objects.create(
+            description='comment',
+            issue=self.issue1,
+            author=self.user
+        )
+        return reverse(
+            'project-issue-comment-detail',
+            args=(1, 1, comment.pk)
+        )
+
+    def new_issue(self):
+        issue = Issue.objects.create(
+            author=self.user,
+            project=self.project1,
+            name='issue',
+            description='issue',
+            tag='BUG',
+        )
+        return reverse('project-issue-detail', args=(1, issue.pk))
+
+    def new_user(self):
+        User = get_user_model()
+        name = f'new{User.objects.count()}'
+        return User.objects.create(
+            username=name,
+            email=f'{name}@test.com',
+            birthdate='1990-01-01'
+        )
+
+    def new_contributor(self):
+        contributor = Contributor.objects.create(
+            user=self.new_user(),
+            project=self.project1,
+        )
+        return reverse(
+            'project-contributor-detail',
+            args=(1, contributor.pk)
+        )
+
+    def test_project_list(self):
+        self.assertConstantQueries(
+            'get', reverse('project-list'), self.readers
+        )
+
+    def test_project_retrieve(self):
+        self.assertConstantQueries(
+            'get', reverse('project-detail', args=(1,)), self.readers
+        )
+
+    def test_project_create(self):
+        self.assertConstantQueries(
+            'post',
+            reverse('project-list'),
+            ('author',),
+            data={
+                "name": "project",
+                "description": "project description",
+                "type": "BACKEND"
+            }
+        )
+
+    def test_project_update(self):
+        self.assertConstantQueries(
+            'patch',
+            reverse('project-detail', args=(1,)),
+            ('author', 'contributor'),
+            data={"name": "project renamed"}
+        )
+
+    def test_contributor_list(self):
+        self.assertConstantQueries(
+            'get',
+            reverse('project-contributor-list', args=(1,)),
+            self.readers
+        )
+
+    def test_contributor_retrieve(self):
+        self.assertConstantQueries(
+            'get',
+            reverse('project-contributor-detail', args=(1, 1)),
+            self.readers
+        )
+
+    def test_contributor_create(self):
+        self.assertConstantQueries(
+            'post',
+            reverse('project-contributor-list', args=(1,)),
+            ('author', 'contributor'),
+            data=lambda: {"user": self.new_user().username}
+        )
+
+    def test_contributor_destroy(self):
+        self.assertConstantQueries(
+            'delete', self.new_contributor, ('author', 'contributor')
+        )
+
+    def test_issue_list(self):
+        self.assertConstantQueries(
+            'get', reverse('project-issue-list', args=(1,)), self.readers
+        )
+
+    def test_issue_list_page_size(self):
+        self.grow(30)
+        counts = []
+        for limit in (5, 30):
+            response, queries = self.capture(
+                self.user,
+                'get',
+                f"{reverse('project-issue-list', args=(1,))}?limit={limit}"
+            )
+            self.assertEqual(len(response.json()['results']), limit)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_issue_retrieve(self):
+        self.assertConstantQueries(
+            'get',
+            reverse('project-issue-detail', args=(1, 1)),
+            self.readers
+        )
+
+    def test_issue_create(self):
+        self.assertConstantQueries(
+            'post',
+            reverse('project-issue-list', args=(1,)),
+            self.readers,
+            data={
+                "assigned_to": "user2",
+                "name": "issue",
+                "description": "issue description",
+                "tag": "BUG",
+            }
+        )
+
+    def test_issue_update(self):
+        statuses = cycle(['Finished', 'To Do'])
+        self.assertConstantQueries(
+            'patch',
+            reverse('project-issue-detail', args=(1, 1)),
+            ('author', 'contributor'),
+            # Each run moves the issue to the other counter.
+            data=lambda: {
+                "status": next(statuses)
+            }
+        )
+
+    def test_issue_destroy(self):
+        self.assertConstantQueries(
+            'delete', self.new_issue, ('author', 'contributor')
+        )
+
+    def test_comment_list(self):
+        self.assertConstantQueries(
+            'get',
+            reverse('project-issue-comment-list', args=(1, 1)),
+            self.readers
+        )
+
+    def test_comment_retrieve(self):
+        self.assertConstantQueries(
+            'get',
+            reverse(
+                'project-issue-comment-detail',
+                args=(1, 1, self.comment1.pk)
+            ),
+            self.readers
+        )
+
+    def test_comment_create(self):
+        self.assertConstantQueries(
+            'post',
+            reverse('project-issue-comment-list', args=(1, 1)),
+            self.readers,
+            data={"description": "comment"}
+        )
+
+    def test_comment_update(self):
+        self.assertConstantQueries(
+            'patch',
+            reverse(
+                'project-issue-comment-detail',
+                args=(1, 1, self.comment1.pk)
+            ),
+            ('author', 'contributor'),
+            data={"description": "comment updated"}
+        )
+
+    def test_comment_destroy(self):
+        self.assertConstantQueries(
+            'delete', self.new_comment, ('author', 'contributor')
+        )
+
+
+class TestProjectDetailContributors(AppAPITestCase):
+    url_detail = reverse_lazy('project-detail', args=(1,))
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.project1.contributors.add(
+            get_user_model().objects.get(username='user3'),
+            through_defaults={
+                'role': 'CONTRIBUTOR'
+            }
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def get_contributors(self, query=''):
+        response = self.client.get(f'{self.url_detail}{query}')
+        self.assertEqual(response.status_code, 200)
+        return [
+            contributor['user']
+            for contributor in response.json()['contributors']
+        ]
+
+    def test_all_by_default(self):
+        self.assertEqual(self.get_contributors(), ['user', 'user2', 'user3'])
+
+    def test_limit(self):
+        self.assertEqual(
+            self.get_contributors('?contributors_limit=2'),
+            ['user', 'user2']
+        )
+
+    def test_invalid_limit(self):
+        self.assertEqual(
+            self.get_contributors('?contributors_limit=none'),
+            ['user', 'user2', 'user3']
+        )
+
+    def test_default_limit(self):
+        with patch.object(ProjectViewSet, 'contributors_limit', 1):
+            self.assertEqual(self.get_contributors(), ['user'])
+
+
+class TestIndexReport(AppAPITestCase):
+
+    def test_no_full_scan(self):
+        out = StringIO()
+        call_command('index_report', '--strict', stdout=out)
+        self.assertIn('issues: list (keyset)', out.getvalue())
+        self.assertNotIn('FULL SCAN', out.getvalue())
+
+
+class TestConditionalGet(AppAPITestCase):
+    url_projects = reverse_lazy('project-list')
+    url_project = reverse_lazy('project-detail', args=(1,))
+    url_contributors = reverse_lazy('project-contributor-list', args=(1,))
+    url_issues = reverse_lazy('project-issue-list', args=(1,))
+    url_issue = reverse_lazy('project-issue-detail', args=(1, 1))
+    url_comments = reverse_lazy('project-issue-comment-list', args=(1, 1))
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        return response['ETag']
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_modified(self):
+        for url in (
+            self.url_projects,
+            self.url_project,
+            self.url_contributors,
+            self.url_issues,
+            self.url_issue,
+            self.url_comments,
+        ):
+            with self.subTest(url=url):
+                self.assertNotModified(url, self.get_etag(url))
+
+    def test_not_modified_without_list_query(self):
+        etag = self.get_etag(self.url_issues)
+        caches['responses'].clear()
+        # The project with the role of the user.
+        with self.assertNumQueries(1):
+            self.assertNotModified(self.url_issues, etag)
+
+    def test_etag_depends_on_query(self):
+        etag = self.get_etag(self.url_issues)
+        self.assertModified(f'{self.url_issues}?limit=1', etag)
+
+    def test_comment_created(self):
+        etags = {
+            url: self.get_etag(url)
+            for url in (self.url_project, self.url_issue, self.url_comments)
+        }
+        Comment.objects.create(
+            description="comment2 description",
+            issue_id=1,
+            author=self.user
+        )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertModified(url, etag)
+
+    def test_issue_updated(self):
+        etag = self.get_etag(self.url_issues)
+        issue = Issue.objects.get(pk=1)
+        issue.name = 'renamed'
+        issue.save()
+        self.assertModified(self.url_issues, etag)
+
+    def test_contributor_added(self):
+        etag = self.get_etag(self.url_contributors)
+        self.project1.contributors.add(
+            get_user_model().objects.get(username='user3'),
+            through_defaults={
+                'role': 'CONTRIBUTOR'
+            }
+        )
+        self.assertModified(self.url_contributors, etag)
+
+    def test_user_renamed(self):
+        etag = self.get_etag(self.url_issue)
+        self.user2.username = 'renamed'
+        self.user2.save()
+        self.assertModified(self.url_issue, etag)
+
+    def test_other_project_unchanged(self):
+        etag = self.get_etag(self.url_issues)
+        Project.objects.get(pk=2).save()
+        self.assertNotModified(self.url_issues, etag)
+
+    def test_project_list(self):
+        etag = self.get_etag(self.url_projects)
+        Project.objects.get(pk=2).save()
+        self.assertModified(self.url_projects, etag)
+
+    def test_project_list_changed_by_other_process(self):
+        etag = self.get_etag(self.url_projects)
+        # Saved by another worker: the caches of this one are not
+        # invalidated.
+        Project.objects.filter(pk=2).update(
+            name='renamed', version=F('version') + 1
+        )
+        with patch.object(response_cache, 'get', return_value=None):
+            self.assertModified(self.url_projects, etag)
+
+    def test_not_contributor(self):
+        etag = self.get_etag(self.url_issues)
+        self.client.force_authenticate(
+            user=get_user_model().objects.get(username='user3')
+        )
+        response = self.client.get(self.url_issues, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(self.url_project, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 403)
+
+    def test_any_etag_of_missing_object(self):
+        for url in (
+            reverse('project-detail', args=(999,)),
+            reverse('project-issue-list', args=(999,)),
+            reverse('project-issue-detail', args=(1, 999)),
+            reverse('project-issue-comment-list', args=(1, 999)),
+            reverse('project-contributor-detail', args=(1, 999)),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+                self.assertEqual(response.status_code, 404)
+
+    def test_any_etag(self):
+        for url in (
+            self.url_projects,
+            self.url_project,
+            self.url_issues,
+            self.url_issue,
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+                self.assertEqual(response.status_code, 304)
+
+
+class TestResponseCache(AppAPITestCase):
+    url_projects = reverse_lazy('project-list')
+    url_project = reverse_lazy('project-detail', args=(1,))
+    url_contributors = reverse_lazy('project-contributor-list', args=(1,))
+    url_issues = reverse_lazy('project-issue-list', args=(1,))
+    url_comments = reverse_lazy('project-issue-comment-list', args=(1, 1))
+
+    def setUp(self):
+        super().setUp()
+        response_cache.stats.reset()
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, url, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assertCached(self, url):
+        with self.assertNumQueries(0):
+            return self.get(url)
+
+    def assertNotCached(self, url):
+        hits = response_cache.stats.hits
+        self.get(url)
+        self.assertEqual(response_cache.stats.hits, hits)
+
+    def test_hit_without_query(self):
+        for url in (
+            self.url_projects,
+            self.url_project,
+            self.url_contributors,
+            self.url_issues,
+            self.url_comments,
+        ):
+            with self.subTest(url=url):
+                response = self.get(url)
+                cached = self.assertCached(url)
+                self.assertEqual(cached.content, response.content)
+                self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(response_cache.stats.hits, 5)
+        self.assertEqual(response_cache.stats.misses, 5)
+
+    def test_not_modified(self):
+        etag = self.get(self.url_issues)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url_issues,
+                HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_not_modified_header_forms(self):
+        etag = self.get(self.url_issues)['ETag']
+        for header in (
+            f'W/{etag}',
+            f'"other", {etag}',
+            f'"other", W/{etag}',
+            '*',
+        ):
+            with self.subTest(header=header):
+                with self.assertNumQueries(0):
+                    response = self.client.get(
+                        self.url_issues,
+                        HTTP_IF_NONE_MATCH=header
+                    )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+        response = self.client.get(
+            self.url_issues,
+            HTTP_IF_NONE_MATCH='"other"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_keyed_by_query_and_role(self):
+        self.get(self.url_issues)
+        self.assertNotCached(f'{self.url_issues}?limit=1')
+        self.client.force_authenticate(user=self.user2)
+        self.assertNotCached(self.url_issues)
+
+    def test_not_contributor(self):
+        self.get(self.url_issues)
+        self.client.force_authenticate(
+            user=get_user_model().objects.get(username='user3')
+        )
+        response = self.client.get(self.url_issues)
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalidated_by_comment(self):
+        self.get(self.url_comments)
+        self.get(self.url_issues)
+        Comment.objects.create(
+            description="comment2 description",
+            issue_id=1,
+            author=self.user
+        )
+        self.assertNotCached(self.url_comments)
+        self.assertNotCached(self.url_issues)
+
+    def test_invalidated_by_issue(self):
+        self.get(self.url_issues)
+        Issue.objects.filter(pk=1).get().delete()
+        response = self.get(self.url_issues)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_invalidated_by_contributor(self):
+        self.get(self.url_contributors)
+        Contributor.objects.get(user=self.user2, project=1).delete()
+        response = self.get(self.url_contributors)
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_invalidated_by_project(self):
+        self.get(self.url_projects)
+        self.get(self.url_project)
+        Project.objects.filter(pk=1).update(name='renamed')
+        self.assertCached(self.url_projects)
+        Project.objects.get(pk=1).save()
+        self.assertEqual(
+            self.get(self.url_projects).json()['results'][0]['name'],
+            'renamed'
+        )
+        self.assertEqual(self.get(self.url_project).json()['name'], 'renamed')
+
+    def test_other_project_kept(self):
+        self.get(self.url_issues)
+        Project.objects.get(pk=2).save()
+        self.assertCached(self.url_issues)
+
+    def worker_cache(self, location):
+        """The responses cache of a worker process: the local memory
+        backends with the same location share their data."""
+        cache = LocMemCache(location, settings.CACHES['responses'])
+        self.addCleanup(cache.clear)
+        return cache
+
+    def rename_issue(self, cache):
+        with patch.object(response_cache, 'get_cache', return_value=cache):
+            issue = Issue.objects.get(pk=1)
+            issue.name = 'renamed'
+            issue.save()
+
+    def get_issue_names(self, cache):
+        with patch.object(response_cache, 'get_cache', return_value=cache):
+            return [
+                issue['name']
+                for issue in self.get(self.url_issues).json()['results']
+            ]
+
+    def test_invalidated_in_shared_backend(self):
+        writer = self.worker_cache('shared-responses')
+        reader = self.worker_cache('shared-responses')
+        self.assertEqual(self.get_issue_names(reader), ['issue1'])
+        self.rename_issue(writer)
+        self.assertEqual(self.get_issue_names(reader), ['renamed'])
+
+    def test_local_backend_expires(self):
+        writer = self.worker_cache('writer-responses')
+        reader = self.worker_cache('reader-responses')
+        self.assertEqual(self.get_issue_names(reader), ['issue1'])
+        self.rename_issue(writer)
+        # Not seen by the other process until the entry expires.
+        self.assertEqual(self.get_issue_names(reader), ['issue1'])
+        later = time() + settings.CACHES['responses']['TIMEOUT'] + 1
+        with patch('django.core.cache.backends.locmem.time') as clock:
+            clock.time.return_value = later
+            self.assertEqual(self.get_issue_names(reader), ['renamed'])
+
+    @override_settings(RESPONSE_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_evicted(self):
+        first, second, third = (
+            f'{self.url_issues}?limit={limit}' for limit in (1, 2, 3)
+        )
+        self.get(first)
+        self.get(second)
+        self.assertCached(first)
+        self.get(third)
+        self.assertCached(first)
+        self.assertNotCached(second)
+
+
+class TestFastJSON(AppAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def test_same_output_as_json_renderer(self):
+        for url, data in (
+            (reverse('project-detail', args=(1,)), None),
+            (reverse('project-issue-detail', args=(1, 1)), None),
+            (reverse('project-issue-comment-list', args=(1, 1)), None),
+            # Validation errors, with lazy translations.
+            (reverse('project-issue-list', args=(1,)), {'tag': 'NONE'}),
+        ):
+            with self.subTest(url=url):
+                if data is None:
+                    response = self.client.get(url)
+                else:
+                    response = self.client.post(url, data, format='json')
+                self.assertEqual(
+                    response.content,
+                    JSONRenderer().render(response.data)
+                )
+
+    def test_native_types(self):
+        data = {
+            'id': self.comment1.id,
+            'time_created': self.comment1.time_created,
+            1: 'key',
+            'line': 'separator\u2028paragraph\u2029',
+        }
+        self.assertEqual(
+            FastJSONRenderer().render(data),
+            JSONRenderer().render(data)
+        )
+
+    def test_indent(self):
+        data = {'results': [1, 2]}
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=2'),
+            JSONRenderer().render(data, 'application/json; indent=2')
+        )
+
+    def test_without_orjson(self):
+        data = {'id': self.comment1.id, 'big': 2 ** 70}
+        with patch.object(renderers, 'orjson', None):
+            self.assertEqual(
+                FastJSONRenderer().render(data),
+                JSONRenderer().render(data)
+            )
+        # Too big for orjson, encoded by the json module.
+        self.assertEqual(
+            FastJSONRenderer().render(data),
+            JSONRenderer().render(data)
+        )
+
+    def test_parse(self):
+        body = '{"name": "ünïcode", "big": 1180591620717411303424}'.encode()
+        self.assertEqual(
+            FastJSONParser().parse(BytesIO(body)),
+            JSONParser().parse(BytesIO(body))
+        )
+        with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+            FastJSONParser().parse(BytesIO(b'{"name": '))
+
+
+class TestValuesListSerializers(AppAPITestCase):
+    """The GET lists give the same output with the values() rows
+    as with the ModelSerializers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for index in range(3):
+            issue = Issue.objects.create(
+                author=cls.user2,
+                project=cls.project1,
+                name=f"issue ünïcode {index}",
+                description="description",
+                tag="TASK",
+            )
+            Comment.objects.create(
+                description=f"comment {index}",
+                issue=cls.issue1,
+                author=cls.user2
+            )
+        Comment.objects.create(
+            description="comment",
+            issue=issue,
+            author=cls.user
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def assertSameOutput(self, viewset, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        caches['responses'].clear()
+        with patch.object(viewset, 'values_serializer_class', None):
+            expected = self.client.get(url)
+        self.assertEqual(response.content, expected.content)
+        return response.json()
+
+    def test_same_output(self):
+        for viewset, url in (
+            (ProjectViewSet, reverse('project-list')),
+            (IssueViewSet, reverse('project-issue-list', args=(1,))),
+            (
+                CommentViewSet,
+                reverse('project-issue-comment-list', args=(1, 1))
+            ),
+        ):
+            for query in ('', '?limit=2&offset=1', '?pagination=keyset'):
+                with self.subTest(url=url, query=query):
+                    self.assertSameOutput(viewset, f'{url}{query}')
+
+    def test_keyset_pages(self):
+        url = reverse('project-issue-comment-list', args=(1, 1))
+        data = self.assertSameOutput(
+            CommentViewSet,
+            f'{url}?pagination=keyset&limit=2'
+        )
+        data = self.assertSameOutput(CommentViewSet, data['next'])
+        self.assertEqual(
+            [comment['description'] for comment in data['results']],
+            ['comment 1', 'comment 2']
+        )
+        self.assertSameOutput(CommentViewSet, data['previous'])
+
+    @override_settings(TIME_ZONE='Europe/Paris')
+    def test_time_zone(self):
+        data = self.assertSameOutput(
+            CommentViewSet,
+            reverse('project-issue-comment-list', args=(1, 1))
+        )
+        self.assertTrue(
+            data['results'][0]['time_created'].endswith(('+01:00', '+02:00'))
+        )
+
+
+class TestExport(AppAPITestCase):
+    url_export = reverse_lazy('project-export', args=(1,))
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.issue2 = Issue.objects.create(
+            author=cls.user2,
+            project=cls.project1,
+            name="issue2",
+            description="issue2, \"quoted\"\nmultiline",
+            tag="TASK",
+        )
+        Issue.objects.create(
+            author=cls.user,
+            project=cls.project1,
+            name="issue3",
+            description="without comments",
+            tag="FEATURE",
+        )
+        for index in range(3):
+            Comment.objects.create(
+                description=f"comment {index}",
+                issue=cls.issue2,
+                author=cls.user2
+            )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user2)
+
+    def export(self, query=''):
+        response = self.client.get(f'{self.url_export}{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def assertRecords(self, records):
+        self.assertEqual(
+            [
+                (record['record'], record['name'] or record['description'])
+                for record in records
+            ],
+            [
+                ('issue', 'issue1'),
+                ('comment', 'comment1 description'),
+                ('issue', 'issue2'),
+                ('comment', 'comment 0'),
+                ('comment', 'comment 1'),
+                ('comment', 'comment 2'),
+                ('issue', 'issue3'),
+            ]
+        )
+
+    def test_ndjson(self):
+        records = [
+            json.loads(line) for line in self.export().splitlines()
+        ]
+        self.assertRecords(records)
+        self.assertEqual(records[0]['assigned_to'], 'user')
+        self.assertEqual(records[1]['comment_id'], str(self.comment1.id))
+        self.assertEqual(records[1]['issue_id'], self.issue1.id)
+        self.assertEqual(
+            records[1]['time_created'],
+            self.format_datetime(self.comment1.time_created)
+        )
+
+    def test_csv(self):
+        records = list(
+            csv.DictReader(StringIO(self.export('?export_format=csv')))
+        )
+        self.assertRecords(records)
+        self.assertEqual(
+            records[2]['description'],
+            "issue2, \"quoted\"\nmultiline"
+        )
+
+    def test_chunks(self):
+        expected = self.export()
+        with patch.object(ProjectViewSet, 'export_chunk_size', 1):
+            self.assertEqual(self.export(), expected)
+
+    def test_queries(self):
+        # project, role, issues, comments
+        with self.assertNumQueries(4):
+            self.export()
+
+    def test_unknown_format(self):
+        response = self.client.get(f'{self.url_export}?export_format=xml')
+        self.assertEqual(response.status_code, 400)
+
+    def test_not_contributor(self):
+        self.client.force_authenticate(
+            user=get_user_model().objects.get(username='user3')
+        )
+        response = self.client.get(self.url_export)
+        self.assertEqual(response.status_code, 403)
+
+
+class TestIssueBulk(AppAPITestCase):
+    url_bulk = reverse_lazy('project-issue-bulk', args=(1,))
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def new_issues(self, count, **data):
+        return [
+            dict(
+                {
+                    "name": f"issue {index}",
+                    "description": "description",
+                    "tag": "BUG",
+                },
+                **data
+            )
+            for index in range(count)
+        ]
+
+    def get_counters(self):
+        project = Project.objects.get(pk=1)
+        return project.open_issues_count, project.closed_issues_count
+
+    def test_create(self):
+        url_list = reverse('project-issue-list', args=(1,))
+        self.assertEqual(self.client.get(url_list).json()['count'], 1)
+        items = self.new_issues(3, assigned_to="user2")
+        items[2]['status'] = "Finished"
+        response = self.client.post(self.url_bulk, items, format='json')
+        self.assertEqual(response.status_code, 201)
+        # The cached list is dropped.
+        self.assertEqual(self.client.get(url_list).json()['count'], 4)
+        self.assertEqual(
+            [issue['assigned_to'] for issue in response.json()],
+            ['user2'] * 3
+        )
+        self.assertEqual(
+            Issue.objects.filter(project=1, author=self.user).count(), 4
+        )
+        self.assertEqual(self.get_counters(), (3, 1))
+
+    def test_create_queries(self):
+        for count in (2, 20):
+            # project, assignees, savepoint, insert, counters, release
+            with self.assertNumQueries(6):
+                response = self.client.post(
+                    self.url_bulk,
+                    self.new_issues(count, assigned_to="user"),
+                    format='json'
+                )
+            self.assertEqual(response.status_code, 201)
+
+    def test_create_errors(self):
+        items = self.new_issues(3)
+        items[0]['assigned_to'] = "user3"
+        items[2]['tag'] = "NONE"
+        response = self.client.post(self.url_bulk, items, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(list(errors[0]), ['assigned_to'])
+        self.assertEqual(errors[1], {})
+        self.assertEqual(list(errors[2]), ['tag'])
+        self.assertEqual(Issue.objects.count(), 1)
+
+    def test_create_not_a_list(self):
+        response = self.client.post(
+            self.url_bulk,
+            self.new_issues(1)[0],
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_too_many(self):
+        with patch.object(IssueViewSet, 'bulk_max_size', 2):
+            response = self.client.post(
+                self.url_bulk,
+                self.new_issues(3),
+                format='json'
+            )
+        self.assertEqual(response.status_code, 400)
+
+    def test_update(self):
+        self.client.post(self.url_bulk, self.new_issues(2), format='json')
+        ids = list(
+            Issue.objects.filter(project=1).values_list('pk', flat=True)
+        )
+        response = self.client.patch(
+            self.url_bulk,
+            [
+                {"id": ids[0], "status": "Finished"},
+                {"id": ids[1], "priority": "HIGH", "assigned_to": "user2"},
+                {"id": ids[2], "status": "Finished", "assigned_to": None},
+            ],
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data[0]['status'], "Finished")
+        self.assertEqual(data[1]['assigned_to'], "user2")
+        self.assertEqual(data[1]['priority'], "HIGH")
+        self.assertIsNone(data[2]['assigned_to'])
+        self.assertEqual(self.get_counters(), (1, 2))
+        # The counters are the ones the signals would keep.
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertEqual(self.get_counters(), (1, 2))
+
+    def test_update_errors(self):
+        other = Issue.objects.create(
+            author=self.user2,
+            project=self.project1,
+            name="issue2",
+            description="description",
+            tag="BUG",
+        )
+        response = self.client.patch(
+            self.url_bulk,
+            [
+                {"id": 1, "status": "Finished"},
+                {"id": other.pk, "status": "Finished"},
+                {"id": 999, "status": "Finished"},
+                {"id": 1, "priority": "HIGH"},
+                {"id": "one"},
+            ],
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        for error in errors[1:]:
+            self.assertEqual(list(error), ['id'])
+        self.assertEqual(Issue.objects.get(pk=1).status, "To Do")
+
+    def test_not_contributor(self):
+        self.client.force_authenticate(
+            user=get_user_model().objects.get(username='user3')
+        )
+        response = self.client.post(
+            self.url_bulk,
+            self.new_issues(1),
+            format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class TestContributorBulk(AppAPITestCase):
+    url_bulk = reverse_lazy('project-contributor-bulk', args=(1,))
+    url_contributors = reverse_lazy('project-contributor-list', args=(1,))
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        self.user3 = get_user_model().objects.get(username='user3')
+
+    def get_usernames(self):
+        return set(
+            Contributor.objects.filter(
+                project=1
+            ).values_list('user__username', flat=True)
+        )
+
+    def get_status(self, user):
+        self.client.force_authenticate(user=user)
+        status_code = self.client.get(self.url_contributors).status_code
+        self.client.force_authenticate(user=self.user)
+        return status_code
+
+    def test_add(self):
+        self.assertEqual(self.get_status(self.user3), 404)
+        response = self.client.post(
+            self.url_bulk,
+            {"users": ["user3", "user2", "user3"]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        # The users already contributing are ignored.
+        self.assertEqual(
+            [contributor['user'] for contributor in response.json()],
+            ['user3']
+        )
+        self.assertEqual(self.get_usernames(), {'user', 'user2', 'user3'})
+        # The cached role of user3 is dropped.
+        self.assertEqual(self.get_status(self.user3), 200)
+
+    def test_replace(self):
+        self.assertEqual(self.get_status(self.user2), 200)
+        response = self.client.put(
+            self.url_bulk,
+            {"users": ["user", "user3"]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [contributor['user'] for contributor in response.json()],
+            ['user', 'user3']
+        )
+        self.assertEqual(self.get_usernames(), {'user', 'user3'})
+        self.assertEqual(self.get_status(self.user2), 404)
+
+    def test_replace_without_author(self):
+        response = self.client.put(
+            self.url_bulk,
+            {"users": ["user2"]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.get_usernames(), {'user', 'user2'})
+
+    def test_unknown_users(self):
+        response = self.client.post(
+            self.url_bulk,
+            {"users": ["user3", "nobody", "user2", "ghost"]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['users']), ['1', '3'])
+        self.assertEqual(self.get_usernames(), {'user', 'user2'})
+
+    def test_too_many(self):
+        with patch.object(ContributorViewSet, 'bulk_max_size', 1):
+            response = self.client.post(
+                self.url_bulk,
+                {"users": ["user2", "user3"]},
+                format='json'
+            )
+        self.assertEqual(response.status_code, 400)
+
+    def test_queries(self):
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            User(
+                username=f'bulk-{index}',
+                email=f'bulk-{index}@test.com',
+                birthdate='2000-01-01',
+            )
+            for index in range(20)
+        )
+        for users in (users[:2], users[2:]):
+            usernames = [user.username for user in users]
+            self.client.get(self.url_contributors)
+            # project, users, savepoint, contributors, insert,
+            # version, release
+            with self.assertNumQueries(7):
+                response = self.client.post(
+                    self.url_bulk,
+                    {"users": usernames},
+                    format='json'
+                )
+            self.assertEqual(response.status_code, 201)
+
+    def test_single_invalidation(self):
+        self.client.post(
+            self.url_bulk,
+            {"users": ["user3"]},
+            format='json'
+        )
+        with patch(
+            'projectsapp.signals.response_cache.invalidate'
+        ) as invalidate, patch(
+            'projectsapp.signals.membership.invalidate'
+        ) as forget:
+            response = self.client.put(
+                self.url_bulk,
+                {"users": ["user"]},
+                format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        invalidate.assert_called_once_with(1)
+        forget.assert_called_once()
+        self.assertEqual(
+            set(forget.call_args.args),
+            {(self.user2.pk, 1), (self.user3.pk, 1)}
+        )
+
+    def test_invalidates_cached_responses(self):
+        response = self.client.get(self.url_contributors)
+        etag = response['ETag']
+        self.assertEqual(response.json()['count'], 2)
+        self.client.post(self.url_bulk, {"users": ["user3"]}, format='json')
+        response = self.client.get(
+            self.url_contributors,
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+
+    def test_not_project_creator(self):
+        self.client.force_authenticate(user=self.user2)
+        for method in (self.client.post, self.client.put):
+            response = method(
+                self.url_bulk,
+                {"users": ["user", "user2", "user3"]},
+                format='json'
+            )
+            self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.get_usernames(), {'user', 'user2'})
+
+    def test_put_detail_not_allowed(self):
+        url = reverse('project-contributor-detail', args=(1, 2))
+        # Not even checked against the permissions of the user.
+        for user in (self.user, self.user2):
+            with self.subTest(user=user.username):
+                self.client.force_authenticate(user=user)
+                response = self.client.put(
+                    url,
+                    {"user": "user3"},
+                    format='json'
+                )
+                self.assertEqual(response.status_code, 405)
+                self.assertNotIn('PUT', response['Allow'])
+        response = self.client.options(url)
+        self.assertNotIn('PUT', response['Allow'])
+        response = self.client.options(self.url_bulk)
+        self.assertIn('PUT', response['Allow'])
+
+
+class TestSearch(AppAPITestCase):
+    url_search = reverse_lazy('project-search', args=(1,))
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        self.issue2 = Issue.objects.create(
+            author=self.user,
+            project=self.project1,
+            name="Login page crashes",
+            description="The login form crashes on submit",
+            tag="BUG",
+        )
+        self.comment2 = Comment.objects.create(
+            description="It crashes on my phone too",
+            issue=self.issue1,
+            author=self.user2,
+        )
+        # Same words, other project.
+        Issue.objects.create(
+            author=self.user2,
+            project=self.project2,
+            name="Login crashes",
+            description="crashes",
+            tag="BUG",
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(self.url_search, {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_ranked_results(self):
+        results = self.search('crashes')
+        # The match in the name first.
+        self.assertEqual(
+            [(result['type'], result['issue_id']) for result in results],
+            [('issue', self.issue2.pk), ('comment', self.issue1.pk)]
+        )
+        self.assertEqual(results[0]['name'], 'Login page <mark>crashes</mark>')
+        self.assertEqual(
+            results[0]['snippet'],
+            'The login form <mark>crashes</mark> on submit'
+        )
+        self.assertEqual(results[1]['comment_id'], str(self.comment2.pk))
+        self.assertIsNone(results[1]['name'])
+        self.assertGreater(results[0]['score'], results[1]['score'])
+
+    def test_all_words(self):
+        self.assertEqual(len(self.search('crashes phone')), 1)
+        self.assertEqual(len(self.search('crash*')), 2)
+        self.assertEqual(self.search('CRASHÉS')[0]['issue_id'], self.issue2.pk)
+
+    def test_pagination(self):
+        self.assertEqual(len(self.search('crashes', limit=1)), 1)
+        self.assertEqual(
+            self.search('crashes', limit=1, offset=1)[0]['type'],
+            'comment'
+        )
+
+    def test_query_syntax_is_not_interpreted(self):
+        for query in ('"crashes', 'crashes OR', 'NOT (crashes', 'name:x'):
+            with self.subTest(query=query):
+                self.search(query)
+
+    def test_index_follows_changes(self):
+        self.issue2.name = "Logout"
+        self.issue2.description = "Nothing to see"
+        self.issue2.save()
+        self.comment2.delete()
+        Issue.objects.bulk_create([
+            Issue(
+                author=self.user,
+                project=self.project1,
+                name="Bulk",
+                description="crashes in bulk",
+                tag="BUG",
+            )
+        ])
+        results = self.search('crashes')
+        self.assertEqual(
+            [result['name'] for result in results],
+            ['Bulk']
+        )
+        self.issue1.delete()
+        self.assertEqual(self.search('comment1'), [])
+
+    def test_fallback(self):
+        with patch.dict(search._indexed, {'default': False}):
+            results = self.search('crashes')
+        self.assertEqual(
+            {(result['type'], result['issue_id']) for result in results},
+            {('issue', self.issue2.pk), ('comment', self.issue1.pk)}
+        )
+        issue = next(
+            result for result in results if result['type'] == 'issue'
+        )
+        self.assertEqual(issue['name'], 'Login page <mark>crashes</mark>')
+        self.assertIn('<mark>crashes</mark>', issue['snippet'])
+        self.assertIsNone(issue['score'])
+
+    def test_markup_is_escaped(self):
+        Comment.objects.create(
+            description='<img src=x onerror="alert(1)"> crashes <script>',
+            issue=self.issue1,
+            author=self.user2,
+        )
+        Issue.objects.create(
+            author=self.user,
+            project=self.project1,
+            name="<b>crashes</b>",
+            description="&amp; crashes",
+            tag="BUG",
+        )
+        expected = {
+            (
+                None,
+                '&lt;img src=x onerror=&quot;alert(1)&quot;&gt; '
+                '<mark>crashes</mark> &lt;script&gt;'
+            ),
+            (
+                '&lt;b&gt;<mark>crashes</mark>&lt;/b&gt;',
+                '&amp;amp; <mark>crashes</mark>'
+            ),
+        }
+        for indexed in (True, False):
+            with self.subTest(indexed=indexed):
+                with patch.dict(search._indexed, {'default': indexed}):
+                    results = self.search('crashes')
+                self.assertLessEqual(
+                    expected,
+                    {
+                        (result['name'], result['snippet'])
+                        for result in results
+                    }
+                )
+
+    def test_rebuild(self):
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        # 3 issues and 2 comments.
+        self.assertIn('Indexed 5 ', out.getvalue())
+        self.assertEqual(len(self.search('crashes')), 2)
+
+    def test_without_query(self):
+        response = self.client.get(self.url_search, {'q': ' ?! '})
+        self.assertEqual(response.status_code, 400)
+
+    def test_not_contributor(self):
+        self.client.force_authenticate(
+            user=get_user_model().objects.get(username='user3')
+        )
+        response = self.client.get(self.url_search, {'q': 'crashes'})
+        self.assertEqual(response.status_code, 403)
+
+
+class TestIssueFilters(AppAPITestCase):
+    url_issues = reverse_lazy('project-issue-list', args=(1,))
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.user)
+        contributor2 = self.project1.contributor_set.get(user=self.user2)
+        for name, status, priority, tag, author, assigned_to in (
+            ("high bug", "In Progress", "HIGH", "BUG", self.user, 1),
+            ("high bug 2", "To Do", "HIGH", "BUG", self.user2, 1),
+            ("closed bug", "Finished", "HIGH", "BUG", self.user, 1),
+            ("high task", "To Do", "HIGH", "TASK", self.user, 1),
+            ("other's bug", "To Do", "HIGH", "BUG", self.user, contributor2),
+            ("low bug", "To Do", "LOW", "BUG", self.user2, None),
+        ):
+            Issue.objects.create(
+                project=self.project1,
+                name=name,
+                description="description",
+                status=status,
+                priority=priority,
+                tag=tag,
+                author=author,
+                assigned_to_id=getattr(assigned_to, 'pk', assigned_to),
+            )
+
+    def get_names(self, **params):
+        response = self.client.get(self.url_issues, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [issue['name'] for issue in response.json()['results']]
+
+    def test_my_open_high_bugs(self):
+        self.assertEqual(
+            self.get_names(
+                assigned_to="user",
+                status="To Do,In Progress",
+                priority="HIGH",
+                tag="BUG",
+            ),
+            ["high bug", "high bug 2"]
+        )
+
+    def test_filters(self):
+        self.assertEqual(
+            self.get_names(status="Finished"),
+            ["closed bug"]
+        )
+        self.assertEqual(
+            self.get_names(author="user2", status="To Do"),
+            ["high bug 2", "low bug"]
+        )
+        self.assertEqual(
+            self.get_names(assigned_to="user2"),
+            ["other's bug"]
+        )
+        self.assertEqual(self.get_names(assigned_to="nobody"), [])
+
+    def test_unindexed_combination(self):
+        response = self.client.get(self.url_issues, {'tag': 'BUG'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(
+            'priority, status, tag;',
+            response.json()['filters'][0]
+        )
+
+    def test_invalid_values(self):
+        for params in (
+            {'status': 'To Do,Done'},
+            {'priority': ''},
+            {'ordering': 'name'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url_issues, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), list(params))
+
+    def test_ordering(self):
+        names = self.get_names(status="To Do", ordering="-time_created")
+        self.assertEqual(
+            names,
+            ["low bug", "other's bug", "high task", "high bug 2", "issue1"]
+        )
+
+    def test_keyset_pages(self):
+        params = {
+            'status': 'To Do',
+            'ordering': '-time_created',
+            'pagination': 'keyset',
+            'limit': 2,
+        }
+        names = []
+        url = self.url_issues
+        while url:
+            response = self.client.get(url, params)
+            params = None
+            names += [issue['name'] for issue in response.json()['results']]
+            url = response.json()['next']
+        self.assertEqual(
+            names,
+            ["low bug", "other's bug", "high task", "high bug 2", "issue1"]
+        )
+
+    def test_combinations_are_indexed(self):
+        combinations = indexed_combinations(Issue, IssueViewSet.filter_scope)
+        self.assertIn(
+            frozenset(['assigned_to', 'status', 'priority', 'tag']),
+            combinations
+        )
+        self.assertNotIn(frozenset(['tag']), combinations)
+
+
+class TestAsyncViews(AppAPITestCase):
+    """The async viewsets return what the sync ones do."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(2, 6):
+            Issue.objects.create(
+                author=cls.user2,
+                project=cls.project1,
+                name=f"issue{i}",
+                description=f"issue{i} description",
+                tag="BUG",
+                status="In Progress" if i % 2 else "To Do",
+            )
+
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.access = {
+            user.username: str(
+                TokenObtainPairSerializer.get_token(user).access_token
+            )
+            for user in User.objects.all()
+        }
+
+    def get_headers(self, username="user"):
+        return {"Authorization": f"Bearer {self.access[username]}"}
+
+    def assertSameResponses(self, name, args=(), query='', username="user"):
+        url = reverse(name, args=args) + query
+        expected = self.client.get(url, headers=self.get_headers(username))
+        response = self.client.get(
+            url.replace('/api/', '/api/async/', 1),
+            headers=self.get_headers(username)
+        )
+        self.assertEqual(response.status_code, expected.status_code, url)
+        # The same links, to the async views.
+        self.assertEqual(
+            json.loads(
+                response.content.decode().replace('/api/async/', '/api/')
+            ),
+            expected.json(),
+            url
+        )
+
+    def test_same_responses(self):
+        for name, args, query in (
+            ('project-list', (), ''),
+            ('project-list', (), '?limit=1&offset=1'),
+            ('project-detail', (1,), ''),
+            ('project-detail', (1,), '?contributors_limit=1'),
+            ('project-contributor-list', (1,), ''),
+            ('project-contributor-list', (1,), '?pagination=keyset&limit=1'),
+            ('project-contributor-detail', (1, 2), ''),
+            ('project-issue-list', (1,), ''),
+            ('project-issue-list', (1,), '?status=To Do,In Progress'),
+            (
+                'project-issue-list',
+                (1,),
+                '?author=user2&ordering=-time_created'
+            ),
+            ('project-issue-list', (1,), '?pagination=keyset&limit=2'),
+            ('project-issue-list', (1,), '?name=issue2'),
+            ('project-issue-detail', (1, 1), ''),
+            ('project-issue-comment-list', (1, 1), ''),
+            ('project-issue-comment-detail', (1, 1, self.comment1.pk), ''),
+        ):
+            with self.subTest(name=name, query=query):
+                self.assertSameResponses(name, args, query)
+
+    def test_same_errors(self):
+        for name, args, query, username in (
+            ('project-detail', (1,), '', 'user3'),
+            ('project-detail', (99,), '', 'user'),
+            ('project-issue-list', (1,), '', 'user3'),
+            ('project-issue-list', (1,), '?priority=URGENT', 'user'),
+            ('project-issue-list', (1,), '?cursor=invalid', 'user'),
+            ('project-issue-detail', (2, 1), '', 'user'),
+            ('project-issue-comment-list', (1, 1), '', 'user3'),
+            ('project-contributor-detail', (1, 'x'), '', 'user'),
+        ):
+            with self.subTest(name=name, query=query, username=username):
+                self.assertSameResponses(name, args, query, username)
+
+    def test_keyset_pages(self):
+        url = reverse('async-project-issue-list', args=(1,))
+        response = self.client.get(
+            url + '?pagination=keyset&limit=2',
+            headers=self.get_headers()
+        )
+        names = [issue['name'] for issue in response.json()['results']]
+        while response.json()['next']:
+            response = self.client.get(
+                response.json()['next'],
+                headers=self.get_headers()
+            )
+            names += [issue['name'] for issue in response.json()['results']]
+        self.assertEqual(
+            names,
+            [f"issue{i}" for i in range(1, 6)]
+        )
+
+    async def test_async_client(self):
+        response = await self.async_client.get(
+            reverse('async-project-issue-list', args=(1,)),
+            headers=self.get_headers()
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 5)
+        self.assertIn('Authorization', response['Vary'])
+        response = await self.async_client.get(
+            reverse('async-project-detail', args=(1,)),
+            headers=self.get_headers("user3")
+        )
+        self.assertEqual(response.status_code, 403)
+
+    async def test_concurrent_requests(self):
+        urls = [
+            reverse('async-project-list'),
+            reverse('async-project-detail', args=(1,)),
+            reverse('async-project-contributor-list', args=(1,)),
+            reverse('async-project-issue-detail', args=(1, 1)),
+            reverse(
+                'async-project-issue-comment-list', args=(1, 1)
+            ),
+        ]
+        responses = await asyncio.gather(*(
+            self.async_client.get(url, headers=self.get_headers())
+            for url in urls
+        ))
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [200] * len(urls)
+        )
+
+    async def test_unauthenticated(self):
+        response = await self.async_client.get(reverse('async-project-list'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), self.get_response_unauthenticated())
+
+    async def test_read_only(self):
+        response = await self.async_client.post(
+            reverse('async-project-list'),
+            {"name": "project", "type": "BACKEND"},
+            headers=self.get_headers()
+        )
+        self.assertEqual(response.status_code, 405)
+
+    def test_membership_cache(self):
+        url = reverse('async-project-detail', args=(1,))
+        self.client.get(url, headers=self.get_headers("user2"))
+        self.assertEqual(
+            caches[settings.MEMBERSHIP_CACHE_ALIAS].get(
+                membership.make_key(self.user2.pk, 1)
+            ),
+            'CONTRIBUTOR'
+        )
@@ -5,6 +5,11 @@ from projectsapp.views import (
     IssueViewSet,
     ContributorViewSet,
     CommentViewSet,
+    CacheStatsView,
+    AsyncProjectViewSet,
+    AsyncIssueViewSet,
+    AsyncContributorViewSet,
+    AsyncCommentViewSet,
 )
 
 
@@ -42,8 +47,47 @@ issue_router.register(
     basename='project-issue-comment'
 )
 
+# The GET of the same resources, served by async views (for ASGI).
+async_router = routers.SimpleRouter()
+async_router.register(
+    r'projects',
+    AsyncProjectViewSet,
+    basename='async-project'
+)
+
+async_project_router = routers.NestedSimpleRouter(
+    async_router,
+    r'projects',
+    lookup='project'
+)
+async_project_router.register(
+    r'issues',
+    AsyncIssueViewSet,
+    basename='async-project-issue'
+)
+async_project_router.register(
+    r'contributors',
+    AsyncContributorViewSet,
+    basename='async-project-contributor'
+)
+
+async_issue_router = routers.NestedSimpleRouter(
+    async_project_router,
+    r'issues',
+    lookup='issue'
+)
+async_issue_router.register(
+    r'comments',
+    AsyncCommentViewSet,
+    basename='async-project-issue-comment'
+)
+
 urlpatterns = [
     path(r'api/', include(router.urls)),
     path(r'api/', include(project_router.urls)),
-    path(r'api/', include(issue_router.urls))
+    path(r'api/', include(issue_router.urls)),
+    path(r'api/cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path(r'api/async/', include(async_router.urls)),
+    path(r'api/async/', include(async_project_router.urls)),
+    path(r'api/async/', include(async_issue_router.urls)),
 ]
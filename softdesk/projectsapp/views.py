@@ -1,11 +1,23 @@
-from django.shortcuts import get_object_or_404
-from django.db.models import Count, Q
+import hashlib
+from inspect import isawaitable
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch, Sum
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.pagination import _positive_int
 from projectsapp.models import (
     Project,
+    Contributor,
     Issue,
 )
 from projectsapp.serializers import (
@@ -16,13 +28,35 @@ from projectsapp.serializers import (
     IssueListSerializer,
     IssueDetailSerializer,
     CommentSerializer,
-    AddContributorSerializer
+    AddContributorSerializer,
+    ProjectValuesSerializer,
+    IssueValuesSerializer,
+    CommentValuesSerializer,
+    IssueBulkCreateSerializer,
+    IssueBulkUpdateSerializer,
+    BulkContributorsSerializer,
 )
 from projectsapp.permissions import (
     IsAuthor,
     IsContributor,
     IsProjectCreator
 )
+from projectsapp.pagination import KeysetPagination, SelectablePagination
+from projectsapp.filters import IndexedFilterBackend
+from projectsapp.resolvers import (
+    resolve_project,
+    resolve_issue,
+    aresolve_project,
+    aresolve_issue,
+)
+from projectsapp.cache import all_stats
+from projectsapp.counters import update_project_counters
+from projectsapp.export import iter_records, ndjson_lines, csv_lines
+from projectsapp.search import get_terms, search_project
+from projectsapp.signals import batched_invalidation
+from projectsapp import response_cache
+from projectsapp.membership import get_role, peek_role, UNKNOWN
+from authentication.permissions import IsAdmin
 
 
 class MultipleSerializerMixin:
@@ -37,24 +71,488 @@ class MultipleSerializerMixin:
         return super().get_serializer_class()
 
 
-class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
+def etag_matches(etag, etags):
+    """True if `etag` is in the parsed If-None-Match `etags`, with the
+    weak comparison."""
+    return etag in [tag.removeprefix('W/') for tag in etags]
+
+
+class ConditionalGetMixin:
+    """Conditional GET for list and retrieve.
+
+    The ETag is built from the URL, the media type and a version of the
+    data (see Project.version), so that `If-None-Match` is answered with
+    304 Not Modified before the queryset is evaluated or serialized."""
+
+    def get_version(self):
+        """Return the version of the data rendered by this request,
+        or None to serve it without a validator."""
+        return self.get_contributed_project().version
+
+    def get_etag(self, request):
+        version = self.get_version()
+        if version is None:
+            return None
+        key = '|'.join([
+            request.get_full_path(),
+            request.accepted_media_type,
+            str(version),
+        ])
+        return quote_etag(
+            hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+        )
+
+    def has_current_representation(self):
+        """For `If-None-Match: *`: the list exists once its version is
+        found, the object of a retrieve only if get_object() finds it
+        (404 otherwise)."""
+        if self.action == 'retrieve':
+            self.get_object()
+        return True
+
+    def conditional_get(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is not None:
+            etags = parse_etags(request.headers.get('If-None-Match', ''))
+            if etag_matches(etag, etags) or (
+                '*' in etags and self.has_current_representation()
+            ):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response['ETag'] = etag
+                return response
+        response = handler(request, *args, **kwargs)
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        # The responses depend on the permissions of the user.
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_get(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_get(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CachedResponseMixin:
+    """Serve list and retrieve from the rendered responses kept in
+    projectsapp.response_cache.
+
+    The entries are keyed by the URL (with the pagination parameters),
+    the media type and the role of the user, and dropped by the signals
+    whenever the project changes. With the role of the user cached by
+    the membership service, a hit does not query the database."""
+
+    def get_cache_scope(self):
+        """Return the scope of the responses: the project id."""
+        return self.kwargs['project_pk']
+
+    def get_cache_role(self, scope, lookup):
+        """Return the role of the request user in the scope with
+        `lookup` (get_role or peek_role)."""
+        return lookup(self.request, scope)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        scope = self.get_cache_scope()
+        # Read before any data is loaded, see get_generation.
+        generation = response_cache.get_generation(scope)
+        role = self.get_cache_role(scope, peek_role)
+        if role is None:
+            # Not a contributor, let the view deny it.
+            return handler(request, *args, **kwargs)
+        if role is not UNKNOWN:
+            entry = response_cache.get(
+                scope,
+                response_cache.make_key(scope, generation, request, role)
+            )
+            if entry is not None:
+                return self.get_cached_response(request, entry)
+        else:
+            # The entry cannot be looked up without the role.
+            response_cache.stats.miss()
+        # Stored by finalize_response, once rendered.
+        self._response_cache = (scope, generation)
+        return handler(request, *args, **kwargs)
+
+    def get_cached_response(self, request, entry):
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        # Only found responses are stored: the object exists for `*`.
+        if entry['etag'] is not None and (
+            '*' in etags or etag_matches(entry['etag'], etags)
+        ):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(
+                entry['content'],
+                content_type=entry['content_type']
+            )
+        if entry['etag'] is not None:
+            response['ETag'] = entry['etag']
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        cache = getattr(self, '_response_cache', None)
+        if cache is not None and response.status_code == 200:
+            scope, generation = cache
+            # Found out by the view, no query.
+            role = self.get_cache_role(scope, get_role)
+            if role is not None:
+                response.render()
+                response_cache.store(
+                    scope,
+                    response_cache.make_key(
+                        scope, generation, request, role
+                    ),
+                    response
+                )
+        return response
+
+
+class ValuesListMixin:
+    """Serialize the GET lists from `.values()` rows with
+    `values_serializer_class` (see ValuesListSerializer), which gives
+    the same output as the serializer_class."""
+    values_serializer_class = None
+
+    def get_values_lookups(self, queryset):
+        lookups = self.values_serializer_class.get_lookups()
+        # The keyset pagination reads the position of the last row.
+        ordering = KeysetPagination().get_ordering(
+            self.request, queryset, self
+        )
+        for field in ordering:
+            if field.lstrip('-') not in lookups:
+                lookups.append(field.lstrip('-'))
+        return lookups
+
+    def list(self, request, *args, **kwargs):
+        if self.values_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.values(*self.get_values_lookups(queryset))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.values_serializer_class(
+                page,
+                context=self.get_serializer_context()
+            )
+            return self.get_paginated_response(serializer.data)
+        serializer = self.values_serializer_class(
+            queryset,
+            context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+
+class ParentObjectMixin:
+    """Load the parent objects of a nested viewset once per request
+    and cache them on the view."""
+
+    def get_project(self):
+        """Return the project of the URL, 404 if it does not exist.
+        Its `membership_role` is the role of the request user."""
+        if not hasattr(self, '_project'):
+            self._project = resolve_project(
+                self.request,
+                self.kwargs['project_pk']
+            )
+        return self._project
+
+    def get_contributed_project(self):
+        """Return the project of the URL, 404 if the request user
+        is not one of its contributors."""
+        project = self.get_project()
+        if project.membership_role is None:
+            raise Http404
+        return project
+
+    def get_issue(self):
+        """Return the issue of the URL with its project,
+        404 if the request user is not a contributor of the project."""
+        if not hasattr(self, '_issue'):
+            self._issue = resolve_issue(
+                self.request,
+                self.kwargs['project_pk'],
+                self.kwargs['issue_pk']
+            )
+            self._project = self._issue.project
+        return self._issue
+
+    async def aget_project(self):
+        """get_project for async views."""
+        if not hasattr(self, '_project'):
+            self._project = await aresolve_project(
+                self.request,
+                self.kwargs['project_pk']
+            )
+        return self._project
+
+    async def aget_contributed_project(self):
+        """get_contributed_project for async views."""
+        project = await self.aget_project()
+        if project.membership_role is None:
+            raise Http404
+        return project
+
+    async def aget_issue(self):
+        """get_issue for async views."""
+        if not hasattr(self, '_issue'):
+            self._issue = await aresolve_issue(
+                self.request,
+                self.kwargs['project_pk'],
+                self.kwargs['issue_pk']
+            )
+            self._project = self._issue.project
+        return self._issue
+
+    async def aresolve_parents(self):
+        """Load the parent objects of the URL (404 as with get_issue
+        and get_contributed_project), so that the get_queryset of an
+        async view runs no query."""
+        if 'issue_pk' in self.kwargs:
+            await self.aget_issue()
+        else:
+            await self.aget_contributed_project()
+
+
+class AsyncReadOnlyMixin:
+    """Serve the GET list and retrieve of a viewset with an async
+    dispatch, for ASGI: the queries go through the async ORM (aget,
+    acount, async iteration) and the event loop serves other requests
+    while they run. The same data as the viewset is returned, without
+    the response cache and the ETags.
+
+    The authentication runs outside of the event loop, as it may query
+    the database; so do the permissions with ahas_permission or
+    ahas_object_permission (e.g. IsContributor), the others must not
+    query. Pagination classes and filter backends must have
+    apaginate_queryset and afilter_queryset methods (see
+    SelectablePagination and IndexedFilterBackend)."""
+    http_method_names = ['get', 'head', 'options']
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        # dispatch returns a coroutine, Django awaits it.
+        return markcoroutinefunction(view)
+
+    @classmethod
+    def get_extra_actions(cls):
+        # The export, search and bulk actions are not routed.
+        return []
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self,
+                    request.method.lower(),
+                    self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        negotiated = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = negotiated
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+        await sync_to_async(self.perform_authentication)(request)
+        await self.acheck_permissions(request)
+        self.check_throttles(request)
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            if hasattr(permission, 'ahas_permission'):
+                allowed = await permission.ahas_permission(request, self)
+            else:
+                allowed = permission.has_permission(request, self)
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+
+    async def acheck_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            if hasattr(permission, 'ahas_object_permission'):
+                allowed = await permission.ahas_object_permission(
+                    request, self, obj
+                )
+            else:
+                allowed = permission.has_object_permission(
+                    request, self, obj
+                )
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+
+    async def afilter_queryset(self, queryset):
+        for backend in self.filter_backends:
+            backend = backend()
+            if hasattr(backend, 'afilter_queryset'):
+                queryset = await backend.afilter_queryset(
+                    self.request, queryset, self
+                )
+            else:
+                queryset = backend.filter_queryset(
+                    self.request, queryset, self
+                )
+        return queryset
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+    async def aget_object(self):
+        if hasattr(self, 'aresolve_parents'):
+            await self.aresolve_parents()
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (
+            queryset.model.DoesNotExist,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise Http404
+        await self.acheck_object_permissions(self.request, obj)
+        return obj
+
+    def serialize_rows(self, rows):
+        if getattr(self, 'values_serializer_class', None) is None:
+            return self.get_serializer(rows, many=True).data
+        return self.values_serializer_class(
+            rows,
+            context=self.get_serializer_context()
+        ).data
+
+    async def list(self, request, *args, **kwargs):
+        if hasattr(self, 'aresolve_parents'):
+            await self.aresolve_parents()
+        queryset = await self.afilter_queryset(self.get_queryset())
+        if getattr(self, 'values_serializer_class', None) is not None:
+            queryset = queryset.values(*self.get_values_lookups(queryset))
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(self.serialize_rows(page))
+        else:
+            response = Response(
+                self.serialize_rows([row async for row in queryset])
+            )
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        response = Response(self.get_serializer(instance).data)
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+
+class ProjectViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+    MultipleSerializerMixin,
+    ModelViewSet
+):
     serializer_class = ProjectListSerializer
+    values_serializer_class = ProjectValuesSerializer
     detail_serializer_class = ProjectDetailSerailizer
     permission_classes = [IsAuthenticated, IsContributor]
+    pagination_class = SelectablePagination
+    pagination_mode = 'offset'
+    # Number of contributors rendered inline by the project detail,
+    # None for all of them. Clients can ask for less (or more, up to
+    # max_contributors_limit) with ?contributors_limit=N and page
+    # through /api/projects/{pk}/contributors/ for the rest.
+    contributors_limit = None
+    max_contributors_limit = 100
+    contributors_limit_query_param = 'contributors_limit'
+    # Rows fetched at a time by the export.
+    export_chunk_size = 2000
+    export_formats = {
+        'ndjson': (ndjson_lines, 'application/x-ndjson'),
+        'csv': (csv_lines, 'text/csv'),
+    }
+    # Results of a search page, clients can ask for up to
+    # max_search_limit with ?limit=N.
+    search_limit = 20
+    max_search_limit = 100
 
     def get_queryset(self):
-        if self.action == 'list':
-            return Project.objects.all().select_related('author')
-        return Project.objects.annotate(
-            open_issues_count=Count(
-                'issues',
-                filter=~Q(issues__status='Finished')
-            ),
-            closed_issues_count=Count(
-                'issues',
-                filter=Q(issues__status='Finished')
-            )
-        ).select_related('author')
+        queryset = Project.objects.all().select_related('author')
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'contributor_set',
+                    queryset=self.get_contributors_queryset(),
+                    # A sliced prefetch must be stored in a list.
+                    to_attr='inline_contributors'
+                )
+            )
+        return queryset
+
+    def get_contributors_limit(self):
+        try:
+            return _positive_int(
+                self.request.query_params[
+                    self.contributors_limit_query_param
+                ],
+                strict=True,
+                cutoff=self.max_contributors_limit
+            )
+        except (KeyError, ValueError):
+            return self.contributors_limit
+
+    def get_contributors_queryset(self):
+        queryset = Contributor.objects.select_related('user').order_by('pk')
+        limit = self.get_contributors_limit()
+        if limit is not None:
+            queryset = queryset[:limit]
+        return queryset
 
     def get_permissions(self):
         """
@@ -71,6 +569,89 @@ class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
             permission_classes = self.permission_classes
         return [permission() for permission in permission_classes]
 
+    def get_cache_scope(self):
+        if self.action == 'list':
+            return response_cache.PROJECT_LIST
+        return self.kwargs['pk']
+
+    def get_cache_role(self, scope, lookup):
+        if scope == response_cache.PROJECT_LIST:
+            # The same list for every user.
+            return ''
+        return super().get_cache_role(scope, lookup)
+
+    def get_version(self):
+        if self.action == 'list':
+            # Any project created, deleted or changed alters one of them.
+            # Read from the database: the generation of the response
+            # cache is local to the process with the default backend.
+            versions = Project.objects.aggregate(
+                count=Count('pk'),
+                last=Max('pk'),
+                total=Sum('version'),
+            )
+            return '{count}-{last}-{total}'.format(**versions)
+        # The role found is remembered for the IsContributor check.
+        project = resolve_project(self.request, self.kwargs['pk'])
+        if project.membership_role is None:
+            # Denied by the permissions.
+            return None
+        return project.version
+
+    @action(detail=True)
+    def export(self, request, pk=None):
+        """Stream the issues of the project, each followed by its
+        comments, as NDJSON (by default) or CSV
+        (?export_format=csv)."""
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in self.export_formats:
+            return Response(
+                {
+                    'detail':
+                    'Unknown export format, use one of: '
+                    + ', '.join(self.export_formats) + '.'
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        project = self.get_object()
+        encode, content_type = self.export_formats[export_format]
+        response = StreamingHttpResponse(
+            encode(iter_records(project, self.export_chunk_size)),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="project-{project.pk}.{export_format}"'
+        )
+        return response
+
+    @action(detail=True)
+    def search(self, request, pk=None):
+        """Issues and comments of the project containing all the words
+        of ?q=, best matches first, with snippets of their text.
+        Paginated with ?limit= and ?offset=."""
+        query = request.query_params.get('q', '')
+        if not get_terms(query):
+            return Response(
+                {'detail': 'Give the words to search for with ?q=.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        project = self.get_object()
+        try:
+            limit = _positive_int(
+                request.query_params['limit'],
+                strict=True,
+                cutoff=self.max_search_limit
+            )
+        except (KeyError, ValueError):
+            limit = self.search_limit
+        try:
+            offset = _positive_int(request.query_params['offset'])
+        except (KeyError, ValueError):
+            offset = 0
+        return Response({
+            'results': search_project(project.pk, query, limit, offset)
+        })
+
     def perform_create(self, serializer):
         project = serializer.save(author=self.request.user)
         project.contributors.add(
@@ -81,18 +662,28 @@ class ProjectViewSet(MultipleSerializerMixin, ModelViewSet):
         )
 
 
-class ContributorViewSet(MultipleSerializerMixin, ModelViewSet):
+class ContributorViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ParentObjectMixin,
+    MultipleSerializerMixin,
+    ModelViewSet
+):
     serializer_class = ContributorListSerializer
     detail_serializer_class = ContributorDetailSerializer
     add_serilaizer_class = AddContributorSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'post', 'delete', 'head', 'options']
+    pagination_class = SelectablePagination
+    pagination_mode = 'offset'
+    bulk_max_size = 1000
+    # Contributor has no creation date, the primary key keeps the order.
+    keyset_ordering = ('pk',)
 
     def get_queryset(self):
-        return get_object_or_404(
-            self.request.user.projects,
-            pk=self.kwargs['project_pk']
-        ).contributor_set.select_related('user')
+        return self.get_contributed_project().contributor_set.select_related(
+            'user'
+        )
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -109,7 +700,8 @@ class ContributorViewSet(MultipleSerializerMixin, ModelViewSet):
             'destroy',
             'update',
             'partial_update',
-            'create'
+            'create',
+            'bulk'
         ):
             permission_classes = (
                 self.permission_classes + [IsProjectCreator]
@@ -118,37 +710,142 @@ class ContributorViewSet(MultipleSerializerMixin, ModelViewSet):
             permission_classes = self.permission_classes
         return [permission() for permission in permission_classes]
 
+    def initial(self, request, *args, **kwargs):
+        # PUT is routed to update on the detail route too: refuse it
+        # there before the permissions are checked.
+        if request.method.lower() not in self.http_method_names:
+            raise MethodNotAllowed(request.method)
+        super().initial(request, *args, **kwargs)
+
+    def get_object(self):
+        if self.lookup_field not in self.kwargs:
+            # The OPTIONS of the bulk route, describing PUT.
+            raise Http404
+        return super().get_object()
+
     def destroy(self, request, *args, **kwargs):
         contributor = self.get_object()
         if contributor.pk == contributor.project.author.pk:
-            return Response(
-                {
-                    'detail':
-                    'You cannot remove the author from the contributors.'
-                    ' Delete the project instead.'
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+            return self.author_removed()
         self.perform_destroy(contributor)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    def perform_create(self, serializer):
-        serializer.save(
-            project=Project.objects.get(pk=self.kwargs['project_pk'])
+    def author_removed(self):
+        return Response(
+            {
+                'detail':
+                'You cannot remove the author from the contributors.'
+                ' Delete the project instead.'
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # PUT is only allowed on this route (initkwargs of its view).
+    @action(
+        detail=False,
+        methods=['post', 'put'],
+        http_method_names=['post', 'put', 'head', 'options'],
+    )
+    def bulk(self, request, *args, **kwargs):
+        """Add the users of a list of usernames to the contributors
+        (POST, the users already contributing are ignored), or make
+        them the contributors of the project (PUT, the project author
+        must be in the list).
+
+        The users are loaded by one query, the contributors are added
+        by one INSERT and removed by one DELETE, and the project and
+        the cached roles are invalidated once."""
+        project = self.get_project()
+        serializer = BulkContributorsSerializer(
+            data=request.data,
+            context=dict(
+                self.get_serializer_context(),
+                bulk_max_size=self.bulk_max_size
+            )
+        )
+        serializer.is_valid(raise_exception=True)
+        users = serializer.validated_data['users']
+        replace = request.method == 'PUT'
+        wanted = {user.pk for user in users}
+        if replace and project.author_id not in wanted:
+            return self.author_removed()
+        with transaction.atomic(), batched_invalidation() as batch:
+            current = dict(
+                project.contributor_set.values_list('user_id', 'pk')
+            )
+            added = Contributor.objects.bulk_create(
+                Contributor(user=user, project=project)
+                for user in users
+                if user.pk not in current
+            )
+            # bulk_create sends no signal, do what they would.
+            if added:
+                batch.projects.add(project.pk)
+                batch.memberships.update(
+                    (contributor.user_id, project.pk)
+                    for contributor in added
+                )
+            if replace:
+                removed = [
+                    pk
+                    for user_id, pk in current.items()
+                    if user_id not in wanted
+                ]
+                if removed:
+                    # The post_delete receivers are batched.
+                    Contributor.objects.filter(pk__in=removed).delete()
+        if replace:
+            return Response(
+                ContributorListSerializer(
+                    self.get_queryset().order_by('pk'), many=True
+                ).data
+            )
+        return Response(
+            ContributorListSerializer(added, many=True).data,
+            status=status.HTTP_201_CREATED
         )
 
+    def perform_create(self, serializer):
+        # The response renders the project, pass the loaded instance.
+        serializer.save(project=self.get_project())
+
 
-class IssueViewSet(MultipleSerializerMixin, ModelViewSet):
+class IssueViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+    ParentObjectMixin,
+    MultipleSerializerMixin,
+    ModelViewSet
+):
     serializer_class = IssueListSerializer
+    values_serializer_class = IssueValuesSerializer
+    # Items accepted by the bulk action.
+    bulk_max_size = 1000
     detail_serializer_class = IssueDetailSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SelectablePagination
+    pagination_mode = 'offset'
+    # ?status=To Do,In Progress&priority=HIGH&ordering=-time_created...
+    # The combinations of filters accepted are the ones an index of
+    # Issue starts with, after the project.
+    filter_backends = [IndexedFilterBackend]
+    filter_scope = ('project',)
+    filter_fields = {
+        'status': 'status',
+        'priority': 'priority',
+        'tag': 'tag',
+        'assigned_to': 'assigned_to__user__username',
+        'author': 'author__username',
+    }
+    ordering_fields = ('time_created',)
 
     def get_queryset(self):
-        return get_object_or_404(
-            self.request.user.projects,
-            pk=self.kwargs['project_pk']
-        ).issues.annotate(
-            comments_count=Count('comments')
+        # The project comes from the related manager, the author and the
+        # assignee (with its user) are joined for the serializers.
+        return self.get_contributed_project().issues.select_related(
+            'author',
+            'assigned_to__user'
         )
 
     def get_permissions(self):
@@ -169,45 +866,140 @@ class IssueViewSet(MultipleSerializerMixin, ModelViewSet):
         return [permission() for permission in permission_classes]
 
     def create(self, request, *args, **kwargs):
-        if self.request.user.id in get_object_or_404(
-            Project,
-            pk=self.kwargs['project_pk']
-        ).contributors.values_list('id', flat=True):
-            serializer = self.get_serializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
-            self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
-            return Response(
-                serializer.data,
-                status=status.HTTP_201_CREATED,
-                headers=headers
-            )
-        return Response(
-            {
-                "detail": "Not found."
-            },
-            status=status.HTTP_404_NOT_FOUND
-        )
+        # Not found for non contributors, before validating the data.
+        self.get_contributed_project()
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(
             author=self.request.user,
-            project=Project.objects.get(pk=self.kwargs['project_pk'])
+            project_id=self.get_project().pk
         )
 
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk(self, request, *args, **kwargs):
+        """Create (POST) or update (PATCH: id, status, priority,
+        assigned_to) a list of issues.
+
+        The batch is saved in a single transaction if every item is
+        valid, otherwise the errors are returned for each item, in
+        order, and nothing is saved."""
+        project = self.get_contributed_project()
+        items = request.data if isinstance(request.data, list) else []
+        context = self.get_serializer_context()
+        context['assignees'] = self.get_assignees(project, items)
+        if request.method == 'POST':
+            return self.bulk_create(request, project, context)
+        return self.bulk_update(request, project, items, context)
+
+    def get_assignees(self, project, items):
+        """Load the contributors assigned by a batch in one query."""
+        usernames = {
+            str(item['assigned_to'])
+            for item in items
+            if isinstance(item, dict) and item.get('assigned_to') is not None
+        }
+        if not usernames:
+            return {}
+        return {
+            contributor.user.username: contributor
+            for contributor in project.contributor_set.select_related(
+                'user'
+            ).filter(user__username__in=usernames)
+        }
+
+    def bulk_create(self, request, project, context):
+        serializer = IssueBulkCreateSerializer(
+            data=request.data,
+            many=True,
+            max_length=self.bulk_max_size,
+            context=context
+        )
+        serializer.is_valid(raise_exception=True)
+        issues = [
+            Issue(project=project, author=request.user, **data)
+            for data in serializer.validated_data
+        ]
+        opened = sum(issue.is_open for issue in issues)
+        with transaction.atomic():
+            Issue.objects.bulk_create(issues)
+            # bulk_create sends no signal, do what they would.
+            update_project_counters(
+                project.pk,
+                open_issues_count=opened,
+                closed_issues_count=len(issues) - opened
+            )
+            response_cache.invalidate(project.pk)
+        return Response(
+            IssueListSerializer(issues, many=True, context=context).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    def bulk_update(self, request, project, items, context):
+        ids = {
+            str(item.get('id'))
+            for item in items
+            if isinstance(item, dict)
+        }
+        with transaction.atomic():
+            context['issues'] = {
+                issue.pk: issue
+                for issue in self.get_queryset().select_for_update(
+                    of=('self',)
+                ).filter(pk__in=[pk for pk in ids if pk.isdigit()])
+            }
+            serializer = IssueBulkUpdateSerializer(
+                data=request.data,
+                many=True,
+                max_length=self.bulk_max_size,
+                context=context
+            )
+            serializer.is_valid(raise_exception=True)
+            issues = []
+            fields = set()
+            opened = 0
+            for data in serializer.validated_data:
+                issue = context['issues'][data.pop('id')]
+                was_open = issue.is_open
+                for field, value in data.items():
+                    setattr(issue, field, value)
+                    fields.add(field)
+                opened += issue.is_open - was_open
+                issues.append(issue)
+            if fields:
+                Issue.objects.bulk_update(issues, fields)
+            # bulk_update sends no signal, do what they would.
+            update_project_counters(
+                project.pk,
+                open_issues_count=opened,
+                closed_issues_count=-opened
+            )
+            response_cache.invalidate(project.pk)
+        return Response(
+            IssueDetailSerializer(issues, many=True, context=context).data
+        )
 
-class CommentViewSet(ModelViewSet):
+
+class CommentViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+    ParentObjectMixin,
+    ModelViewSet
+):
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SelectablePagination
+    pagination_mode = 'offset'
 
     def get_queryset(self):
-        return get_object_or_404(
-            get_object_or_404(
-                self.request.user.projects.select_related('author'),
-                pk=self.kwargs['project_pk']
-            ).issues,
-            pk=self.kwargs['issue_pk']
-        ).comments.select_related('author')
+        # Comments fetched through the related manager get the cached
+        # issue, the serializer does not load it again.
+        return self.get_issue().comments.select_related('author')
+
+    def get_version(self):
+        return self.get_issue().project.version
 
     def get_permissions(self):
         """
@@ -227,28 +1019,36 @@ class CommentViewSet(ModelViewSet):
         return [permission() for permission in permission_classes]
 
     def create(self, request, *args, **kwargs):
-        if self.request.user.id in get_object_or_404(
-            Project,
-            pk=self.kwargs['project_pk']
-        ).contributors.values_list('id', flat=True):
-            serializer = self.get_serializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
-            self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
-            return Response(
-                serializer.data,
-                status=status.HTTP_201_CREATED,
-                headers=headers
-            )
-        return Response(
-            {
-                "detail": "Not found."
-            },
-            status=status.HTTP_404_NOT_FOUND
-        )
+        # Not found for non contributors, before validating the data.
+        self.get_issue()
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(
             author=self.request.user,
-            issue=Issue.objects.get(pk=self.kwargs['issue_pk'])
+            issue=self.get_issue()
         )
+
+
+class AsyncProjectViewSet(AsyncReadOnlyMixin, ProjectViewSet):
+    pass
+
+
+class AsyncContributorViewSet(AsyncReadOnlyMixin, ContributorViewSet):
+    pass
+
+
+class AsyncIssueViewSet(AsyncReadOnlyMixin, IssueViewSet):
+    pass
+
+
+class AsyncCommentViewSet(AsyncReadOnlyMixin, CommentViewSet):
+    pass
+
+
+class CacheStatsView(APIView):
+    """Hit and miss counters of the caches of this worker process."""
+    permission_classes = [IsAdmin]
+
+    def get(self, request, *args, **kwargs):
+        return Response(all_stats())
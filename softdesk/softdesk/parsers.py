@@ -0,0 +1,25 @@
+import codecs
+from io import BytesIO
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from softdesk.renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser decoding with orjson when it is installed.
+
+    Bodies orjson rejects are parsed again by JSONParser, so that the
+    error messages stay the same (and what orjson does not support,
+    e.g. integers above 64 bits, is still accepted)."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
@@ -0,0 +1,44 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson when it is installed.
+
+    The output is the same as JSONRenderer's: the values orjson does not
+    write the same way (datetimes, decimals, lazy strings...) go through
+    the encoder_class. The json module is used instead when orjson is not
+    installed, for indented output (e.g. the browsable API), and for what
+    orjson cannot encode (e.g. integers above 64 bits).
+    Unlike with STRICT_JSON, NaN and infinite floats are written as null.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+                )
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped as by JSONRenderer, for a strict javascript subset.
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace(
+            '\u2029'.encode(), b'\\u2029'
+        )
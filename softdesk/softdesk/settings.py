@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 
@@ -92,6 +94,60 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared by every worker in production: point it to a
+    # Redis or Memcached backend.
+    'membership': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'membership',
+        'TIMEOUT': 300,
+    },
+    # Rendered API responses, see projectsapp.response_cache. Must be
+    # shared by every worker in production (Redis or Memcached): a
+    # change only drops the responses from the cache of the process
+    # making it. With this local backend, the other processes serve
+    # their responses (even to a user who lost access) for up to
+    # TIMEOUT seconds after a change.
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': 5,
+    },
+    # Token versions of the users and generation of the denylist, see
+    # authentication.tokens and authentication.denylist. Shared by every
+    # worker in production: point it to a Redis or Memcached backend.
+    'tokens': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tokens',
+        'TIMEOUT': 300,
+    },
+}
+
+MEMBERSHIP_CACHE_ALIAS = 'membership'
+RESPONSE_CACHE_ALIAS = 'responses'
+TOKEN_CACHE_ALIAS = 'tokens'
+# Seconds after which each process reloads the revoked tokens, even if
+# the tokens cache (local to the process by default) tells of no
+# revocation: the longest a token revoked by another process is
+# accepted.
+TOKEN_DENYLIST_MAX_AGE = 5
+# Seconds a token version is kept in the tokens cache. Saving a user
+# only forgets it in the cache of the process that saved it: with a
+# local cache, the other processes accept the tokens of a user whose
+# password changed or who was deactivated for up to this delay. Can be
+# raised with a shared backend, which is invalidated everywhere.
+TOKEN_VERSION_MAX_AGE = 5
+# Rendered responses kept per project, the least recently used
+# ones are evicted first.
+RESPONSE_CACHE_MAX_ENTRIES = 100
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -111,6 +167,46 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+
+PASSWORD_HASHERS = [
+    # PBKDF2 with the iterations of PASSWORD_HASH_ITERATIONS.
+    'authentication.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# PBKDF2 iterations of the passwords hashed when a user is created
+# ('create'), when a user logs in on the token endpoint ('login', the
+# stored hashes with fewer iterations are upgraded) and elsewhere.
+PASSWORD_HASH_ITERATIONS = {
+    'default': 600000,
+    'create': 600000,
+    'login': 600000,
+}
+
+TESTING = sys.argv[1:2] == ['test']
+
+if TESTING:
+    # The test passwords need no protection, only to be checked.
+    PASSWORD_HASH_ITERATIONS = {
+        'default': 1000,
+        'create': 1000,
+        'login': 1000,
+    }
+
+# Threads hashing the passwords of the async token views (see
+# authentication.pool), and logins allowed to wait for one: beyond,
+# they are refused with a 503 and a Retry-After of
+# PASSWORD_POOL_RETRY_AFTER seconds.
+PASSWORD_POOL_WORKERS = os.cpu_count() or 1
+PASSWORD_POOL_MAX_QUEUE = 4 * PASSWORD_POOL_WORKERS
+PASSWORD_POOL_RETRY_AFTER = 1
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -141,8 +237,20 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
+    # Encoded and decoded with orjson if it is installed,
+    # with the json module otherwise.
+    'DEFAULT_RENDERER_CLASSES': [
+        'softdesk.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'softdesk.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # The user is built from the claims of the token.
+        'authentication.authentication.StatelessJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication'
     ],
 }
@@ -151,4 +259,8 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
+    'TOKEN_OBTAIN_SERIALIZER':
+        'authentication.serializers.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER':
+        'authentication.serializers.TokenRefreshSerializer',
 }